@@ -1,13 +1,14 @@
 # backend/ai/agents/literature_agent.py
 
 import sys
+import asyncio
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 from backend.services.vector_db_service import VectorDBService
 from backend.services.llm_router_service import LLMRouterService
-from sentence_transformers import SentenceTransformer
-import torch
+from backend.services.embedding_cache import cached_encode
+from backend.services.query_embedding_batcher import embed_query
 
 LITERATURE_AGENT_PROMPT = """
 You are a scientific literature analyst specializing in microbiome and LBP research.
@@ -35,11 +36,9 @@ class LiteratureAnalysisAgent:
         self.vector_db = VectorDBService()
         self.llm_router = LLMRouterService()
         
-        # This model should be consistent with the one used in the embedding pipeline
-        self.embedding_model = SentenceTransformer(
-            'microsoft/BiomedNLP-PubMedBERT-base-uncased-abstract-fulltext',
-            device='cuda' if torch.cuda.is_available() else 'cpu'
-        )
+        # This model should be consistent with the one used in the embedding pipeline.
+        # It is shared with the pipeline through the registry and loaded on the first query.
+        self.embedding_model_id = "pubmedbert"
 
     def run(self, query: str):
         """
@@ -53,13 +52,29 @@ class LiteratureAnalysisAgent:
         print(f"Literature Agent received query: '{query}'")
 
         # 1. Generate query embedding
-        query_embedding = self.embedding_model.encode(query, convert_to_tensor=True).tolist()
+        query_embedding = cached_encode(self.embedding_model_id, [query])[0].tolist()
+
+        return self._answer(query, query_embedding)
+
+    async def arun(self, query: str):
+        """
+        Async variant of run() for the API. The query embedding goes through
+        the shared micro-batcher, so concurrent requests share forward passes;
+        retrieval and the LLM call run in a worker thread.
+        """
+        print(f"Literature Agent received query: '{query}'")
+        query_embedding = await embed_query(self.embedding_model_id, query)
+        return await asyncio.to_thread(self._answer, query, query_embedding)
 
+    def _answer(self, query, query_embedding):
         # 2. Query vector database
+        # Hybrid retrieval so exact strain IDs and gene names are matched lexically too
         search_results = self.vector_db.query_index(
             query_vector=query_embedding,
             top_k=5,
-            namespace="pubmed-articles"
+            namespace="pubmed-articles",
+            query_text=query,
+            mode="hybrid"
         )
         
         if not search_results or not search_results['matches']:
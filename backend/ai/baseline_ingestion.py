@@ -0,0 +1,305 @@
+# backend/ai/baseline_ingestion.py
+"""
+Bulk ingestion of local PubMed baseline/update files (.xml.gz).
+
+Files are parsed in a process pool, filtered by MeSH/keyword rules and
+streamed in bounded chunks through the same embed and upsert stages as
+EmbeddingPipeline. Progress is recorded per file, so a re-run skips files
+that were fully ingested.
+Update files are applied in order, including their DeleteCitation lists.
+
+Usage:
+    python backend/ai/baseline_ingestion.py /data/pubmed/baseline/*.xml.gz \\
+        --mesh "Gastrointestinal Microbiome" --mesh Probiotics --keyword microbiome --workers 8
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from itertools import islice
+from multiprocessing import Manager
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from backend.ai.embedding_pipeline import EmbeddingPipeline
+from backend.services.vector_db_service import VectorDBService
+from backend.services.embedding_cache import cached_encode
+from backend.services.pubmed_baseline import BaselineFilter, stream_baseline_file
+from backend.services.stream_pipeline import Stage, StreamPipeline, format_report
+
+
+class BaselineProgress:
+    """Per-file ingestion progress in SQLite, keyed by path and checked against size and mtime."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.getenv("BASELINE_PROGRESS_DB", "./data/baseline_progress.sqlite"))
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS baseline_files ("
+                " file TEXT PRIMARY KEY, size INTEGER, mtime REAL, status TEXT NOT NULL,"
+                " parsed INTEGER, kept INTEGER, upserted INTEGER, deleted INTEGER,"
+                " parse_seconds REAL, updated_at REAL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def is_done(self, file):
+        stat = Path(file).stat()
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT size, mtime, status FROM baseline_files WHERE file = ?", (str(file),)
+            ).fetchone()
+        return row is not None and row[2] == "done" and row[0] == stat.st_size and row[1] == stat.st_mtime
+
+    def record(self, file, status, counts=None):
+        counts = counts or {}
+        stat = Path(file).stat()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO baseline_files (file, size, mtime, status, parsed, kept, upserted, deleted,"
+                " parse_seconds, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(file) DO UPDATE SET size = excluded.size, mtime = excluded.mtime,"
+                " status = excluded.status, parsed = excluded.parsed, kept = excluded.kept,"
+                " upserted = excluded.upserted, deleted = excluded.deleted,"
+                " parse_seconds = excluded.parse_seconds, updated_at = excluded.updated_at",
+                (str(file), stat.st_size, stat.st_mtime, status, counts.get("parsed"), counts.get("kept"),
+                 counts.get("upserted"), counts.get("deleted"), counts.get("parse_seconds"), time.time())
+            )
+            conn.commit()
+
+    def summary(self):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT status, COUNT(*), SUM(parsed), SUM(kept), SUM(upserted) FROM baseline_files GROUP BY status"
+            ).fetchall()
+        return {status: {"files": files, "parsed": parsed, "kept": kept, "upserted": upserted}
+                for status, files, parsed, kept, upserted in rows}
+
+
+class BaselineIngestionPipeline:
+    """
+    Streams local baseline/update files into the vector database:
+    parse (process pool) -> load -> embed batches -> upsert batches.
+
+    Parsers send their kept articles in chunks of `parse_chunk_size` and
+    run at most `read_ahead` chunks ahead of the pipeline, so memory stays
+    flat whatever the file sizes. One upsert worker applies every write in
+    file order: a file's upserts, then its DeleteCitation list, then the
+    next file's. Later revisions therefore always win, and a deleted
+    article is only re-added by a later file. `upsert_workers` is the
+    number of concurrent requests within each upsert batch.
+    """
+
+    def __init__(self, files, rules=None, workers=None, embedding_model_id="pubmedbert",
+                 embed_batch_size=64, upsert_batch_size=200, upsert_workers=2, queue_size=4,
+                 namespace="pubmed-articles", progress=None, index_text=None,
+                 parse_chunk_size=1000, read_ahead=2):
+        # Baseline and update files are numbered; applying them in order keeps deletions correct.
+        self.files = sorted(str(f) for f in files)
+        self.rules = rules or BaselineFilter()
+        self.workers = workers or os.cpu_count() or 1
+        self.embedding_model_id = embedding_model_id
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.upsert_workers = upsert_workers
+        self.queue_size = queue_size
+        self.namespace = namespace
+        self.progress = progress or BaselineProgress()
+        self.parse_chunk_size = parse_chunk_size
+        self.read_ahead = read_ahead
+        # index_text=False skips the BM25 index read by hybrid queries (on by default)
+        self.vector_db_service = VectorDBService(index_text=index_text)
+
+        self._lock = threading.Lock()
+        self._files = {}
+        self._pending = []
+
+    def _parsed_files(self, files):
+        """
+        ("articles", index, chunk) items, then one ("done", index, summary)
+        per file, in file order; a file that cannot be parsed ends with
+        ("error", index, message) instead, and the next file follows. Up to
+        `workers` files are parsed at once, each through its own queue of
+        `read_ahead` chunks.
+        """
+        # The manager exits first, so parsers blocked on a full queue fail
+        # instead of hanging the executor's shutdown if the stream stops early.
+        with ProcessPoolExecutor(max_workers=self.workers) as executor, Manager() as manager:
+            def submit(index, file):
+                out = manager.Queue(maxsize=self.read_ahead)
+                future = executor.submit(stream_baseline_file, file, self.rules, out, self.parse_chunk_size)
+                return index, out, future
+
+            pending = iter(enumerate(files))
+            in_flight = [submit(index, file) for index, file in islice(pending, self.workers)]
+            while in_flight:
+                index, out, future = in_flight.pop(0)
+                in_flight.extend(submit(next_index, file) for next_index, file in islice(pending, 1))
+                while True:
+                    kind, payload = self._receive(out, future)
+                    yield kind, index, payload
+                    if kind in ("done", "error"):
+                        break
+
+    @staticmethod
+    def _receive(out, future):
+        """Next message from a parser, or an ("error", message) if its process died without finishing."""
+        while True:
+            try:
+                return out.get(timeout=1.0)
+            except queue.Empty:
+                if future.done():
+                    error = future.exception()
+                    if error is None:
+                        return "error", "parser exited without reporting its results"
+                    return "error", f"{type(error).__name__}: {error}"
+
+    # --- Stages ---
+    def _load_file(self, item):
+        kind, index, payload = item
+        with self._lock:
+            state = self._files.setdefault(index, {
+                "file": self._pending[index], "parsed": 0, "kept": 0, "deleted": 0, "parse_seconds": 0.0,
+                "outstanding": 0, "upserted": 0, "failed": 0, "finished": False, "error": None})
+            if kind == "articles":
+                state["outstanding"] += len(payload)
+            elif kind == "done":
+                state.update(parsed=payload["parsed"], kept=payload["kept"], deleted=len(payload["deleted"]),
+                             parse_seconds=payload["seconds"])
+            else:
+                state["error"] = payload
+        if kind == "articles":
+            return [("article", index, article) for article in payload]
+        if kind == "error":
+            # Its DeleteCitation list is unknown, so nothing is deleted; the file is recorded as
+            # failed once the articles already read are written, and a re-run parses it again.
+            print(f"Failed to parse {Path(self._pending[index]).name}: {payload}")
+            return [("end", index, [])]
+        # Sent on behind the file's articles; the upsert stage applies the deletions after them.
+        return [("end", index, payload["deleted"])]
+
+    def _embed_batch(self, items):
+        articles = [article for kind, _, article in items if kind == "article"]
+        embeddings = iter(cached_encode(
+            self.embedding_model_id,
+            [f"{article['title']}. {article['abstract']}" for article in articles]
+        ) if articles else ())
+        return [(kind, index, EmbeddingPipeline._to_vector(payload, next(embeddings)) if kind == "article" else payload)
+                for kind, index, payload in items]
+
+    def _upsert_batch(self, items):
+        vectors = []
+        for kind, index, payload in items:
+            if kind == "article":
+                vectors.append((index, payload))
+                continue
+            self._upsert(vectors)
+            vectors = []
+            if payload:
+                self.vector_db_service.delete_vectors([f"pmid-{pmid}" for pmid in payload], namespace=self.namespace)
+            self._finish(index)
+        self._upsert(vectors)
+        return None
+
+    def _upsert(self, vectors):
+        if not vectors:
+            return
+        # Requests within a batch run concurrently, so only the latest record of each PMID is sent.
+        latest = {vector["id"]: vector for _, vector in vectors}
+        concurrency = 1 if self.vector_db_service.mock_mode else self.upsert_workers
+        report = self.vector_db_service.bulk_upsert(list(latest.values()), namespace=self.namespace,
+                                                    max_concurrency=concurrency)
+        ok = not report["failed_batches"]
+        for failure in report["failed_batches"]:
+            print(f"Batch {failure['batch']} failed after {failure['attempts']} attempts: {failure['error']}")
+        with self._lock:
+            for index, _ in vectors:
+                state = self._files[index]
+                state["outstanding"] -= 1
+                state["upserted" if ok else "failed"] += 1
+
+    def _finish(self, index):
+        with self._lock:
+            state = self._files[index]
+            state["finished"] = True
+            self._completed += 1
+            completed = self._completed
+        status = "done" if not state["error"] and state["failed"] == 0 and state["outstanding"] == 0 else "failed"
+        self.progress.record(state["file"], status, state)
+        print(f"[{completed}/{self._total}] {Path(state['file']).name}: {status}, {state['kept']}/{state['parsed']} kept, "
+              f"{state['upserted']} upserted, {state['deleted']} deleted, parsed in {state['parse_seconds']:.1f}s")
+
+    def run(self):
+        pending = [file for file in self.files if not self.progress.is_done(file)]
+        print(f"{len(self.files) - len(pending)} of {len(self.files)} files already ingested; "
+              f"parsing {len(pending)} with {self.workers} processes.")
+        self._files, self._pending = {}, pending
+        self._total, self._completed = len(pending), 0
+        if not pending:
+            return None
+
+        stages = [
+            Stage("load", self._load_file),
+            Stage("embed", self._embed_batch, batch_size=self.embed_batch_size),
+            # A single writer keeps upserts and deletions in file order.
+            Stage("upsert", self._upsert_batch, batch_size=self.upsert_batch_size),
+        ]
+        report = StreamPipeline(stages, queue_size=self.queue_size).run(self._parsed_files(pending))
+        # A local (mock-mode) store is written to VECTOR_DB_SNAPSHOT_DIR for the next process.
+        self.vector_db_service.persist()
+        print(format_report(report))
+
+        for state in self._files.values():
+            if not state["finished"]:
+                # Some of its articles were lost to a failed stage call; a re-run redoes the file.
+                self.progress.record(state["file"], "incomplete", state)
+        report["files"] = self.progress.summary()
+        print(json.dumps(report["files"], indent=2))
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="baseline/update .xml.gz files")
+    parser.add_argument("--mesh", action="append", default=[], help="MeSH descriptor to keep (repeatable)")
+    parser.add_argument("--keyword", action="append", default=[], help="keyword to keep (repeatable)")
+    parser.add_argument("--rules", help='JSON file: {"mesh": [...], "keywords": [...]}')
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: all cores)")
+    parser.add_argument("--embedding-model-id", default="pubmedbert")
+    parser.add_argument("--embed-batch-size", type=int, default=64)
+    parser.add_argument("--no-index-text", dest="index_text", action="store_false", default=None,
+                        help="don't write titles/abstracts to the BM25 index used by hybrid queries")
+    args = parser.parse_args()
+
+    mesh, keywords = list(args.mesh), list(args.keyword)
+    if args.rules:
+        rules = json.loads(Path(args.rules).read_text())
+        mesh += rules.get("mesh", [])
+        keywords += rules.get("keywords", [])
+
+    pipeline = BaselineIngestionPipeline(
+        args.files,
+        rules=BaselineFilter(mesh_terms=mesh, keywords=keywords),
+        workers=args.workers,
+        embedding_model_id=args.embedding_model_id,
+        embed_batch_size=args.embed_batch_size,
+        index_text=args.index_text,
+    )
+    pipeline.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,111 +1,238 @@
 # backend/ai/embedding_pipeline.py
 
 import sys
+import threading
+from datetime import date
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 
 from backend.services.pubmed_service import PubMedService
 from backend.services.vector_db_service import VectorDBService
-from sentence_transformers import SentenceTransformer
-import torch
+from backend.services.embedding_cache import cached_encode, embedding_cache
+from backend.services.stream_pipeline import Stage, StreamPipeline, format_report
+from backend.services.pubmed_sync_state import PubMedSyncState, article_hash
 
 class EmbeddingPipeline:
-    def __init__(self, search_query: str, max_articles: int = 100):
+    """
+    Streams PubMed articles into the vector database.
+
+    Stages (fetch pages -> parse -> embed batches -> upsert batches) run on
+    their own worker threads, connected by bounded queues, so NCBI I/O,
+    embedding and upserts overlap and only a few pages are in memory at once.
+
+    With `incremental=True`, only records added or revised since the last
+    complete sync of the query are fetched, and of those only the ones whose
+    content changed are embedded and upserted. `max_articles` caps the first
+    sync only; later runs page through the whole delta.
+    """
+
+    def __init__(self, search_query: str, max_articles: int = 100, embedding_model_id: str = "pubmedbert",
+                 page_size: int = 200, embed_batch_size: int = 64, upsert_batch_size: int = 200,
+                 fetch_workers: int = 2, upsert_workers: int = 2, queue_size: int = 4,
+                 namespace: str = "pubmed-articles", checkpoint=None, incremental: bool = False,
+                 sync_state=None, index_text=None):
         self.search_query = search_query
         self.max_articles = max_articles
+        self.page_size = page_size
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.fetch_workers = fetch_workers
+        self.upsert_workers = upsert_workers
+        self.queue_size = queue_size
+        self.namespace = namespace
+        # Optional JobCheckpoint (see ai/ingestion_jobs.py): skips and records finished work
+        self.checkpoint = checkpoint
+        # Per-query high-water mark and known PMIDs for incremental syncs
+        self.incremental = incremental
+        self.sync_state = sync_state or (PubMedSyncState() if incremental else None)
         
         # Initialize services
         self.pubmed_service = PubMedService()
-        self.vector_db_service = VectorDBService()
+        # index_text=False skips the BM25 index read by hybrid queries (on by default)
+        self.vector_db_service = VectorDBService(index_text=index_text)
         
-        # Initialize embedding model
-        # Using a model compatible with the 768 dimension set in pinecone
-        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        print(f"Using device: {self.device}")
-        self.embedding_model = SentenceTransformer(
-            'microsoft/BiomedNLP-PubMedBERT-base-uncased-abstract-fulltext',
-            device=self.device
+        # Embedding model id from llm_config.json; compatible with the 768 dimension set in pinecone.
+        # The model itself is loaded once per process by the shared registry.
+        self.embedding_model_id = embedding_model_id
+
+        self._upsert_lock = threading.Lock()
+        self._upsert_totals = {}
+        self._sync_lock = threading.Lock()
+        self._pending_hashes = {}
+        self._sync_counts = {}
+
+    # --- Stages ---
+    def _fetch_page(self, page):
+        if isinstance(page, dict):
+            # A page of a result set held on the NCBI history server
+            return [(None, self.pubmed_service.fetch_history_page(page))]
+        return [(page, self.pubmed_service.fetch_records(page))]
+
+    def _parse_page(self, page):
+        # Records are parsed while they stream in during fetch; this stage selects and checkpoints
+        pmids, articles = page
+        # Articles without an abstract are not embedded
+        with_abstract = [article for article in articles if article['abstract']]
+        if self.checkpoint is not None and pmids is not None:
+            embedded = {article['pmid'] for article in with_abstract}
+            self.checkpoint.mark_skipped([pmid for pmid in pmids if pmid not in embedded])
+        if self.incremental:
+            with_abstract = self._select_changed(with_abstract)
+        return with_abstract
+
+    def _select_changed(self, articles):
+        """Keeps the articles that are new for this query or whose content changed since the last sync."""
+        known = self.sync_state.known_hashes(self.search_query, [article['pmid'] for article in articles])
+        changed = []
+        with self._sync_lock:
+            for article in articles:
+                content_hash = article_hash(article)
+                previous = known.get(article['pmid'])
+                outcome = "new" if previous is None else "revised" if previous != content_hash else "unchanged"
+                self._sync_counts[outcome] = self._sync_counts.get(outcome, 0) + 1
+                if outcome != "unchanged":
+                    self._pending_hashes[article['pmid']] = content_hash
+                    changed.append(article)
+        return changed
+
+    def _embed_batch(self, articles):
+        # Abstracts embedded by an earlier run come straight from the embedding cache
+        embeddings = cached_encode(
+            self.embedding_model_id,
+            [f"{article['title']}. {article['abstract']}" for article in articles]
         )
+        return [self._to_vector(article, embedding) for article, embedding in zip(articles, embeddings)]
+
+    def _upsert_batch(self, vectors):
+        # Payload-sized batches, sent with retries on transient errors
+        report = self.vector_db_service.bulk_upsert(vectors, namespace=self.namespace, max_concurrency=1)
+        with self._upsert_lock:
+            for key in ("vectors", "upserted", "batches", "retries"):
+                self._upsert_totals[key] = self._upsert_totals.get(key, 0) + report[key]
+        for failure in report['failed_batches']:
+            print(f"Batch {failure['batch']} failed after {failure['attempts']} attempts: {failure['error']}")
+        if not report['failed_batches']:
+            pmids = [vector['id'][len("pmid-"):] for vector in vectors]
+            if self.checkpoint is not None:
+                self.checkpoint.mark_upserted(pmids)
+            if self.incremental:
+                with self._sync_lock:
+                    hashes = {pmid: self._pending_hashes.pop(pmid) for pmid in pmids if pmid in self._pending_hashes}
+                self.sync_state.mark_ingested(self.search_query, hashes)
+        return None
 
-    def run(self):
+    @staticmethod
+    def _to_vector(article, embedding):
+        return {
+            "id": f"pmid-{article['pmid']}",
+            "values": embedding.tolist(),
+            "metadata": {
+                "title": article['title'],
+                "abstract": article['abstract'],
+                "journal": article['journal'],
+                # Stored as a number so range filters ($gte/$lt) work on it
+                "year": int(article['year']) if str(article.get('year', '')).isdigit() else article.get('year'),
+                "authors": ", ".join(article.get('authors', [])[:3]), # Store first 3 authors
+                "source": "PubMed"
+            }
+        }
+
+    def build_stages(self):
+        # The mock-mode local index is not thread-safe, so it gets a single upsert worker
+        upsert_workers = 1 if self.vector_db_service.mock_mode else self.upsert_workers
+        return [
+            Stage("fetch", self._fetch_page, workers=self.fetch_workers),
+            Stage("parse", self._parse_page),
+            Stage("embed", self._embed_batch, batch_size=self.embed_batch_size),
+            Stage("upsert", self._upsert_batch, workers=upsert_workers, batch_size=self.upsert_batch_size),
+        ]
+
+    def run(self, article_ids=None):
         """
         Runs the full embedding pipeline.
-        1. Searches for articles on PubMed.
-        2. Fetches article details.
-        3. Generates embeddings for title and abstract.
-        4. Upserts the embeddings into the vector database.
+        1. Searches for articles on PubMed, keeping the result set on the NCBI
+           history server (unless `article_ids` are given). Incremental runs
+           search only for records added or revised since the high-water mark.
+        2. Streams result pages through fetch, parse, embed and upsert stages,
+           leaving out work the checkpoint already records as done.
+        3. Reports per-stage throughput and stall times.
         """
         print(f"Starting embedding pipeline for query: '{self.search_query}'")
         
         # 1. Search for articles
-        article_ids = self.pubmed_service.search_articles(
-            query=self.search_query,
-            max_results=self.max_articles
-        )
-        if not article_ids:
+        sync_started = date.today().strftime("%Y/%m/%d")
+        since = self.sync_state.high_water(self.search_query) if self.incremental else None
+        if article_ids is None and self.checkpoint is None:
+            if since:
+                # The whole delta is paged: the mark only moves past records that were processed.
+                print(f"Incremental sync: records added or revised since {since}.")
+                pages = self.pubmed_service.update_pages(self.search_query, since, page_size=self.page_size)
+                truncated = False
+            else:
+                history = self.pubmed_service.search_history(self.search_query)
+                pages = self.pubmed_service.history_pages(
+                    self.search_query, max_results=self.max_articles, page_size=self.page_size, history=history
+                )
+                # A first sync capped by max_articles leaves older records out.
+                truncated = history["count"] > self.max_articles
+            found = sum(page["retmax"] for page in pages)
+        else:
+            if article_ids is None:
+                article_ids = self.pubmed_service.search_articles(
+                    query=self.search_query,
+                    max_results=self.max_articles
+                )
+            if self.checkpoint is not None:
+                pages = self.checkpoint.pending_pages()
+            else:
+                pages = (article_ids[i:i + self.page_size] for i in range(0, len(article_ids), self.page_size))
+            found = len(article_ids)
+            truncated = False
+        if not found:
             print("No articles found for the query.")
-            return
+            if self.incremental:
+                self.sync_state.set_high_water(self.search_query, sync_started)
+            return None
             
-        print(f"Found {len(article_ids)} articles.")
-
-        # 2. Fetch article details
-        articles = self.pubmed_service.fetch_article_details(article_ids)
-        if not articles:
-            print("Could not fetch article details.")
-            return
+        print(f"Found {found} articles.")
 
-        print(f"Successfully fetched details for {len(articles)} articles.")
+        # 2. Stream pages through the stages
+        self._upsert_totals = {}
+        self._pending_hashes = {}
+        self._sync_counts = {}
+        report = StreamPipeline(self.build_stages(), queue_size=self.queue_size).run(pages)
+        report["upsert"] = dict(self._upsert_totals)
+        # A local (mock-mode) store is written to VECTOR_DB_SNAPSHOT_DIR for the next process.
+        self.vector_db_service.persist()
 
-        # 3. Generate embeddings
-        print("Generating embeddings...")
-        texts_to_embed = [
-            f"{article['title']}. {article['abstract']}" for article in articles
-            if article['abstract']
-        ]
-        
-        # Filter out articles that had no abstract
-        articles_with_text = [
-            article for article in articles if article['abstract']
-        ]
-
-        embeddings = self.embedding_model.encode(
-            texts_to_embed,
-            show_progress_bar=True,
-            convert_to_tensor=True
+        # 3. Report
+        print(format_report(report))
+        upserted = report["upsert"].get("upserted", 0)
+        print(
+            f"Upserted {upserted}/{report['upsert'].get('vectors', 0)} vectors "
+            f"({upserted / report['seconds'] if report['seconds'] else 0.0:.1f} vectors/s end to end, "
+            f"{report['upsert'].get('retries', 0)} retries)."
         )
-        print(f"Generated {len(embeddings)} embeddings.")
-
-        # 4. Prepare and upsert vectors
-        vectors_to_upsert = []
-        for i, article in enumerate(articles_with_text):
-            vector = {
-                "id": f"pmid-{article['pmid']}",
-                "values": embeddings[i].tolist(),
-                "metadata": {
-                    "title": article['title'],
-                    "journal": article['journal'],
-                    "year": article.get('year'),
-                    "authors": ", ".join(article.get('authors', [])[:3]), # Store first 3 authors
-                    "source": "PubMed"
-                }
-            }
-            vectors_to_upsert.append(vector)
-            
-        if not vectors_to_upsert:
-            print("No vectors to upsert.")
-            return
-
-        print(f"Preparing to upsert {len(vectors_to_upsert)} vectors to Pinecone...")
-        
-        # Upsert in batches to avoid overwhelming the API
-        batch_size = 100
-        for i in range(0, len(vectors_to_upsert), batch_size):
-            batch = vectors_to_upsert[i:i + batch_size]
-            self.vector_db_service.upsert_vectors(batch, namespace="pubmed-articles")
-            print(f"Upserted batch {i//batch_size + 1}")
+        if embedding_cache is not None:
+            cache_stats = embedding_cache.stats()
+            print(f"Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses.")
 
-        print("Embedding pipeline completed successfully! 🎉")
+        failed_calls = sum(stats["errors"] for stats in report["stages"].values())
+        if self.incremental:
+            report["sync"] = {"since": since, **self._sync_counts}
+            print(f"Sync delta: {self._sync_counts.get('new', 0)} new, {self._sync_counts.get('revised', 0)} revised, "
+                  f"{self._sync_counts.get('unchanged', 0)} unchanged.")
+            # Only a complete sync moves the high-water mark; otherwise the next run retries the window.
+            if not failed_calls and not self._pending_hashes and not truncated:
+                self.sync_state.set_high_water(self.search_query, sync_started)
+            elif truncated:
+                print(f"First sync stopped at max_articles={self.max_articles}; the high-water mark was not set.")
+        if failed_calls:
+            print(f"Embedding pipeline finished with {failed_calls} failed stage call(s); their articles were not ingested.")
+        else:
+            print("Embedding pipeline completed successfully! 🎉")
+        return report
 
 
 if __name__ == '__main__':
@@ -126,5 +253,8 @@ if __name__ == '__main__':
         "((irritable bowel syndrome) OR (IBD) OR (Crohn's disease) OR (ulcerative colitis))"
     )
 
-    pipeline = EmbeddingPipeline(search_query=LBP_QUERY, max_articles=1000)
+    # Pass --incremental to fetch only what was added or revised since the last run,
+    # and --no-index-text to skip the BM25 index used by hybrid queries.
+    pipeline = EmbeddingPipeline(search_query=LBP_QUERY, max_articles=1000, incremental="--incremental" in sys.argv[1:],
+                                 index_text=False if "--no-index-text" in sys.argv[1:] else None)
     pipeline.run()
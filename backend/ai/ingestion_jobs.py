@@ -0,0 +1,313 @@
+# backend/ai/ingestion_jobs.py
+"""
+Resumable, checkpointed literature ingestion jobs.
+
+A job runs EmbeddingPipeline for one PubMed query. The search result, the
+PMIDs already upserted (or skipped for lack of an abstract) and the pages
+fully done are checkpointed in SQLite, so a restarted or resumed job only
+fetches, embeds and upserts the remaining work.
+
+Usage:
+    python backend/ai/ingestion_jobs.py start "microbiome AND IBD" --max-articles 1000
+    python backend/ai/ingestion_jobs.py resume <job_id>
+    python backend/ai/ingestion_jobs.py status <job_id>
+    python backend/ai/ingestion_jobs.py list
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from backend.ai.embedding_pipeline import EmbeddingPipeline
+
+DEFAULT_JOB_DB = os.getenv("INGESTION_JOB_DB", "./data/ingestion_jobs.sqlite")
+
+
+class IngestionJobStore:
+    """Durable job state: job rows, per-PMID outcomes and completed page offsets."""
+
+    def __init__(self, path=DEFAULT_JOB_DB):
+        self.path = Path(path)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY, query TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL,"
+                " pmids TEXT, report TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS job_articles ("
+                " job_id TEXT NOT NULL, pmid TEXT NOT NULL, status TEXT NOT NULL, PRIMARY KEY (job_id, pmid));"
+                "CREATE TABLE IF NOT EXISTS job_pages ("
+                " job_id TEXT NOT NULL, page_offset INTEGER NOT NULL, PRIMARY KEY (job_id, page_offset));"
+            )
+            self._conn = conn
+        return self._conn
+
+    def create(self, query, params):
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO jobs (job_id, query, params, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, query, json.dumps(params), "pending", now, now)
+            )
+            conn.commit()
+        return job_id
+
+    def update(self, job_id, **fields):
+        """Sets job columns; `pmids` and `report` are stored as JSON."""
+        for name in ("pmids", "report"):
+            if name in fields and fields[name] is not None:
+                fields[name] = json.dumps(fields[name])
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", [*fields.values(), job_id])
+            conn.commit()
+
+    def load(self, job_id):
+        """Returns the job row with parsed params/pmids/report, or None."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT job_id, query, params, status, pmids, report, error, created_at, updated_at"
+                " FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, query, params, status, pmids, report, error, created_at, updated_at = row
+        return {
+            "job_id": job_id, "query": query, "params": json.loads(params), "status": status,
+            "pmids": json.loads(pmids) if pmids else None, "report": json.loads(report) if report else None,
+            "error": error, "created_at": created_at, "updated_at": updated_at,
+        }
+
+    def job_ids(self):
+        with self._lock:
+            rows = self._connect().execute("SELECT job_id FROM jobs ORDER BY created_at DESC").fetchall()
+        return [row[0] for row in rows]
+
+    def done_pmids(self, job_id):
+        with self._lock:
+            rows = self._connect().execute("SELECT pmid FROM job_articles WHERE job_id = ?", (job_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def done_pages(self, job_id):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT page_offset FROM job_pages WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_articles(self, job_id, pmids, status):
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO job_articles (job_id, pmid, status) VALUES (?, ?, ?)",
+                [(job_id, pmid, status) for pmid in pmids]
+            )
+            conn.commit()
+
+    def mark_pages(self, job_id, offsets):
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_pages (job_id, page_offset) VALUES (?, ?)",
+                [(job_id, offset) for offset in offsets]
+            )
+            conn.commit()
+
+    def article_counts(self, job_id):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT status, COUNT(*) FROM job_articles WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall()
+        return dict(rows)
+
+
+class JobCheckpoint:
+    """
+    Checkpoint handed to EmbeddingPipeline for one job. Records PMIDs as they
+    are upserted or skipped, and a page offset once all of its PMIDs are done.
+    """
+
+    def __init__(self, store, job_id, pmids, page_size):
+        self.store = store
+        self.job_id = job_id
+        self.pmids = pmids
+        self.page_size = page_size
+        self._offset_of = {pmid: (i // page_size) * page_size for i, pmid in enumerate(pmids)}
+        self._done = store.done_pmids(job_id)
+        self._done_pages = store.done_pages(job_id)
+        self._lock = threading.Lock()
+
+    def pending_pages(self):
+        """Pages of PMIDs still to do; finished pages and PMIDs are left out."""
+        for offset in range(0, len(self.pmids), self.page_size):
+            if offset in self._done_pages:
+                continue
+            page = [pmid for pmid in self.pmids[offset:offset + self.page_size] if pmid not in self._done]
+            if page:
+                yield page
+
+    def mark_skipped(self, pmids):
+        self._mark(pmids, "skipped")
+
+    def mark_upserted(self, pmids):
+        self._mark(pmids, "upserted")
+
+    def _mark(self, pmids, status):
+        if not pmids:
+            return
+        self.store.mark_articles(self.job_id, pmids, status)
+        with self._lock:
+            self._done.update(pmids)
+            offsets = {self._offset_of[pmid] for pmid in pmids if pmid in self._offset_of}
+            finished = [
+                offset for offset in offsets
+                if offset not in self._done_pages
+                and all(pmid in self._done for pmid in self.pmids[offset:offset + self.page_size])
+            ]
+            self._done_pages.update(finished)
+        if finished:
+            self.store.mark_pages(self.job_id, finished)
+
+    def is_complete(self):
+        with self._lock:
+            return all(pmid in self._done for pmid in self.pmids)
+
+
+class IngestionJobRunner:
+    """
+    Starts and resumes ingestion jobs on a background worker pool, so API
+    requests return immediately with a job id.
+    """
+
+    def __init__(self, store, max_workers=1):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingestion-job")
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def create(self, query, max_articles=1000, embedding_model_id="pubmedbert", page_size=200):
+        params = {"max_articles": max_articles, "embedding_model_id": embedding_model_id, "page_size": page_size}
+        return self.store.create(query, params)
+
+    def submit(self, job_id):
+        """Runs (or resumes) `job_id` in the background. Returns False if it is already running here."""
+        with self._lock:
+            if job_id in self._active:
+                return False
+            self._active.add(job_id)
+        self.store.update(job_id, status="queued")
+        self._executor.submit(self._run_in_background, job_id)
+        return True
+
+    def _run_in_background(self, job_id):
+        try:
+            self.run(job_id)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def run(self, job_id):
+        """Runs `job_id` to completion in the calling thread, skipping checkpointed work."""
+        job = self.store.load(job_id)
+        if job is None:
+            raise ValueError(f"Ingestion job '{job_id}' not found.")
+        params = job["params"]
+        self.store.update(job_id, status="running", error=None)
+        try:
+            pipeline = EmbeddingPipeline(
+                search_query=job["query"],
+                max_articles=params["max_articles"],
+                embedding_model_id=params["embedding_model_id"],
+                page_size=params["page_size"],
+            )
+            pmids = job["pmids"]
+            if pmids is None:
+                # The search result is checkpointed too, so a resume works on the same PMIDs.
+                # search_ids raises on NCBI errors: a failed search must not be saved as "no hits".
+                pmids = pipeline.pubmed_service.search_ids(job["query"], max_results=params["max_articles"])
+                self.store.update(job_id, pmids=pmids)
+
+            checkpoint = JobCheckpoint(self.store, job_id, pmids, params["page_size"])
+            pipeline.checkpoint = checkpoint
+            report = pipeline.run(article_ids=pmids)
+            status = "completed" if checkpoint.is_complete() else "incomplete"
+            self.store.update(job_id, status=status, report=report)
+        except Exception as e:
+            self.store.update(job_id, status="failed", error=str(e))
+            print(f"Ingestion job {job_id} failed: {e}")
+        return self.status(job_id)
+
+    def status(self, job_id):
+        job = self.store.load(job_id)
+        if job is None:
+            return None
+        counts = self.store.article_counts(job_id)
+        pmids = job.pop("pmids")
+        job["progress"] = {
+            "total": len(pmids) if pmids is not None else None,
+            "upserted": counts.get("upserted", 0),
+            "skipped": counts.get("skipped", 0),
+            "pages_done": len(self.store.done_pages(job_id)),
+        }
+        with self._lock:
+            job["active"] = job_id in self._active
+        return job
+
+    def list(self):
+        return [self.status(job_id) for job_id in self.store.job_ids()]
+
+
+# Shared by the API; jobs run one at a time unless INGESTION_JOB_WORKERS says otherwise.
+ingestion_jobs = IngestionJobRunner(
+    IngestionJobStore(), max_workers=int(os.getenv("INGESTION_JOB_WORKERS", "1"))
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    start = commands.add_parser("start", help="create a job and run it")
+    start.add_argument("query")
+    start.add_argument("--max-articles", type=int, default=1000)
+    start.add_argument("--embedding-model-id", default="pubmedbert")
+    start.add_argument("--page-size", type=int, default=200)
+    resume = commands.add_parser("resume", help="resume a job, skipping checkpointed work")
+    resume.add_argument("job_id")
+    status = commands.add_parser("status", help="show one job")
+    status.add_argument("job_id")
+    commands.add_parser("list", help="show all jobs")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        job_id = ingestion_jobs.create(args.query, args.max_articles, args.embedding_model_id, args.page_size)
+        print(f"Created ingestion job {job_id}")
+        result = ingestion_jobs.run(job_id)
+    elif args.command == "resume":
+        result = ingestion_jobs.run(args.job_id)
+    elif args.command == "status":
+        result = ingestion_jobs.status(args.job_id)
+    else:
+        result = ingestion_jobs.list()
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# backend/benchmarks/embedding_batching_benchmark.py
+"""
+Throughput and memory benchmark for embedding generation.
+
+Compares the previous single-call path (one tokenizer call with padding to
+the longest text, one forward pass, mean pooling) against length-bucketed
+batching (encode_bucketed) on synthetic abstracts of mixed length. Each
+mode runs in its own subprocess so peak RSS is measured independently.
+
+Usage:
+    python backend/benchmarks/embedding_batching_benchmark.py --texts 2000 --token-budget 8192
+"""
+
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import numpy as np
+
+WORDS = ("gene", "resistance", "plasmid", "expression", "microbiome", "strain", "antibiotic",
+         "sequence", "protein", "pathway", "isolate", "tetW", "ermB", "mutation", "cohort", "sample")
+
+
+def make_texts(n, rng):
+    """Abstract-like texts from a few words up to ~400, skewed towards short ones."""
+    lengths = np.clip(rng.lognormal(mean=4.5, sigma=0.9, size=n), 5, 400).astype(int)
+    return [" ".join(rng.choice(WORDS, size=length)) for length in lengths]
+
+
+def encode_padded(model, texts, batch_size):
+    """The pre-bucketing path: pad every batch to its longest text, then mean-pool."""
+    import torch
+
+    transformer = model[0].auto_model
+    tokenizer = model.tokenizer
+    outputs = []
+    for i in range(0, len(texts), batch_size):
+        inputs = tokenizer(texts[i:i + batch_size], padding=True, truncation=True,
+                           max_length=model.max_seq_length, return_tensors='pt').to(model.device)
+        with torch.no_grad():
+            hidden = transformer(**inputs).last_hidden_state
+        mask = inputs['attention_mask'].unsqueeze(-1).float()
+        outputs.append(((hidden * mask).sum(1) / mask.sum(1).clamp(min=1e-9)).cpu().numpy())
+    return np.vstack(outputs)
+
+
+def run_mode(args):
+    from backend.services.embedding_model_registry import get_embedding_model
+    from backend.services.embedding_batcher import encode_bucketed
+
+    texts = make_texts(args.texts, np.random.default_rng(args.seed))
+    model = get_embedding_model(args.model_id)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if args.mode == "padded":
+        encode_padded(model, texts, args.batch_size)
+    else:
+        encode_bucketed(model, texts, token_budget=args.token_budget, max_batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is in KiB on Linux.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "mode": args.mode,
+        "texts_per_second": len(texts) / elapsed,
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss / 1024,
+        "inference_rss_mb": (peak_rss - baseline_rss) / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-id", default="minilm")
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--token-budget", type=int, default=8192)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mode", choices=["padded", "bucketed"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    print(f"{args.texts} texts, model '{args.model_id}', batch size {args.batch_size}, "
+          f"token budget {args.token_budget}\n")
+    print(f"{'mode':<10}{'texts/s':>10}{'seconds':>10}{'peak MB':>10}{'infer MB':>10}")
+    for mode in ("padded", "bucketed"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--model-id", args.model_id,
+             "--texts", str(args.texts), "--batch-size", str(args.batch_size),
+             "--token-budget", str(args.token_budget), "--seed", str(args.seed)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<10}{result['texts_per_second']:>10.1f}{result['seconds']:>10.2f}"
+              f"{result['peak_rss_mb']:>10.0f}{result['inference_rss_mb']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# backend/benchmarks/embedding_pipeline_benchmark.py
+"""
+End-to-end EmbeddingPipeline benchmark on a recorded PubMed fixture corpus.
+
+Replays the responses recorded by record_pubmed_fixtures.py (no network),
+upserts into the mock-mode local vector index and prints the per-stage
+throughput and stall report for each fixture query.
+
+Usage:
+    python backend/benchmarks/embedding_pipeline_benchmark.py --fixtures ./data/pubmed_fixtures --fetch-workers 2 4
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default="./data/pubmed_fixtures")
+    parser.add_argument("--embedding-model-id", default="pubmedbert")
+    parser.add_argument("--fetch-workers", type=int, nargs="+", default=[2])
+    parser.add_argument("--embed-batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    manifest = json.loads((Path(args.fixtures) / "fixture.json").read_text())
+    os.environ["MOCK_VECTOR_DB"] = "True"
+    os.environ.setdefault("PUBMED_EMAIL", "benchmark@example.com")
+    # Embedding-cache hits would hide the embed stage from the second run on.
+    os.environ["EMBEDDING_CACHE_PATH"] = "off"
+
+    from backend.ai.embedding_pipeline import EmbeddingPipeline
+    from backend.services.pubmed_cache import PubMedResponseCache
+
+    for query in manifest["queries"]:
+        for fetch_workers in args.fetch_workers:
+            print(f"\n=== '{query}', {fetch_workers} fetch workers ===")
+            pipeline = EmbeddingPipeline(
+                search_query=query,
+                max_articles=manifest["max_articles"],
+                embedding_model_id=args.embedding_model_id,
+                page_size=manifest["page_size"],
+                embed_batch_size=args.embed_batch_size,
+                fetch_workers=fetch_workers,
+            )
+            pipeline.pubmed_service.cache = PubMedResponseCache(args.fixtures, mode="replay")
+            pipeline.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# backend/benchmarks/embedding_quantization_benchmark.py
+"""
+Accuracy and speed check for int8 CPU inference of embedding models.
+
+Embeds a fixed set of abstracts with the fp32 model and with its dynamically
+int8-quantized variant, and reports the cosine agreement between the two
+sets of vectors, batch throughput and single-query latency. Exits non-zero
+when the mean cosine agreement falls below --min-cosine, so it can gate
+turning quantization on for a model.
+
+Usage:
+    python backend/benchmarks/embedding_quantization_benchmark.py --model-id pubmedbert --threads 4
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import numpy as np
+
+from backend.services.embedding_model_registry import embedding_models
+from backend.services.embedding_batcher import encode_bucketed
+
+ABSTRACTS = (
+    "Inflammatory bowel disease is associated with reduced diversity of the gut microbiota and depletion of butyrate-producing Firmicutes.",
+    "We characterised Faecalibacterium prausnitzii strains isolated from healthy donors and assessed their anti-inflammatory effects in a DSS colitis mouse model.",
+    "Live biotherapeutic products require strain-level characterisation, including whole-genome sequencing and screening for transferable antibiotic resistance genes.",
+    "The tetW and ermB genes were detected on mobile genetic elements in several Bifidobacterium isolates from commercial probiotic products.",
+    "Fecal microbiota transplantation resolved recurrent Clostridioides difficile infection in 85% of patients in this randomized controlled trial.",
+    "Short-chain fatty acids produced by bacterial fermentation of dietary fibre regulate regulatory T cell differentiation in the colon.",
+    "Akkermansia muciniphila abundance inversely correlated with body mass index and markers of insulin resistance in a cohort of 312 adults.",
+    "Metagenomic sequencing revealed strain-level engraftment of donor taxa that persisted for at least twelve months after transplantation.",
+    "Lactobacillus rhamnosus GG reduced the incidence of antibiotic-associated diarrhoea in children, although effect sizes varied between trials.",
+    "We developed a gnotobiotic mouse model colonised with a defined consortium of eleven human gut commensals to study colonisation resistance.",
+    "Bile acid metabolism by bacterial bile salt hydrolases modulates host lipid absorption and susceptibility to enteric pathogens.",
+    "Regulatory guidance for live biotherapeutics emphasises potency assays, identity testing and control of manufacturing-related impurities.",
+    "Oral administration of a spore-forming bacterial consortium was well tolerated in a phase 1 study in patients with ulcerative colitis.",
+    "Microbial tryptophan metabolites activate the aryl hydrocarbon receptor and strengthen intestinal epithelial barrier function.",
+    "Shotgun metagenomics of 1,200 stool samples identified species associated with response to immune checkpoint inhibitor therapy.",
+    "Stability of lyophilised bacterial formulations depended on cryoprotectant composition and residual moisture during storage.",
+    "Horizontal gene transfer between gut commensals and pathogens may disseminate antimicrobial resistance within the intestinal resistome.",
+    "Dietary intervention with resistant starch increased the relative abundance of Ruminococcus bromii and faecal butyrate concentrations.",
+    "Colonisation of germ-free mice with microbiota from patients with Crohn's disease induced more severe colitis than microbiota from healthy controls.",
+    "A machine learning classifier trained on 16S rRNA profiles distinguished colorectal cancer patients from controls with an AUC of 0.84.",
+)
+
+
+def cosine_agreement(reference, candidate):
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return np.sum(reference * candidate, axis=1)
+
+
+def throughput(model, texts, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode_bucketed(model, texts)
+    return rounds * len(texts) / (time.perf_counter() - start)
+
+
+def query_latencies_ms(model, texts):
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        encode_bucketed(model, [text])
+        latencies.append(1000.0 * (time.perf_counter() - start))
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-id", default="pubmedbert")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads (default: torch's choice)")
+    parser.add_argument("--rounds", type=int, default=5, help="passes over the abstract set for throughput")
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    import torch
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    texts = list(ABSTRACTS)
+    report = {"model_id": args.model_id, "texts": len(texts), "torch_threads": torch.get_num_threads(), "modes": {}}
+    vectors = {}
+    for mode in ("none", "int8"):
+        model = embedding_models.get(args.model_id, quantization=mode)
+        vectors[mode] = encode_bucketed(model, texts)  # also warms up
+        latencies = query_latencies_ms(model, texts)
+        report["modes"][mode] = {
+            "texts_per_second": throughput(model, texts, args.rounds),
+            "query_p50_ms": float(np.percentile(latencies, 50)),
+            "query_p95_ms": float(np.percentile(latencies, 95)),
+        }
+
+    agreement = cosine_agreement(vectors["none"], vectors["int8"])
+    report["cosine_mean"] = float(agreement.mean())
+    report["cosine_min"] = float(agreement.min())
+    report["passed"] = report["cosine_mean"] >= args.min_cosine
+    report["load_stats"] = embedding_models.stats()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"model '{args.model_id}', {len(texts)} abstracts, {report['torch_threads']} torch threads\n")
+        print(f"{'mode':<8}{'texts/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for mode, result in report["modes"].items():
+            print(f"{'fp32' if mode == 'none' else mode:<8}{result['texts_per_second']:>10.1f}"
+                  f"{result['query_p50_ms']:>10.2f}{result['query_p95_ms']:>10.2f}")
+        print(f"\ncosine agreement int8 vs fp32: mean {report['cosine_mean']:.4f}, min {report['cosine_min']:.4f} "
+              f"({'PASS' if report['passed'] else 'FAIL'} at {args.min_cosine})")
+
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == '__main__':
+    main()
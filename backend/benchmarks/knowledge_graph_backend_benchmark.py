@@ -0,0 +1,109 @@
+# backend/benchmarks/knowledge_graph_backend_benchmark.py
+"""
+Embedded (CSR) vs Neo4j knowledge graph benchmark.
+
+Loads the same synthetic graph as knowledge_graph_loader_benchmark into
+each backend with the bulk calls, then times find_papers_about_disease and
+find_strains_treating_disease for random diseases, reporting load time,
+lookups/s and p50/p95 latency, and checks both backends return the same
+results. The Neo4j run uses the database configured by NEO4J_URI /
+NEO4J_USER / NEO4J_PASSWORD with the query cache disabled, and is skipped
+when NEO4J_URI is not set. The embedded run also times a snapshot save and
+load.
+
+Usage:
+    python backend/benchmarks/knowledge_graph_backend_benchmark.py --papers 50000 --queries 2000
+    python backend/benchmarks/knowledge_graph_backend_benchmark.py --backends embedded --papers 1000000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import numpy as np
+
+from backend.benchmarks.knowledge_graph_loader_benchmark import make_graph, node_and_link_counts, load_bulk, cleanup
+from backend.services.embedded_graph_service import EmbeddedKnowledgeGraphService
+from backend.services.knowledge_graph_service import KnowledgeGraphService
+
+PREFIX = "bench-backend-"
+LOOKUPS = ("find_papers_about_disease", "find_strains_treating_disease")
+
+
+def time_lookups(kg, lookup, diseases):
+    results, latencies = {}, []
+    for disease in diseases:
+        start = time.perf_counter()
+        results[disease] = getattr(kg, lookup)(disease)
+        latencies.append(time.perf_counter() - start)
+    return results, np.array(latencies)
+
+
+def result_keys(results):
+    return {disease: sorted(row.get("pmid") or row.get("id") for row in rows) for disease, rows in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=50000)
+    parser.add_argument("--strains", type=int, default=500)
+    parser.add_argument("--diseases", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=1000, help="lookups per query type")
+    parser.add_argument("--backends", default="embedded,neo4j")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    graph = make_graph(PREFIX, args.papers, args.strains, args.diseases, rng)
+    nodes, links = node_and_link_counts(graph)
+    diseases = [graph["diseases"][i] for i in rng.integers(0, len(graph["diseases"]), size=args.queries)]
+    print(f"graph: {nodes} nodes, {links} relationships, {args.queries} lookups per query type\n")
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    if "neo4j" in backends and not os.getenv("NEO4J_URI"):
+        print("NEO4J_URI is not set; skipping the Neo4j backend.\n")
+        backends.remove("neo4j")
+
+    answers = {}
+    print(f"{'backend':<10}{'lookup':<32}{'load s':>8}{'lookups/s':>12}{'p50 ms':>9}{'p95 ms':>9}")
+    for backend in backends:
+        kg = EmbeddedKnowledgeGraphService() if backend == "embedded" else KnowledgeGraphService(cache=None)
+        try:
+            if backend == "neo4j":
+                cleanup(kg, PREFIX)
+            start = time.perf_counter()
+            load_bulk(kg, graph)
+            if backend == "embedded":
+                kg.stats()  # merges the buffered links into CSR arrays, so that counts as load time
+            load_seconds = time.perf_counter() - start
+            for lookup in LOOKUPS:
+                results, latencies = time_lookups(kg, lookup, diseases)
+                answers.setdefault(lookup, {})[backend] = result_keys(results)
+                print(f"{backend:<10}{lookup:<32}{load_seconds:>8.1f}{len(latencies) / latencies.sum():>12.0f}"
+                      f"{np.percentile(latencies, 50) * 1000:>9.3f}{np.percentile(latencies, 95) * 1000:>9.3f}")
+
+            if backend == "embedded":
+                with tempfile.TemporaryDirectory() as directory:
+                    start = time.perf_counter()
+                    kg.save(directory)
+                    save_seconds = time.perf_counter() - start
+                    start = time.perf_counter()
+                    EmbeddedKnowledgeGraphService(directory)
+                    print(f"{'':<10}snapshot save {save_seconds:.2f}s, load {time.perf_counter() - start:.2f}s")
+        finally:
+            if backend == "neo4j":
+                cleanup(kg, PREFIX)
+            kg.close()
+
+    if len(backends) > 1:
+        for lookup, by_backend in answers.items():
+            first, *others = by_backend.values()
+            mismatches = sum(other != first for other in others)
+            print(f"\n{lookup}: backends {'agree' if not mismatches else 'DISAGREE'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# backend/benchmarks/knowledge_graph_loader_benchmark.py
+"""
+Load-rate benchmark for the Neo4j knowledge graph.
+
+Generates a synthetic graph (papers, strains, diseases and the
+INVESTIGATES / STUDIES / TREATS links between them) and loads it into the
+database configured by NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD, once with
+the per-item add_*/link_* calls and once with the UNWIND-batched bulk
+calls, reporting nodes/s and relationships/s for each. Benchmark nodes use
+a "bench-" key prefix and are deleted afterwards.
+
+Usage:
+    python backend/benchmarks/knowledge_graph_loader_benchmark.py --papers 20000
+    python backend/benchmarks/knowledge_graph_loader_benchmark.py --papers 50000 --single-papers 0 --chunk-size 5000
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import numpy as np
+
+from backend.services.knowledge_graph_service import KnowledgeGraphService
+
+CLEANUP_QUERY = (
+    "MATCH (n) WHERE (n:Paper AND n.pmid STARTS WITH $prefix) OR (n:Strain AND n.id STARTS WITH $prefix)"
+    " OR (n:Disease AND n.name STARTS WITH $prefix) "
+    "CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS"
+)
+
+
+def make_graph(prefix, papers, strains, diseases, rng):
+    """Nodes and links for a synthetic graph, with 1-3 diseases and 0-2 strains per paper."""
+    strain_ids = [f"{prefix}strain-{i}" for i in range(strains)]
+    disease_names = [f"{prefix}disease-{i}" for i in range(diseases)]
+    graph = {
+        "papers": [{"pmid": f"{prefix}{i}", "title": f"Paper {i}", "abstract": "x" * 400, "year": 2000 + i % 24}
+                   for i in range(papers)],
+        "strains": [{"strain_id": strain_id, "species": f"Species {i % 50}"} for i, strain_id in enumerate(strain_ids)],
+        "diseases": disease_names,
+        "paper_diseases": [],
+        "paper_strains": [],
+        "strain_diseases": [],
+    }
+    for paper in graph["papers"]:
+        for d in rng.choice(diseases, size=int(rng.integers(1, 4)), replace=False):
+            graph["paper_diseases"].append((paper["pmid"], disease_names[d]))
+        for s in rng.choice(strains, size=int(rng.integers(0, 3)), replace=False):
+            graph["paper_strains"].append((paper["pmid"], strain_ids[s]))
+    for strain_id in strain_ids:
+        for d in rng.choice(diseases, size=int(rng.integers(1, 4)), replace=False):
+            graph["strain_diseases"].append((strain_id, disease_names[d]))
+    return graph
+
+
+def node_and_link_counts(graph):
+    nodes = len(graph["papers"]) + len(graph["strains"]) + len(graph["diseases"])
+    links = len(graph["paper_diseases"]) + len(graph["paper_strains"]) + len(graph["strain_diseases"])
+    return nodes, links
+
+
+def load_single(kg, graph):
+    start = time.perf_counter()
+    for paper in graph["papers"]:
+        kg.add_paper(paper["pmid"], paper["title"], paper["abstract"], paper["year"])
+    for strain in graph["strains"]:
+        kg.add_strain(strain["strain_id"], strain["species"])
+    for name in graph["diseases"]:
+        kg.add_disease(name)
+    node_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for pmid, disease_name in graph["paper_diseases"]:
+        kg.link_paper_to_disease(pmid, disease_name)
+    for pmid, strain_id in graph["paper_strains"]:
+        kg.link_paper_to_strain(pmid, strain_id)
+    for strain_id, disease_name in graph["strain_diseases"]:
+        kg.link_strain_to_disease(strain_id, disease_name)
+    return node_seconds, time.perf_counter() - start
+
+
+def load_bulk(kg, graph):
+    start = time.perf_counter()
+    kg.add_papers(graph["papers"])
+    kg.add_strains(graph["strains"])
+    kg.add_diseases(graph["diseases"])
+    node_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kg.link_papers_to_diseases(graph["paper_diseases"])
+    kg.link_papers_to_strains(graph["paper_strains"])
+    kg.link_strains_to_diseases(graph["strain_diseases"])
+    return node_seconds, time.perf_counter() - start
+
+
+def cleanup(kg, prefix):
+    with kg._driver.session() as session:
+        session.run(CLEANUP_QUERY, prefix=prefix).consume()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=20000)
+    parser.add_argument("--strains", type=int, default=500)
+    parser.add_argument("--diseases", type=int, default=200)
+    parser.add_argument("--single-papers", type=int, default=2000,
+                        help="papers loaded with the per-item calls (0 to skip; they are slow)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows per UNWIND transaction")
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark nodes in the database")
+    args = parser.parse_args()
+
+    kg = KnowledgeGraphService(**({"chunk_size": args.chunk_size} if args.chunk_size else {}))
+    rng = np.random.default_rng(42)
+    runs = []
+    if args.single_papers:
+        runs.append(("per-item", "bench-single-", args.single_papers, load_single))
+    runs.append((f"unwind x{kg.chunk_size}", "bench-bulk-", args.papers, load_bulk))
+
+    print(f"{'loader':<16}{'nodes':>10}{'rels':>10}{'nodes/s':>12}{'rels/s':>12}{'seconds':>10}")
+    try:
+        for name, prefix, papers, load in runs:
+            cleanup(kg, prefix)
+            graph = make_graph(prefix, papers, args.strains, args.diseases, rng)
+            nodes, links = node_and_link_counts(graph)
+            node_seconds, link_seconds = load(kg, graph)
+            print(f"{name:<16}{nodes:>10}{links:>10}{nodes / node_seconds:>12.0f}{links / link_seconds:>12.0f}"
+                  f"{node_seconds + link_seconds:>10.1f}")
+    finally:
+        if not args.keep:
+            for _, prefix, _, _ in runs:
+                cleanup(kg, prefix)
+        kg.close()
+
+
+if __name__ == '__main__':
+    main()
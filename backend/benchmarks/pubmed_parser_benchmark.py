@@ -0,0 +1,113 @@
+# backend/benchmarks/pubmed_parser_benchmark.py
+"""
+Speed and memory benchmark for PubMed efetch XML parsing.
+
+Parses the same PubmedArticleSet document with the previous path
+(Entrez.read, then PubMedService.parse_record per record) and with the
+streaming iterparse parser (pubmed_xml.iter_pubmed_articles), checks that
+both produce the same records and reports articles/s and peak Python heap.
+
+Usage:
+    python backend/benchmarks/pubmed_parser_benchmark.py --articles 10000
+    python backend/benchmarks/pubmed_parser_benchmark.py --xml-file efetch_page.xml
+"""
+
+import io
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import numpy as np
+from Bio import Entrez
+
+from backend.services.pubmed_service import PubMedService
+from backend.services.pubmed_xml import iter_pubmed_articles
+
+HEADER = (
+    '<?xml version="1.0" ?>\n'
+    '<!DOCTYPE PubmedArticleSet PUBLIC "-//NLM//DTD PubMedArticle, 1st January 2019//EN" '
+    '"https://dtd.nlm.nih.gov/ncbi/pubmed/out/pubmed_190101.dtd">\n'
+    '<PubmedArticleSet>\n'
+)
+WORDS = ("microbiome", "colitis", "butyrate", "strain", "<i>Akkermansia</i>", "resistance", "cohort",
+         "trial", "metagenomic", "fibre", "barrier", "inflammation", "engraftment", "probiotic")
+
+
+def make_document(n, rng):
+    """A synthetic efetch response with structured abstracts and author lists."""
+    parts = [HEADER]
+    for pmid in range(1, n + 1):
+        sections = "".join(
+            f'<AbstractText Label="{label}">{" ".join(rng.choice(WORDS, size=40))}.</AbstractText>'
+            for label in ("BACKGROUND", "METHODS", "RESULTS", "CONCLUSIONS")
+        )
+        authors = "".join(
+            f'<Author ValidYN="Y"><LastName>Author{i}</LastName><ForeName>First{i}</ForeName></Author>'
+            for i in range(int(rng.integers(1, 12)))
+        )
+        parts.append(
+            f'<PubmedArticle><MedlineCitation Status="MEDLINE" Owner="NLM"><PMID Version="1">{pmid}</PMID>'
+            f'<Article PubModel="Print"><Journal><ISSN IssnType="Print">0000-0000</ISSN>'
+            f'<JournalIssue CitedMedium="Print"><PubDate><Year>{2000 + pmid % 24}</Year></PubDate></JournalIssue>'
+            f'<Title>Journal of Gut Microbes</Title></Journal>'
+            f'<ArticleTitle>Study {pmid} of {" ".join(rng.choice(WORDS, size=8))}</ArticleTitle>'
+            f'<Abstract>{sections}</Abstract><AuthorList CompleteYN="Y">{authors}</AuthorList>'
+            f'<Language>eng</Language></Article></MedlineCitation></PubmedArticle>\n'
+        )
+    parts.append('</PubmedArticleSet>\n')
+    return "".join(parts).encode("utf-8")
+
+
+def parse_entrez(document, service):
+    records = Entrez.read(io.BytesIO(document))['PubmedArticle']
+    return [service.parse_record(record) for record in records]
+
+
+def parse_streaming(document, service):
+    return list(iter_pubmed_articles(io.BytesIO(document)))
+
+
+def measure(parse, document, service, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        articles = parse(document, service)
+    seconds = (time.perf_counter() - start) / rounds
+
+    tracemalloc.start()
+    parse(document, service)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return articles, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--xml-file", help="parse a saved efetch response instead of a synthetic one")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.xml_file:
+        document = Path(args.xml_file).read_bytes()
+    else:
+        document = make_document(args.articles, np.random.default_rng(42))
+    service = PubMedService(email="benchmark@example.com")
+
+    results = {}
+    print(f"document: {len(document) / 2**20:.1f} MB\n")
+    print(f"{'parser':<12}{'articles':>10}{'articles/s':>12}{'peak MB':>10}")
+    for name, parse in (("entrez.read", parse_entrez), ("iterparse", parse_streaming)):
+        articles, seconds, peak = measure(parse, document, service, args.rounds)
+        results[name] = articles
+        print(f"{name:<12}{len(articles):>10}{len(articles) / seconds:>12.0f}{peak / 2**20:>10.1f}")
+
+    mismatches = sum(a != b for a, b in zip(results["entrez.read"], results["iterparse"]))
+    mismatches += abs(len(results["entrez.read"]) - len(results["iterparse"]))
+    print(f"\nrecords differing between parsers: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# backend/benchmarks/quantization_benchmark.py
+"""
+Memory vs. recall benchmark for quantized local vector storage.
+
+Loads the same synthetic corpus into the float32 LocalVectorIndex and into
+QuantizedVectorIndex configurations (sq8, pq, with and without float32
+re-ranking) and reports bytes held, recall@k against the exact float32
+scan, and query latency.
+
+Usage:
+    python backend/benchmarks/quantization_benchmark.py --vectors 100000 --pq-subvectors 48 96
+"""
+
+import sys
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import numpy as np
+
+from backend.services.local_vector_index import LocalVectorIndex, QuantizedVectorIndex
+from backend.benchmarks.vector_index_benchmark import make_corpus, load, run_queries, recall_at_k
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--pq-subvectors", type=int, nargs="+", default=[96])
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    corpus = make_corpus(args.vectors, args.dimension, args.clusters, rng)
+    queries = make_corpus(args.queries, args.dimension, args.clusters, rng)
+
+    exact = LocalVectorIndex(dimension=args.dimension)
+    load(exact, corpus)
+    ground_truth, exact_ms = run_queries(exact, queries, args.top_k)
+    exact_bytes = exact.stats()["bytes"]
+
+    configs = [("sq8", dict(method="sq8")),
+               (f"sq8+rerank{args.rerank_factor}", dict(method="sq8", rerank_factor=args.rerank_factor))]
+    for m in args.pq_subvectors:
+        configs.append((f"pq{m}", dict(method="pq", pq_subvectors=m)))
+        configs.append((f"pq{m}+rerank{args.rerank_factor}",
+                        dict(method="pq", pq_subvectors=m, rerank_factor=args.rerank_factor)))
+
+    print(f"{args.vectors} x {args.dimension} vectors, recall@{args.top_k} against exact float32 scan\n")
+    print(f"{'index':<18}{'MB':>10}{'vs f32':>9}{'recall':>9}{'ms/query':>10}")
+    print(f"{'float32':<18}{exact_bytes / 2**20:>10.1f}{1.0:>9.2f}{1.0:>9.3f}{exact_ms:>10.2f}")
+    for name, params in configs:
+        index = QuantizedVectorIndex(dimension=args.dimension, **params)
+        load(index, corpus)
+        results, ms = run_queries(index, queries, args.top_k)
+        size = index.stats()["bytes"]
+        print(f"{name:<18}{size / 2**20:>10.1f}{size / exact_bytes:>9.2f}"
+              f"{recall_at_k(results, ground_truth):>9.3f}{ms:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# backend/benchmarks/record_pubmed_fixtures.py
+"""
+Records a PubMed fixture corpus for offline, deterministic benchmarks.
+
+Runs the esearch/efetch requests EmbeddingPipeline makes for each query
+against NCBI (cache mode "record") and stores the responses, plus a
+fixture.json manifest, in --cache-dir. Replaying the directory with
+PUBMED_CACHE_MODE=replay serves the same responses without network access.
+
+Usage:
+    python backend/benchmarks/record_pubmed_fixtures.py "microbiome AND IBD" --max-articles 2000
+    python backend/benchmarks/embedding_pipeline_benchmark.py --fixtures ./data/pubmed_fixtures
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from backend.services.pubmed_cache import PubMedResponseCache
+from backend.services.pubmed_service import PubMedService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument("--max-articles", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--cache-dir", default="./data/pubmed_fixtures")
+    args = parser.parse_args()
+
+    cache = PubMedResponseCache(args.cache_dir, mode="record")
+    service = PubMedService(cache=cache)
+    manifest = {"max_articles": args.max_articles, "page_size": args.page_size,
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "queries": {}}
+
+    for query in args.queries:
+        start = time.perf_counter()
+        # The same requests EmbeddingPipeline.run (history pages) and ingestion jobs (id search) make
+        pages = service.history_pages(query, max_results=args.max_articles, page_size=args.page_size)
+        articles = sum(len(service.fetch_history_page(page)) for page in pages)
+        pmids = service.search_articles(query, max_results=args.max_articles)
+        manifest["queries"][query] = {"pages": len(pages), "articles": articles, "pmids": len(pmids)}
+        print(f"'{query}': {articles} articles in {len(pages)} pages ({time.perf_counter() - start:.1f}s)")
+
+    manifest_path = Path(args.cache_dir) / "fixture.json"
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    print(f"Wrote {manifest_path} ({cache.misses} responses recorded)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# backend/benchmarks/vector_index_benchmark.py
+"""
+Recall@k vs. latency benchmark for the local vector indexes.
+
+Compares IVFVectorIndex at several nprobe settings against the exact
+LocalVectorIndex scan on synthetic clustered embeddings.
+
+Usage:
+    python backend/benchmarks/vector_index_benchmark.py --vectors 200000 --nlist 1024
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import numpy as np
+
+from backend.services.local_vector_index import LocalVectorIndex, IVFVectorIndex
+
+
+def make_corpus(n_vectors, dimension, n_clusters, rng):
+    """Gaussian blobs around random centres, roughly mimicking topic clusters."""
+    centres = rng.normal(size=(n_clusters, dimension)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=n_vectors)
+    noise = rng.normal(scale=0.6, size=(n_vectors, dimension)).astype(np.float32)
+    return centres[labels] + noise
+
+
+def load(index, corpus, batch_size=10000):
+    start = time.perf_counter()
+    for i in range(0, len(corpus), batch_size):
+        index.upsert([
+            {"id": f"doc-{j}", "values": corpus[j], "metadata": {}}
+            for j in range(i, min(i + batch_size, len(corpus)))
+        ])
+    return time.perf_counter() - start
+
+
+def run_queries(index, queries, top_k):
+    results = []
+    start = time.perf_counter()
+    for q in queries:
+        results.append([m["id"] for m in index.query(q, top_k=top_k)["matches"]])
+    elapsed = time.perf_counter() - start
+    return results, elapsed / len(queries) * 1000
+
+
+def recall_at_k(results, ground_truth):
+    hits = sum(len(set(r) & set(g)) for r, g in zip(results, ground_truth))
+    return hits / sum(len(g) for g in ground_truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=512)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    corpus = make_corpus(args.vectors, args.dimension, args.clusters, rng)
+    queries = make_corpus(args.queries, args.dimension, args.clusters, rng)
+
+    exact = LocalVectorIndex(dimension=args.dimension)
+    print(f"Loading {args.vectors} x {args.dimension} vectors into exact index: {load(exact, corpus):.2f}s")
+    ground_truth, exact_ms = run_queries(exact, queries, args.top_k)
+
+    ivf = IVFVectorIndex(dimension=args.dimension, nlist=args.nlist)
+    print(f"Loading + training IVF index (nlist={args.nlist}): {load(ivf, corpus):.2f}s")
+
+    print(f"\n{'index':<16}{'recall@' + str(args.top_k):>12}{'ms/query':>12}{'speedup':>10}")
+    print(f"{'exact':<16}{1.0:>12.3f}{exact_ms:>12.2f}{1.0:>10.1f}")
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        results, ivf_ms = run_queries(ivf, queries, args.top_k)
+        print(f"{'ivf/' + str(nprobe):<16}{recall_at_k(results, ground_truth):>12.3f}"
+              f"{ivf_ms:>12.2f}{exact_ms / ivf_ms:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
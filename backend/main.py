@@ -16,6 +16,7 @@ import time
 
 from backend.config import settings
 from backend.database import init_db
+from backend.services.async_knowledge_graph_service import close_async_driver
 
 # Import routers
 from backend.services.discovery_service import router as discovery_router
@@ -37,6 +38,7 @@ async def lifespan(app: FastAPI):
     print("✅ Database initialized")
     yield
     # Shutdown
+    await close_async_driver()
     print("👋 Shutting down Genskey Platform")
 
 
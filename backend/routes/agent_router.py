@@ -41,6 +41,8 @@ async def run_agent(request: AgentRequest):
             if not request.data:
                 raise HTTPException(status_code=400, detail="Data is required for data_analysis task")
             response = agent.run(question=request.prompt, data=request.data)
+        elif hasattr(agent, "arun"):
+            response = await agent.arun(request.prompt)
         else:
             response = agent.run(request.prompt)
             
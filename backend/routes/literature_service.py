@@ -5,15 +5,18 @@ Genskey Literature Service - RAG Pipeline for Scientific Literature
 - LLM-based Analysis
 """
 import os
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Body
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from backend.config import settings
+from backend.services.vector_db_service import query_pinecone_many
+from backend.services.embedding_cache import cached_encode
+from backend.services.query_embedding_batcher import embed_query
+from backend.ai.ingestion_jobs import ingestion_jobs
 from Bio import Entrez
 from pinecone import Pinecone
-from transformers import AutoTokenizer, AutoModel
-import torch
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.output_parser import StrOutputParser
@@ -44,9 +47,8 @@ else:
     print("Warning: PUBMED_EMAIL not set. NCBI may block requests.")
     Entrez.email = "default_email@example.com" # Provide a default
 
-# Sentence Transformer for Embeddings
-tokenizer = AutoTokenizer.from_pretrained('sentence-transformers/all-MiniLM-L6-v2')
-embedding_model = AutoModel.from_pretrained('sentence-transformers/all-MiniLM-L6-v2')
+# Sentence Transformer for Embeddings (loaded lazily by the shared registry on first use)
+EMBEDDING_MODEL_ID = "minilm"
 
 # LangChain LLM Setup
 llm = None
@@ -75,19 +77,54 @@ class RagQueryResponse(BaseModel):
     answer: str
     retrieved_articles: List[Article]
 
+class RagBatchQueryRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=1000, description="The questions to ask the RAG system.")
+    top_k: int = Field(3, gt=0, le=10, description="Number of relevant documents to retrieve per question.")
+    max_concurrency: int = Field(8, gt=0, le=32, description="Maximum Pinecone/LLM requests in flight.")
+
+class RagBatchQueryResponse(BaseModel):
+    results: List[RagQueryResponse]
+
+class IngestionJobRequest(BaseModel):
+    query: str = Field(..., description="The PubMed query to ingest.")
+    max_articles: int = Field(1000, gt=0, le=100000, description="Maximum number of articles to ingest.")
+    embedding_model_id: str = Field("pubmedbert", description="Embedding model id from llm_config.json.")
+    page_size: int = Field(200, gt=0, le=10000, description="PMIDs per efetch page (and checkpoint unit).")
+
 # --- Helper Functions ---
 def get_embeddings(texts: List[str]) -> List[List[float]]:
-    """Generates embeddings for a list of texts."""
-    encoded_input = tokenizer(texts, padding=True, truncation=True, return_tensors='pt')
-    with torch.no_grad():
-        model_output = embedding_model(**encoded_input)
-    
-    # Perform pooling (mean pooling)
-    token_embeddings = model_output.last_hidden_state
-    input_mask_expanded = encoded_input['attention_mask'].unsqueeze(-1).expand(token_embeddings.size()).float()
-    sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
-    sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
-    return (sum_embeddings / sum_mask).tolist()
+    """Generates (mean-pooled) embeddings for a list of texts, batched by token length."""
+    return cached_encode(EMBEDDING_MODEL_ID, texts).tolist()
+
+RAG_PROMPT_TEMPLATE = """
+    Based *only* on the following scientific abstracts, synthesize an answer to the user's question.
+    Cite the PubMed IDs (PMID) of the articles that support your answer. The PMID is the 'id' field of each article.
+    If the answer cannot be found in the provided abstracts, state that clearly.
+
+    Context from abstracts:
+    {context}
+
+    User's Question: {question}
+
+    Synthesized Answer:
+    """
+
+def build_rag_context(retrieved_docs) -> Tuple[str, List[Article]]:
+    """Turns Pinecone matches into the prompt context and the Article list returned to the client."""
+    retrieved_articles = []
+    context_parts = []
+    for doc in retrieved_docs:
+        metadata = dict(doc.get('metadata') or {})
+        article = Article(
+            id=str(doc['id']),
+            title=metadata.pop('title', ''),
+            abstract=metadata.pop('abstract', ''),
+            url=metadata.pop('url', f"https://pubmed.ncbi.nlm.nih.gov/{doc['id']}/"),
+            metadata=metadata
+        )
+        retrieved_articles.append(article)
+        context_parts.append(f"id: {article.id}\ntitle: {article.title}\nabstract: {article.abstract}")
+    return "\n\n".join(context_parts), retrieved_articles
 
 # --- API Endpoints ---
 @router.post("/literature/search-and-ingest", response_model=List[Article])
@@ -170,12 +207,13 @@ async def query_literature_rag(request: RagQueryRequest):
     if not index:
         raise HTTPException(status_code=500, detail="Pinecone index is not available.")
 
-    # 1. Get embedding for the query
-    query_embedding = get_embeddings([request.query])[0]
+    # 1. Get embedding for the query (micro-batched with concurrent requests)
+    query_embedding = await embed_query(EMBEDDING_MODEL_ID, request.query)
 
-    # 2. Query Pinecone
+    # 2. Query Pinecone (the client is blocking, so it runs in a worker thread)
     try:
-        query_result = index.query(
+        query_result = await asyncio.to_thread(
+            index.query,
             vector=query_embedding,
             top_k=request.top_k,
             include_metadata=True
@@ -188,23 +226,15 @@ async def query_literature_rag(request: RagQueryRequest):
         return RagQueryResponse(answer="Could not find relevant articles.", retrieved_articles=[])
 
     # 3. Formulate a prompt and invoke the LLM
-    prompt_template = """
-    Based *only* on the following scientific abstracts, synthesize an answer to the user's question.
-    Cite the PubMed IDs (PMID) of the articles that support your answer. The PMID is the 'id' field of each article.
-    If the answer cannot be found in the provided abstracts, state that clearly.
-
-    Context from abstracts:
-    {context}
-
-    User's Question: {question}
+    if not llm:
+        raise HTTPException(status_code=500, detail="LLM is not configured (OPENAI_API_KEY not set).")
 
-    Synthesized Answer:
-    """
-    prompt = ChatPromptTemplate.from_template(prompt_template)
+    context, retrieved_articles = build_rag_context(retrieved_docs)
+    prompt = ChatPromptTemplate.from_template(RAG_PROMPT_TEMPLATE)
     
     chain = prompt | llm | StrOutputParser()
     
-    answer = chain.invoke({
+    answer = await chain.ainvoke({
         "context": context,
         "question": request.query
     })
@@ -213,3 +243,83 @@ async def query_literature_rag(request: RagQueryRequest):
         answer=answer,
         retrieved_articles=retrieved_articles
     )
+
+
+@router.post("/literature/query-batch", response_model=RagBatchQueryResponse)
+async def query_literature_rag_batch(request: RagBatchQueryRequest):
+    """
+    Answers a whole set of questions in one round trip.
+    All questions are embedded in one pass, retrieval is fanned out to
+    Pinecone with bounded concurrency, and the LLM calls run as one batch.
+    """
+    if not index:
+        raise HTTPException(status_code=500, detail="Pinecone index is not available.")
+    if not llm:
+        raise HTTPException(status_code=500, detail="LLM is not configured (OPENAI_API_KEY not set).")
+
+    # 1. Embed every question at once (off the event loop: encoding is CPU-bound)
+    query_embeddings = await asyncio.to_thread(get_embeddings, request.queries)
+
+    # 2. Retrieve for all questions (the Pinecone client is blocking, so it runs in a worker thread)
+    try:
+        query_results = await asyncio.to_thread(
+            query_pinecone_many, index, query_embeddings, top_k=request.top_k, namespace="",
+            max_concurrency=request.max_concurrency
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to query Pinecone: {str(e)}")
+
+    # 3. Answer the questions that retrieved something, as one LLM batch
+    contexts = [build_rag_context(result.get('matches', [])) for result in query_results]
+    chain = ChatPromptTemplate.from_template(RAG_PROMPT_TEMPLATE) | llm | StrOutputParser()
+    pending = [i for i, (_, articles) in enumerate(contexts) if articles]
+    answers = await chain.abatch(
+        [{"context": contexts[i][0], "question": request.queries[i]} for i in pending],
+        config={"max_concurrency": request.max_concurrency}
+    )
+    answer_by_query = dict(zip(pending, answers))
+
+    return RagBatchQueryResponse(results=[
+        RagQueryResponse(
+            answer=answer_by_query.get(i, "Could not find relevant articles."),
+            retrieved_articles=contexts[i][1]
+        )
+        for i in range(len(request.queries))
+    ])
+
+
+@router.post("/literature/ingestion-jobs")
+async def start_ingestion_job(request: IngestionJobRequest):
+    """
+    Creates a checkpointed ingestion job and runs it on the background worker.
+    """
+    job_id = ingestion_jobs.create(
+        request.query, request.max_articles, request.embedding_model_id, request.page_size
+    )
+    ingestion_jobs.submit(job_id)
+    return ingestion_jobs.status(job_id)
+
+
+@router.post("/literature/ingestion-jobs/{job_id}/resume")
+async def resume_ingestion_job(job_id: str):
+    """
+    Resumes an interrupted or incomplete job, skipping the work it already checkpointed.
+    """
+    if ingestion_jobs.status(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job '{job_id}' not found.")
+    if not ingestion_jobs.submit(job_id):
+        raise HTTPException(status_code=409, detail=f"Ingestion job '{job_id}' is already running.")
+    return ingestion_jobs.status(job_id)
+
+
+@router.get("/literature/ingestion-jobs")
+async def list_ingestion_jobs():
+    return {"jobs": ingestion_jobs.list()}
+
+
+@router.get("/literature/ingestion-jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    job = ingestion_jobs.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job '{job_id}' not found.")
+    return job
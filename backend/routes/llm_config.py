@@ -4,6 +4,9 @@ from typing import Dict, List, Optional
 import json
 from pathlib import Path
 
+from backend.services.embedding_model_registry import embedding_models
+from backend.services.query_embedding_batcher import query_batcher_stats
+
 router = APIRouter(prefix="/api/llm-config", tags=["llm-config"])
 
 # Load configuration
@@ -142,3 +145,11 @@ async def get_usage_stats():
             "avg_daily_cost": 69.64
         }
     }
+
+@router.get("/embedding-models/stats")
+async def get_embedding_model_stats():
+    """
+    Load time and memory of the embedding models loaded in this process,
+    plus queue-depth and batch-size metrics of the query micro-batchers
+    """
+    return {"models": embedding_models.stats(), "query_batching": query_batcher_stats()}
@@ -0,0 +1,217 @@
+# backend/services/async_knowledge_graph_service.py
+
+import os
+import time
+import asyncio
+from neo4j import AsyncGraphDatabase, unit_of_work
+from dotenv import load_dotenv
+
+from backend.services.graph_query_cache import graph_query_cache, invalidate_rows
+from backend.services.knowledge_graph_service import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_RETRY_SECONDS,
+    ADD_PAPERS_QUERY,
+    ADD_STRAINS_QUERY,
+    ADD_DISEASES_QUERY,
+    LINK_PAPERS_TO_DISEASES_QUERY,
+    LINK_PAPERS_TO_STRAINS_QUERY,
+    LINK_STRAINS_TO_DISEASES_QUERY,
+    FIND_PAPERS_ABOUT_DISEASE_QUERY,
+    FIND_STRAINS_TREATING_DISEASE_QUERY,
+    CONSTRAINT_QUERIES,
+    papers_about_disease_tags,
+    strains_treating_disease_tags,
+)
+
+# Load environment variables
+load_dotenv()
+
+# At most this many sessions are open at once per process; further callers wait their turn.
+DEFAULT_MAX_SESSIONS = int(os.getenv("KG_MAX_SESSIONS", "16"))
+# Server-side transaction timeout for every query run through the async service.
+DEFAULT_QUERY_TIMEOUT = float(os.getenv("KG_QUERY_TIMEOUT_SECONDS", "15"))
+
+_driver = None
+_sessions = None
+
+
+def get_async_driver():
+    """Returns the process-wide async Neo4j driver, creating it on first use."""
+    global _driver
+    if _driver is None:
+        uri = os.getenv("NEO4J_URI")
+        user = os.getenv("NEO4J_USER")
+        password = os.getenv("NEO4J_PASSWORD")
+
+        if not all([uri, user, password]):
+            raise ValueError("NEO4J_URI, NEO4J_USER, and NEO4J_PASSWORD must be set in the environment.")
+
+        _driver = AsyncGraphDatabase.driver(
+            uri, auth=(user, password),
+            max_connection_pool_size=max(DEFAULT_MAX_SESSIONS, 1),
+            max_transaction_retry_time=DEFAULT_MAX_RETRY_SECONDS,
+        )
+    return _driver
+
+
+async def close_async_driver():
+    """Closes the shared driver, if one was created (application shutdown)."""
+    global _driver, _sessions
+    if _driver is not None:
+        await _driver.close()
+    _driver, _sessions = None, None
+
+
+def _session_slots():
+    global _sessions
+    if _sessions is None:
+        _sessions = asyncio.Semaphore(max(DEFAULT_MAX_SESSIONS, 1))
+    return _sessions
+
+
+class AsyncKnowledgeGraphService:
+    """
+    asyncio counterpart of KnowledgeGraphService for `async def` routes and
+    agents, with the same public methods as coroutines.
+
+    All instances share one driver and one bound on concurrent sessions
+    (KG_MAX_SESSIONS). Lookups run in read transactions (routed to
+    followers/read replicas in a cluster), add_*/link_* in write
+    transactions; every transaction carries a server-side timeout of
+    `query_timeout` seconds and is retried on transient errors by the driver.
+    Lookups go through the same read-through cache as the sync service.
+    """
+
+    def __init__(self, query_timeout=DEFAULT_QUERY_TIMEOUT, chunk_size=DEFAULT_CHUNK_SIZE, cache=graph_query_cache):
+        self._driver = get_async_driver()
+        self.query_timeout = query_timeout
+        self.chunk_size = chunk_size
+        self.cache = cache
+
+    async def _execute(self, access, work):
+        async with _session_slots():
+            async with self._driver.session() as session:
+                if access == "read":
+                    return await session.execute_read(work)
+                return await session.execute_write(work)
+
+    async def _read(self, query, **params):
+        @unit_of_work(timeout=self.query_timeout)
+        async def work(tx):
+            result = await tx.run(query, params)
+            return await result.data()
+
+        return await self._execute("read", work)
+
+    async def _write(self, query, **params):
+        @unit_of_work(timeout=self.query_timeout)
+        async def work(tx):
+            result = await tx.run(query, params)
+            return (await result.consume()).counters
+
+        return await self._execute("write", work)
+
+    async def create_constraints(self):
+        """Creates the unique constraints KnowledgeGraphService creates on startup."""
+        for query in CONSTRAINT_QUERIES:
+            await self._write(query)
+
+    # --- Writes ---
+    async def _write_rows(self, query, rows, chunk_size=None, touches=()):
+        """Async KnowledgeGraphService._write_rows: one write transaction per chunk of `rows`."""
+        chunk_size = chunk_size or self.chunk_size
+        stats = {"rows": len(rows), "chunks": 0, "nodes_created": 0,
+                 "relationships_created": 0, "properties_set": 0}
+        start = time.perf_counter()
+        try:
+            for i in range(0, len(rows), chunk_size):
+                counters = await self._write(query, rows=rows[i:i + chunk_size])
+                stats["chunks"] += 1
+                stats["nodes_created"] += counters.nodes_created
+                stats["relationships_created"] += counters.relationships_created
+                stats["properties_set"] += counters.properties_set
+        finally:
+            for label, field in touches:
+                invalidate_rows(self.cache, label, (row[field] for row in rows))
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+    async def add_paper(self, pmid: str, title: str, abstract: str, year: int):
+        await self.add_papers([{"pmid": pmid, "title": title, "abstract": abstract, "year": year}])
+
+    async def add_strain(self, strain_id: str, species: str):
+        await self.add_strains([{"strain_id": strain_id, "species": species}])
+
+    async def add_disease(self, name: str):
+        await self.add_diseases([name])
+
+    async def link_paper_to_disease(self, pmid: str, disease_name: str):
+        await self.link_papers_to_diseases([(pmid, disease_name)])
+
+    async def link_paper_to_strain(self, pmid: str, strain_id: str):
+        await self.link_papers_to_strains([(pmid, strain_id)])
+
+    async def link_strain_to_disease(self, strain_id: str, disease_name: str, treatment_effect: str = "treats"):
+        await self.link_strains_to_diseases([(strain_id, disease_name)])
+
+    async def add_papers(self, papers, chunk_size=None):
+        rows = [{"pmid": p["pmid"], "title": p.get("title"), "abstract": p.get("abstract"), "year": p.get("year")}
+                for p in papers]
+        return await self._write_rows(ADD_PAPERS_QUERY, rows, chunk_size, touches=[("Paper", "pmid")])
+
+    async def add_strains(self, strains, chunk_size=None):
+        rows = [{"strain_id": s["strain_id"], "species": s.get("species")} for s in strains]
+        return await self._write_rows(ADD_STRAINS_QUERY, rows, chunk_size, touches=[("Strain", "strain_id")])
+
+    async def add_diseases(self, names, chunk_size=None):
+        rows = [{"name": name} for name in names]
+        return await self._write_rows(ADD_DISEASES_QUERY, rows, chunk_size, touches=[("Disease", "name")])
+
+    async def link_papers_to_diseases(self, links, chunk_size=None):
+        rows = [{"pmid": pmid, "disease_name": disease_name} for pmid, disease_name in links]
+        return await self._write_rows(LINK_PAPERS_TO_DISEASES_QUERY, rows, chunk_size,
+                                      touches=[("Paper", "pmid"), ("Disease", "disease_name")])
+
+    async def link_papers_to_strains(self, links, chunk_size=None):
+        rows = [{"pmid": pmid, "strain_id": strain_id} for pmid, strain_id in links]
+        return await self._write_rows(LINK_PAPERS_TO_STRAINS_QUERY, rows, chunk_size,
+                                      touches=[("Paper", "pmid"), ("Strain", "strain_id")])
+
+    async def link_strains_to_diseases(self, links, chunk_size=None):
+        rows = [{"strain_id": strain_id, "disease_name": disease_name} for strain_id, disease_name in links]
+        return await self._write_rows(LINK_STRAINS_TO_DISEASES_QUERY, rows, chunk_size,
+                                      touches=[("Strain", "strain_id"), ("Disease", "disease_name")])
+
+    # --- Reads ---
+    async def _cached_read(self, query, params, to_result, tags_fn):
+        async def load():
+            return [to_result(record) for record in await self._read(query, **params)]
+
+        if self.cache is None:
+            return await load()
+        start = time.perf_counter()
+        key = self.cache.key(query, params)
+        hit, rows, generation = self.cache.lookup(key)
+        if not hit:
+            rows = await load()
+            self.cache.store(key, rows, tags_fn(rows), generation)
+        self.cache.record_latency(hit, time.perf_counter() - start)
+        # Callers get their own list, never the cached one.
+        return [dict(row) for row in rows]
+
+    async def find_papers_about_disease(self, disease_name: str):
+        return await self._cached_read(
+            FIND_PAPERS_ABOUT_DISEASE_QUERY, {"disease_name": disease_name},
+            lambda record: {"pmid": record["pmid"], "title": record["title"]},
+            lambda papers: papers_about_disease_tags(disease_name, papers)
+        )
+
+    async def find_strains_treating_disease(self, disease_name: str):
+        return await self._cached_read(
+            FIND_STRAINS_TREATING_DISEASE_QUERY, {"disease_name": disease_name},
+            lambda record: {"id": record["id"], "species": record["species"]},
+            lambda strains: strains_treating_disease_tags(disease_name, strains)
+        )
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else None
@@ -0,0 +1,206 @@
+# backend/services/bm25_index.py
+
+import os
+import re
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from backend.services.metadata_index import matches_filter
+
+# Keeps identifiers such as "GNS0042" or "tetW" as single lowercase tokens.
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+# Function words dropped from queries: ORed into a MATCH they would hit nearly every document.
+STOPWORDS = frozenset((
+    "a", "about", "after", "all", "also", "an", "and", "any", "are", "as", "at", "be", "been", "before",
+    "being", "between", "both", "but", "by", "can", "could", "did", "do", "does", "during", "each", "for",
+    "from", "had", "has", "have", "how", "if", "in", "into", "is", "it", "its", "may", "more", "most", "no",
+    "not", "of", "on", "or", "other", "over", "should", "so", "some", "such", "than", "that", "the", "their",
+    "them", "then", "there", "these", "they", "this", "those", "through", "to", "under", "was", "we", "were",
+    "what", "when", "where", "which", "while", "who", "whom", "why", "will", "with", "would",
+))
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def query_terms(text):
+    """Distinct query tokens worth matching: no stopwords or single characters."""
+    return sorted({token for token in tokenize(text) if len(token) > 1 and token not in STOPWORDS})
+
+
+class BM25Index:
+    """
+    Full-text index with BM25 ranking, backed by SQLite FTS5.
+
+    Documents are (doc_id, text, metadata) triples per namespace; re-adding
+    an existing doc_id replaces it. Each vector store has its own text
+    index: a file per Pinecone index (see for_index()), written at ingest
+    time and opened by query-side processes, or an in-memory one (`path`
+    None) that lives and is snapshotted with the local mock-mode store.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_index(cls, index_name):
+        """The text index of the Pinecone index `index_name`, under TEXT_INDEX_DIR."""
+        return cls(Path(os.getenv("TEXT_INDEX_DIR", "./data/text_index")) / f"{index_name}.sqlite")
+
+    @classmethod
+    def load(cls, path):
+        """An in-memory copy of the index saved at `path` by save()."""
+        index = cls()
+        source = sqlite3.connect(path)
+        try:
+            with index._lock:
+                source.backup(index._connect())
+        finally:
+            source.close()
+        return index
+
+    def exists(self):
+        return self.path is None or self.path.is_file()
+
+    def _connect(self):
+        if self._conn is None:
+            if self.path is None:
+                conn = sqlite3.connect(":memory:", check_same_thread=False)
+            else:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " rowid INTEGER PRIMARY KEY, namespace TEXT NOT NULL, doc_id TEXT NOT NULL, metadata TEXT,"
+                " UNIQUE (namespace, doc_id));"
+                "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(text, tokenize = 'unicode61');"
+            )
+            self._conn = conn
+        return self._conn
+
+    def save(self, path, namespaces=None):
+        """Writes the index (or only `namespaces`) to the SQLite file `path`."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and swapped in, so a reader never opens a half-written snapshot.
+        staging = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        staging.unlink(missing_ok=True)
+        target = sqlite3.connect(staging)
+        try:
+            with self._lock:
+                self._connect().backup(target)
+            if namespaces is not None:
+                placeholders = ", ".join("?" for _ in namespaces)
+                with target:
+                    target.execute(
+                        "DELETE FROM documents_fts WHERE rowid IN"
+                        f" (SELECT rowid FROM documents WHERE namespace NOT IN ({placeholders}))", list(namespaces)
+                    )
+                    target.execute(f"DELETE FROM documents WHERE namespace NOT IN ({placeholders})",
+                                   list(namespaces))
+        finally:
+            target.close()
+        os.replace(staging, path)
+
+    def _delete(self, conn, namespace, doc_ids):
+        for doc_id in doc_ids:
+            row = conn.execute(
+                "SELECT rowid FROM documents WHERE namespace = ? AND doc_id = ?", (namespace, doc_id)
+            ).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM documents_fts WHERE rowid = ?", row)
+                conn.execute("DELETE FROM documents WHERE rowid = ?", row)
+
+    def add_many(self, namespace, documents):
+        """Adds or replaces (doc_id, text, metadata) documents in one transaction."""
+        # The last version of a doc_id repeated within the batch wins.
+        documents = list({doc_id: (doc_id, text, metadata) for doc_id, text, metadata in documents}.values())
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._delete(conn, namespace, [doc_id for doc_id, _, _ in documents])
+                for doc_id, text, metadata in documents:
+                    cursor = conn.execute(
+                        "INSERT INTO documents (namespace, doc_id, metadata) VALUES (?, ?, ?)",
+                        (namespace, doc_id, json.dumps(metadata or {}, default=str))
+                    )
+                    conn.execute("INSERT INTO documents_fts (rowid, text) VALUES (?, ?)", (cursor.lastrowid, text))
+
+    def remove_many(self, namespace, doc_ids):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._delete(conn, namespace, doc_ids)
+
+    def has_documents(self, namespace):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT EXISTS (SELECT 1 FROM documents WHERE namespace = ?)", (namespace,)
+            ).fetchone()[0] == 1
+
+    def count(self, namespace):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT COUNT(*) FROM documents WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+
+    def search(self, query_text, namespace, top_k=10, filter_criteria=None):
+        """
+        Returns up to top_k documents as {"matches": [{"id", "score", "metadata"}]},
+        best first, optionally restricted by a Pinecone-style metadata filter.
+        Any query term other than a stopword may match; scores are FTS5 BM25,
+        higher is better.
+        """
+        terms = query_terms(query_text)
+        if not terms or top_k <= 0:
+            return {"matches": []}
+        expression = " OR ".join(f'"{term}"' for term in terms)
+        # The filter runs on decoded metadata, so filtered searches over-fetch
+        # in growing pages until top_k matches survive or the hits run out.
+        limit = top_k * 4 if filter_criteria else top_k
+        offset = 0
+        matches = []
+        with self._lock:
+            conn = self._connect()
+            while len(matches) < top_k:
+                rows = conn.execute(
+                    "SELECT d.doc_id, bm25(documents_fts), d.metadata FROM documents_fts"
+                    " JOIN documents d ON d.rowid = documents_fts.rowid"
+                    " WHERE documents_fts MATCH ? AND d.namespace = ? ORDER BY bm25(documents_fts) LIMIT ? OFFSET ?",
+                    (expression, namespace, limit, offset)
+                ).fetchall()
+                for doc_id, rank, metadata in rows:
+                    metadata = json.loads(metadata) if metadata else {}
+                    if filter_criteria and not matches_filter(metadata, filter_criteria):
+                        continue
+                    # FTS5 reports BM25 as a negative number, lower is better.
+                    matches.append({"id": doc_id, "score": -rank, "metadata": metadata})
+                    if len(matches) == top_k:
+                        break
+                if len(rows) < limit:
+                    break
+                offset += limit
+                limit *= 2
+        return {"matches": matches}
+
+
+def reciprocal_rank_fusion(result_lists, top_k=10, k=60):
+    """
+    Fuses ranked match lists with reciprocal-rank fusion: each document
+    scores sum(1 / (k + rank)) over the lists it appears in.
+    """
+    fused = {}
+    for matches in result_lists:
+        for rank, match in enumerate(matches, start=1):
+            doc_id = match['id']
+            entry = fused.setdefault(doc_id, {"id": doc_id, "score": 0.0, "metadata": match['metadata']})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:top_k]
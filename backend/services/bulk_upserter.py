@@ -0,0 +1,150 @@
+# backend/services/bulk_upserter.py
+
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import urllib3
+
+
+class PineconeRestIndex:
+    """
+    Minimal client for the Pinecone data-plane REST API (POST /vectors/upsert).
+
+    Anything that serves the same endpoint can stand in for Pinecone, e.g. a
+    local HTTP server in tests: point `host` at it.
+    """
+
+    def __init__(self, host, api_key=None, timeout=30.0):
+        if not host.startswith(("http://", "https://")):
+            host = f"https://{host}"
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Api-Key"] = api_key
+        self._client = httpx.Client(base_url=host, headers=headers, timeout=timeout)
+
+    def upsert(self, vectors, namespace=""):
+        response = self._client.post("/vectors/upsert", json={"vectors": vectors, "namespace": namespace})
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self._client.close()
+
+
+class BulkUpserter:
+    """
+    Concurrent, retrying bulk upserts into a Pinecone-style index.
+
+    Vectors are grouped into batches that stay under `max_batch_bytes` of
+    request payload (and `max_batch_vectors` vectors), sent by up to
+    `max_concurrency` worker threads, and retried with full-jitter
+    exponential backoff on transient errors (network failures, HTTP 429
+    and 5xx).
+    """
+
+    # Pinecone rejects upsert requests above 2 MB.
+    DEFAULT_MAX_BATCH_BYTES = 2 * 1024 * 1024 - 64 * 1024
+
+    def __init__(self, index, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES, max_batch_vectors=1000,
+                 max_concurrency=4, max_retries=5, base_delay=0.5, max_delay=30.0):
+        self.index = index
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_vectors = max_batch_vectors
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def estimate_payload_bytes(vector):
+        """Approximate JSON size of one vector: ~20 characters per float plus id and metadata."""
+        return (
+            len(vector['values']) * 20
+            + len(json.dumps(vector.get('metadata', {}), ensure_ascii=False))
+            + len(str(vector['id']))
+            + 64
+        )
+
+    def make_batches(self, vectors):
+        batches = []
+        batch, batch_bytes = [], 0
+        for vector in vectors:
+            size = self.estimate_payload_bytes(vector)
+            if batch and (batch_bytes + size > self.max_batch_bytes or len(batch) >= self.max_batch_vectors):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(vector)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    # Transport-level failures (connection resets, timeouts) of httpx, urllib3 (used by the
+    # Pinecone SDK) and the standard library; anything else without an HTTP status is a bug.
+    TRANSIENT_ERRORS = (httpx.TransportError, urllib3.exceptions.HTTPError, ConnectionError, TimeoutError)
+
+    @classmethod
+    def is_retriable(cls, error):
+        status = getattr(error, "status", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        if status is None:
+            return isinstance(error, cls.TRANSIENT_ERRORS)
+        return status == 429 or status >= 500
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _send(self, batch_no, batch, namespace):
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.index.upsert(vectors=batch, namespace=namespace)
+                return {"batch": batch_no, "vectors": len(batch), "attempts": attempt + 1,
+                        "seconds": time.perf_counter() - start, "error": None}
+            except Exception as e:
+                if attempt == self.max_retries or not self.is_retriable(e):
+                    return {"batch": batch_no, "vectors": len(batch), "attempts": attempt + 1,
+                            "seconds": time.perf_counter() - start, "error": str(e)}
+                time.sleep(self._backoff(attempt))
+
+    def upsert(self, vectors, namespace="", progress=None):
+        """
+        Upserts all `vectors` and returns a report:
+        {"vectors", "upserted", "batches", "seconds", "vectors_per_second",
+         "retries", "failed_batches": [...]}.
+        `progress`, if given, is called as progress(result, batch) for each finished batch.
+        """
+        batches = self.make_batches(vectors)
+        results = []
+        lock = threading.Lock()
+
+        def run(item):
+            batch_no, batch = item
+            result = self._send(batch_no, batch, namespace)
+            with lock:
+                results.append(result)
+            if progress:
+                progress(result, batch)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency)) as executor:
+            list(executor.map(run, enumerate(batches)))
+        elapsed = time.perf_counter() - start
+
+        results.sort(key=lambda r: r["batch"])
+        upserted = sum(r["vectors"] for r in results if r["error"] is None)
+        return {
+            "vectors": len(vectors),
+            "upserted": upserted,
+            "batches": len(batches),
+            "seconds": elapsed,
+            "vectors_per_second": upserted / elapsed if elapsed > 0 else 0.0,
+            "retries": sum(r["attempts"] - 1 for r in results),
+            "failed_batches": [r for r in results if r["error"] is not None],
+            "batch_results": results,
+        }
@@ -0,0 +1,334 @@
+# backend/services/embedded_graph_service.py
+
+import os
+import json
+import time
+import atexit
+import weakref
+import threading
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Graphs with a snapshot directory, saved at interpreter exit if they have unsaved writes.
+_open_graphs = weakref.WeakSet()
+
+
+@atexit.register
+def _save_open_graphs():
+    for graph in list(_open_graphs):
+        graph.close()
+
+
+def _as_int(value, missing=-1):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return missing
+
+
+class NodeTable:
+    """
+    Nodes of one label. Rows are dense integer ids in insertion order; the
+    key property maps to a row through a dict, string properties are kept
+    in per-column lists and integer properties in typed arrays (-1 = unset).
+    """
+
+    def __init__(self, label, key, columns=(), int_columns=()):
+        self.label = label
+        self.key = key
+        self.keys = []
+        self.rows_by_key = {}
+        self.columns = {name: [] for name in columns}
+        self.int_columns = {name: array("q") for name in int_columns}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def merge(self, key, properties=None):
+        """MERGE on the key, then SET `properties`. Returns (row, created)."""
+        row = self.rows_by_key.get(key)
+        created = row is None
+        if created:
+            row = len(self.keys)
+            self.keys.append(key)
+            self.rows_by_key[key] = row
+            for values in self.columns.values():
+                values.append(None)
+            for values in self.int_columns.values():
+                values.append(-1)
+        for name, value in (properties or {}).items():
+            if name in self.int_columns:
+                self.int_columns[name][row] = _as_int(value)
+            else:
+                self.columns[name][row] = value
+        return row, created
+
+    def rows(self, keys):
+        """Rows of `keys` as an int64 array, -1 for keys that are not nodes."""
+        return np.fromiter((self.rows_by_key.get(key, -1) for key in keys), dtype=np.int64)
+
+    def snapshot(self):
+        return {"keys": self.keys, "columns": self.columns,
+                "int_columns": {name: values.tolist() for name, values in self.int_columns.items()}}
+
+    def restore(self, data):
+        self.keys = data["keys"]
+        self.rows_by_key = {key: row for row, key in enumerate(self.keys)}
+        self.columns = data["columns"]
+        self.int_columns = {name: array("q", values) for name, values in data["int_columns"].items()}
+
+
+class CSRRelationships:
+    """
+    Relationships of one type between two node tables, in compressed sparse
+    row form: the targets of source row i are indices[indptr[i]:indptr[i + 1]].
+    New relationships are buffered and merged (deduplicated, like MERGE) on
+    the next read; the reverse (target -> sources) CSR is built on demand.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self._pending_sources = array("q")
+        self._pending_targets = array("q")
+        self._reverse = None
+
+    def __len__(self):
+        return len(self.indices)
+
+    def add(self, sources, targets):
+        self._pending_sources.frombytes(np.asarray(sources, dtype=np.int64).tobytes())
+        self._pending_targets.frombytes(np.asarray(targets, dtype=np.int64).tobytes())
+
+    def build(self, source_count, target_count):
+        """Merges buffered relationships into the CSR arrays."""
+        if not self._pending_sources and len(self.indptr) - 1 == source_count:
+            return
+        sources = np.concatenate([
+            np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int64), np.diff(self.indptr)),
+            np.frombuffer(self._pending_sources, dtype=np.int64),
+        ])
+        targets = np.concatenate([self.indices.astype(np.int64), np.frombuffer(self._pending_targets, dtype=np.int64)])
+        # One sorted, deduplicated int64 code per (source, target) pair.
+        codes = np.unique(sources * max(target_count, 1) + targets)
+        sources, targets = np.divmod(codes, max(target_count, 1))
+
+        self.indptr = np.zeros(source_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=source_count), out=self.indptr[1:])
+        self.indices = targets.astype(np.int32)
+        self._pending_sources = array("q")
+        self._pending_targets = array("q")
+        self._reverse = None
+
+    def targets_of(self, row):
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def sources_of(self, row, target_count):
+        if self._reverse is None or len(self._reverse[0]) - 1 != target_count:
+            sources = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int32), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(target_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=target_count), out=indptr[1:])
+            self._reverse = (indptr, sources[order])
+        indptr, indices = self._reverse
+        return indices[indptr[row]:indptr[row + 1]]
+
+
+class EmbeddedKnowledgeGraphService:
+    """
+    In-process knowledge graph with the public API of KnowledgeGraphService,
+    for tests and deployments without a Neo4j server.
+
+    Nodes live in NodeTables and each relationship type in a CSRRelationships
+    (INVESTIGATES Paper->Disease, STUDIES Paper->Strain, TREATS
+    Strain->Disease), so lookups are array slices rather than queries.
+    Links to missing nodes are ignored, as the Neo4j MATCH ... MERGE is.
+    Links are buffered and merged into the CSR arrays once, on the next
+    read, so a load split into many bulk calls is not rebuilt per call; the
+    relationships_created they report counts buffered links, duplicates
+    included. With `snapshot_dir` the graph is loaded from it on start and
+    saved to it on close(), or at interpreter exit if writes are unsaved.
+    """
+
+    def __init__(self, snapshot_dir=None):
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.papers = NodeTable("Paper", "pmid", columns=("title", "abstract"), int_columns=("year",))
+        self.strains = NodeTable("Strain", "id", columns=("species",))
+        self.diseases = NodeTable("Disease", "name")
+        self.relationships = {
+            "INVESTIGATES": (CSRRelationships("INVESTIGATES"), self.papers, self.diseases),
+            "STUDIES": (CSRRelationships("STUDIES"), self.papers, self.strains),
+            "TREATS": (CSRRelationships("TREATS"), self.strains, self.diseases),
+        }
+        self._lock = threading.RLock()
+        self._dirty = False
+        if self.snapshot_dir is not None:
+            if (self.snapshot_dir / "manifest.json").exists():
+                self.load(self.snapshot_dir)
+                print(f"Loaded embedded knowledge graph from '{self.snapshot_dir}'.")
+            _open_graphs.add(self)
+
+    def close(self):
+        """Saves unsaved writes to `snapshot_dir`, if the graph has one."""
+        with self._lock:
+            if self.snapshot_dir is None or not self._dirty:
+                return
+            self.save(self.snapshot_dir)
+            self._dirty = False
+
+    # --- Writes ---
+    def _merge_nodes(self, table, rows):
+        """MERGE + SET for (key, properties) rows; returns KnowledgeGraphService-style write stats."""
+        start = time.perf_counter()
+        stats = {"rows": len(rows), "chunks": 1, "nodes_created": 0, "relationships_created": 0, "properties_set": 0}
+        with self._lock:
+            self._dirty = True
+            for key, properties in rows:
+                _, created = table.merge(key, properties)
+                stats["nodes_created"] += created
+                stats["properties_set"] += sum(value is not None for value in properties.values())
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+    def _link(self, rel_type, links):
+        start = time.perf_counter()
+        relationships, sources, targets = self.relationships[rel_type]
+        stats = {"rows": len(links), "chunks": 1, "nodes_created": 0, "relationships_created": 0, "properties_set": 0}
+        with self._lock:
+            self._dirty = True
+            source_rows = sources.rows(source for source, _ in links)
+            target_rows = targets.rows(target for _, target in links)
+            found = (source_rows >= 0) & (target_rows >= 0)
+            # Buffered only; the CSR arrays are rebuilt on the next read.
+            relationships.add(source_rows[found], target_rows[found])
+            stats["relationships_created"] = int(found.sum())
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+    def add_paper(self, pmid: str, title: str, abstract: str, year: int):
+        self._merge_nodes(self.papers, [(pmid, {"title": title, "abstract": abstract, "year": year})])
+
+    def add_strain(self, strain_id: str, species: str):
+        self._merge_nodes(self.strains, [(strain_id, {"species": species})])
+
+    def add_disease(self, name: str):
+        self._merge_nodes(self.diseases, [(name, {})])
+
+    def link_paper_to_disease(self, pmid: str, disease_name: str):
+        self._link("INVESTIGATES", [(pmid, disease_name)])
+
+    def link_paper_to_strain(self, pmid: str, strain_id: str):
+        self._link("STUDIES", [(pmid, strain_id)])
+
+    def link_strain_to_disease(self, strain_id: str, disease_name: str, treatment_effect: str = "treats"):
+        self._link("TREATS", [(strain_id, disease_name)])
+
+    def add_papers(self, papers, chunk_size=None):
+        return self._merge_nodes(self.papers, [
+            (p["pmid"], {"title": p.get("title"), "abstract": p.get("abstract"), "year": p.get("year")})
+            for p in papers
+        ])
+
+    def add_strains(self, strains, chunk_size=None):
+        return self._merge_nodes(self.strains, [(s["strain_id"], {"species": s.get("species")}) for s in strains])
+
+    def add_diseases(self, names, chunk_size=None):
+        return self._merge_nodes(self.diseases, [(name, {}) for name in names])
+
+    def link_papers_to_diseases(self, links, chunk_size=None):
+        return self._link("INVESTIGATES", list(links))
+
+    def link_papers_to_strains(self, links, chunk_size=None):
+        return self._link("STUDIES", list(links))
+
+    def link_strains_to_diseases(self, links, chunk_size=None):
+        return self._link("TREATS", list(links))
+
+    # --- Reads ---
+    def _sources_of(self, rel_type, target_key):
+        relationships, sources, targets = self.relationships[rel_type]
+        with self._lock:
+            row = targets.rows_by_key.get(target_key)
+            if row is None:
+                return np.zeros(0, dtype=np.int32)
+            relationships.build(len(sources), len(targets))
+            return relationships.sources_of(row, len(targets))
+
+    def find_papers_about_disease(self, disease_name: str):
+        rows = self._sources_of("INVESTIGATES", disease_name)
+        titles = self.papers.columns["title"]
+        return [{"pmid": self.papers.keys[row], "title": titles[row]} for row in rows.tolist()]
+
+    def find_strains_treating_disease(self, disease_name: str):
+        rows = self._sources_of("TREATS", disease_name)
+        species = self.strains.columns["species"]
+        return [{"id": self.strains.keys[row], "species": species[row]} for row in rows.tolist()]
+
+    def cache_stats(self):
+        # Lookups are array slices already; there is no query cache in front of them.
+        return None
+
+    def stats(self):
+        with self._lock:
+            for relationships, sources, targets in self.relationships.values():
+                relationships.build(len(sources), len(targets))
+            return {
+                "nodes": {table.label: len(table) for table in (self.papers, self.strains, self.diseases)},
+                "relationships": {name: len(rel) for name, (rel, _, _) in self.relationships.items()},
+            }
+
+    # --- Snapshots ---
+    def save(self, directory):
+        """
+        Writes the graph to `directory`:
+
+        - nodes.json: keys and properties of every node table
+        - <TYPE>.indptr.i64 / <TYPE>.indices.i32: raw CSR arrays per relationship type
+        - manifest.json: format version and counts
+
+        Files are written under temporary names and swapped in with
+        os.replace, manifest last.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = f".tmp-{os.getpid()}"
+        with self._lock:
+            written = ["nodes.json"]
+            with open(directory / f"nodes.json{suffix}", "w") as f:
+                json.dump({table.label: table.snapshot() for table in (self.papers, self.strains, self.diseases)}, f)
+            for name, (relationships, sources, targets) in self.relationships.items():
+                relationships.build(len(sources), len(targets))
+                relationships.indptr.tofile(directory / f"{name}.indptr.i64{suffix}")
+                relationships.indices.tofile(directory / f"{name}.indices.i32{suffix}")
+                written += [f"{name}.indptr.i64", f"{name}.indices.i32"]
+            manifest = {"format_version": SNAPSHOT_FORMAT_VERSION, **self.stats()}
+        with open(directory / f"manifest.json{suffix}", "w") as f:
+            json.dump(manifest, f, indent=2)
+        for name in written + ["manifest.json"]:
+            os.replace(directory / f"{name}{suffix}", directory / name)
+
+    def load(self, directory):
+        """Replaces the graph with a snapshot written by save()."""
+        directory = Path(directory)
+        with open(directory / "manifest.json") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported graph snapshot format version {manifest.get('format_version')} "
+                f"in '{directory}' (expected {SNAPSHOT_FORMAT_VERSION})."
+            )
+        with open(directory / "nodes.json") as f:
+            nodes = json.load(f)
+        with self._lock:
+            for table in (self.papers, self.strains, self.diseases):
+                table.restore(nodes[table.label])
+            for name, (relationships, _, _) in self.relationships.items():
+                fresh = CSRRelationships(name)
+                fresh.indptr = np.fromfile(directory / f"{name}.indptr.i64", dtype=np.int64)
+                fresh.indices = np.fromfile(directory / f"{name}.indices.i32", dtype=np.int32)
+                self.relationships[name] = (fresh, *self.relationships[name][1:])
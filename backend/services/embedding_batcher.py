@@ -0,0 +1,61 @@
+# backend/services/embedding_batcher.py
+
+import os
+
+import numpy as np
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("EMBEDDING_TOKEN_BUDGET", "8192"))
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "128"))
+
+
+def token_lengths(model, texts):
+    """Token count of each text after truncation to the model's max sequence length."""
+    encoded = model.tokenizer(
+        texts, add_special_tokens=True, truncation=True, max_length=model.max_seq_length
+    )
+    return np.array([len(ids) for ids in encoded["input_ids"]])
+
+
+def make_buckets(lengths, token_budget=DEFAULT_TOKEN_BUDGET, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+    """
+    Groups text indices, longest first, into batches whose padded size
+    (batch size x longest text in the batch) stays within `token_budget`.
+    """
+    order = np.argsort(-lengths, kind="stable")
+    buckets = []
+    bucket = []
+    for index in order:
+        # Sorted descending, so the first text of a bucket sets its padded length.
+        padded_length = lengths[bucket[0]] if bucket else lengths[index]
+        if bucket and ((len(bucket) + 1) * padded_length > token_budget or len(bucket) >= max_batch_size):
+            buckets.append(bucket)
+            bucket = []
+        bucket.append(index)
+    if bucket:
+        buckets.append(bucket)
+    return buckets
+
+
+def encode_bucketed(model, texts, token_budget=DEFAULT_TOKEN_BUDGET, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+    """
+    Embeds `texts` with a SentenceTransformer, one length bucket at a time.
+
+    Texts of similar token length are batched together so short texts are
+    not padded to the longest one in the whole request, and each forward
+    pass stays within a fixed token budget. Returns an (n, dim) float32
+    array in the original order of `texts`.
+    """
+    import torch
+
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    lengths = token_lengths(model, texts)
+    embeddings = np.zeros((len(texts), model.get_sentence_embedding_dimension()), dtype=np.float32)
+    with torch.inference_mode():
+        for bucket in make_buckets(lengths, token_budget, max_batch_size):
+            features = model.tokenize([texts[i] for i in bucket])
+            features = {name: tensor.to(model.device) for name, tensor in features.items()}
+            output = model(features)["sentence_embedding"]
+            embeddings[bucket] = output.float().cpu().numpy()
+    return embeddings
@@ -0,0 +1,181 @@
+# backend/services/embedding_cache.py
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from backend.services.embedding_model_registry import embedding_models, get_embedding_model
+from backend.services.embedding_batcher import encode_bucketed
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache backed by SQLite.
+
+    Entries are keyed by (model id, sha256 of the text) and hold the float32
+    vector. Once the stored vectors exceed `max_bytes`, the least recently
+    used entries are evicted. Hit/miss counters are kept per process.
+    """
+
+    def __init__(self, path, max_bytes=2 * 1024 ** 3):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            # WAL lets several worker processes read while one writes.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model_id TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (model_id, text_hash))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model_id, texts):
+        """Returns a list aligned with `texts`: a float32 vector for each hit, None for each miss."""
+        hashes = [self.text_hash(text) for text in texts]
+        found = {}
+        with self._lock:
+            conn = self._connect()
+            unique = list(set(hashes))
+            # Stay under SQLite's bound-parameter limit.
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model_id = ? AND text_hash IN ({placeholders})",
+                    [model_id, *chunk]
+                ).fetchall()
+                found.update((text_hash, np.frombuffer(blob, dtype=np.float32)) for text_hash, blob in rows)
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model_id = ? AND text_hash = ?",
+                    [(now, model_id, text_hash) for text_hash in found]
+                )
+                conn.commit()
+
+        results = [found.get(text_hash) for text_hash in hashes]
+        hit_count = sum(result is not None for result in results)
+        self.hits += hit_count
+        self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model_id, texts, vectors):
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((model_id, self.text_hash(text), blob, len(blob), now))
+
+        with self._lock:
+            conn = self._connect()
+            for row in rows:
+                previous = conn.execute(
+                    "SELECT size FROM embeddings WHERE model_id = ? AND text_hash = ?", row[:2]
+                ).fetchone()
+                conn.execute("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", row)
+                self._total_bytes += row[3] - (previous[0] if previous else 0)
+            conn.commit()
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+
+    def _evict(self, conn):
+        """Drops least recently used entries until the cache is back under 90% of max_bytes."""
+        self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            victims = conn.execute(
+                "SELECT model_id, text_hash, size FROM embeddings ORDER BY last_access LIMIT 1000"
+            ).fetchall()
+            if not victims:
+                break
+            dropped = []
+            for model_id, text_hash, size in victims:
+                if self._total_bytes <= target:
+                    break
+                dropped.append((model_id, text_hash))
+                self._total_bytes -= size
+            conn.executemany("DELETE FROM embeddings WHERE model_id = ? AND text_hash = ?", dropped)
+            self.evictions += len(dropped)
+        conn.commit()
+
+    def embed(self, model_id, texts, encode_fn):
+        """
+        Returns an (n, dim) float32 array for `texts`, calling
+        encode_fn(missing_texts) only for texts not already cached.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        cached = self.get_many(model_id, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if missing:
+            encoded = np.asarray(encode_fn(missing), dtype=np.float32)
+            self.put_many(model_id, missing, encoded)
+            by_text = dict(zip(missing, encoded))
+            cached = [vector if vector is not None else by_text[text] for text, vector in zip(texts, cached)]
+        return np.vstack(cached)
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# Shared by the pipeline, agents and routers. Set EMBEDDING_CACHE_PATH=off to disable.
+# Defaults to the model cache directory (MODEL_CACHE_DIR in backend.config).
+_cache_path = os.getenv(
+    "EMBEDDING_CACHE_PATH", str(Path(os.getenv("MODEL_CACHE_DIR", "./models")) / "embedding_cache.sqlite")
+)
+embedding_cache = None if _cache_path.lower() in ("", "off", "none") else EmbeddingCache(
+    _cache_path, max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "2048")) * 1024 ** 2
+)
+
+
+def cached_encode(model_id, texts):
+    """
+    Embeds `texts` with the registry model `model_id`, serving repeated texts
+    from the embedding cache and running the rest in length-bucketed batches.
+    Returns an (n, dim) float32 numpy array.
+    """
+    def encode(batch):
+        return encode_bucketed(get_embedding_model(model_id), batch)
+
+    if embedding_cache is None:
+        return np.asarray(encode(list(texts)), dtype=np.float32)
+    # Quantized variants produce slightly different vectors, so they are cached separately.
+    return embedding_cache.embed(embedding_models.variant_key(model_id), list(texts), encode)
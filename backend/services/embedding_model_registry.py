@@ -0,0 +1,155 @@
+# backend/services/embedding_model_registry.py
+
+import json
+import os
+import time
+import threading
+from pathlib import Path
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "llm_config.json"
+
+QUANTIZATION_MODES = ("none", "int8")
+
+
+def _configure_torch_threads(torch):
+    """Applies EMBEDDING_TORCH_THREADS / EMBEDDING_TORCH_INTEROP_THREADS, if set."""
+    threads = os.getenv("EMBEDDING_TORCH_THREADS")
+    if threads:
+        torch.set_num_threads(int(threads))
+    interop_threads = os.getenv("EMBEDDING_TORCH_INTEROP_THREADS")
+    if interop_threads:
+        try:
+            torch.set_interop_threads(int(interop_threads))
+        except RuntimeError:
+            # Only settable before the first parallel op in the process.
+            print("Warning: EMBEDDING_TORCH_INTEROP_THREADS ignored, torch parallelism already started.")
+
+
+def _current_rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class EmbeddingModelRegistry:
+    """
+    Process-wide registry of self-hosted embedding models.
+
+    Models are keyed by the `embedding_models` ids in config/llm_config.json
+    and loaded lazily, exactly once per process, on first use. Load time and
+    memory are recorded per model.
+
+    On CPU, a model can be served with dynamic int8 quantization of its
+    Linear layers: set "quantization": "int8" on its config entry, or
+    EMBEDDING_QUANTIZATION=int8 for every self-hosted model. Torch thread
+    counts come from EMBEDDING_TORCH_THREADS and EMBEDDING_TORCH_INTEROP_THREADS.
+    """
+
+    def __init__(self, config_path=CONFIG_PATH):
+        self.config_path = config_path
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._model_locks = {}
+        self._config = None
+        self._threads_configured = False
+
+    def _model_config(self, model_id):
+        if self._config is None:
+            with open(self.config_path, 'r') as f:
+                self._config = {entry['id']: entry for entry in json.load(f).get('embedding_models', [])}
+        entry = self._config.get(model_id)
+        if entry is None:
+            raise ValueError(f"Embedding model '{model_id}' not found in LLM configuration.")
+        if not entry.get('model_path'):
+            raise ValueError(f"Embedding model '{model_id}' is not self-hosted (no 'model_path' configured).")
+        return entry
+
+    def quantization(self, model_id):
+        """The quantization mode `model_id` is served with by default."""
+        mode = self._model_config(model_id).get('quantization') or os.getenv("EMBEDDING_QUANTIZATION", "none")
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown embedding quantization '{mode}', expected one of {QUANTIZATION_MODES}.")
+        return mode
+
+    def variant_key(self, model_id, quantization=None):
+        """
+        Identifies the vectors a model variant produces, e.g. "pubmedbert" or
+        "pubmedbert@int8". Used to keep cached embeddings of variants apart.
+        """
+        quantization = quantization or self.quantization(model_id)
+        return model_id if quantization == "none" else f"{model_id}@{quantization}"
+
+    def get(self, model_id, quantization=None):
+        """
+        Returns the loaded SentenceTransformer for `model_id`, loading it on first call.
+        `quantization` overrides the configured mode ("none" or "int8").
+        """
+        key = self.variant_key(model_id, quantization)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model_lock = self._model_locks.setdefault(key, threading.Lock())
+        with model_lock:
+            # Another thread may have finished loading while we waited.
+            if key not in self._models:
+                self._models[key] = self._load(model_id, key, quantization or self.quantization(model_id))
+        return self._models[key]
+
+    def _load(self, model_id, key, quantization):
+        entry = self._model_config(model_id)
+
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if not self._threads_configured:
+            _configure_torch_threads(torch)
+            self._threads_configured = True
+
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        if quantization == "int8" and device != 'cpu':
+            print(f"Warning: int8 quantization is CPU-only, serving '{model_id}' unquantized on {device}.")
+            quantization = "none"
+
+        rss_before = _current_rss_bytes()
+        start = time.perf_counter()
+        model = SentenceTransformer(entry['model_path'], device=device)
+        if quantization == "int8":
+            # Dynamic quantization: int8 weights, activations quantized per batch at runtime.
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        model.eval()
+        load_seconds = time.perf_counter() - start
+        rss_after = _current_rss_bytes()
+
+        tensors = list(model.parameters()) + list(model.buffers())
+        self._stats[key] = {
+            "model_path": entry['model_path'],
+            "device": device,
+            "quantization": quantization,
+            "torch_threads": torch.get_num_threads(),
+            "load_seconds": load_seconds,
+            "parameter_bytes": sum(t.numel() * t.element_size() for t in tensors),
+            "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        }
+        print(f"Loaded embedding model '{key}' ({entry['model_path']}) on {device} in {load_seconds:.1f}s.")
+        return model
+
+    def is_loaded(self, model_id, quantization=None):
+        return self.variant_key(model_id, quantization) in self._models
+
+    def stats(self):
+        """Load time and memory for every model loaded so far."""
+        return {model_id: dict(stats) for model_id, stats in self._stats.items()}
+
+
+# Shared by every router, agent and pipeline in the process.
+embedding_models = EmbeddingModelRegistry()
+
+
+def get_embedding_model(model_id, quantization=None):
+    return embedding_models.get(model_id, quantization)
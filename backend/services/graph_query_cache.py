@@ -0,0 +1,149 @@
+# backend/services/graph_query_cache.py
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+
+class GraphQueryCache:
+    """
+    In-process LRU cache with a TTL for knowledge-graph read queries, keyed
+    by (query, parameters).
+
+    Each entry is tagged with the nodes its result depends on, as
+    (label, key) pairs such as ("Disease", "IBD"), and with their labels.
+    Writes invalidate by key, or by label for large bulk writes. A result
+    whose load overlapped an invalidation is returned but not stored, so a
+    read racing a write cannot cache the pre-write answer.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tagged = {}  # tag -> set of keys
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._hit_seconds = 0.0
+        self._miss_seconds = 0.0
+
+    @staticmethod
+    def key(query, params):
+        return json.dumps([query, params], sort_keys=True, default=str)
+
+    def lookup(self, key):
+        """Returns (hit, value, generation); pass the generation back to store()."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1], self._generation
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return False, None, self._generation
+
+    def store(self, key, value, tags, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            tags = set(tags) | {(tag[0],) for tag in tags}
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def record_latency(self, hit, seconds):
+        with self._lock:
+            if hit:
+                self._hit_seconds += seconds
+            else:
+                self._miss_seconds += seconds
+
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def invalidate(self, label, keys=None):
+        """Drops entries depending on the given `label` nodes, or on any `label` node when `keys` is None."""
+        tags = [(label,)] if keys is None else [(label, key) for key in keys]
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tagged.get(tag, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tagged.clear()
+
+    def get_or_load(self, query, params, load, tags_fn):
+        """
+        Returns the cached result of `query` with `params`, or calls load()
+        and caches its result under the tags returned by tags_fn(result).
+        """
+        start = time.perf_counter()
+        key = self.key(query, params)
+        hit, value, generation = self.lookup(key)
+        if not hit:
+            value = load()
+            self.store(key, value, tags_fn(value), generation)
+        self.record_latency(hit, time.perf_counter() - start)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "avg_hit_ms": 1000.0 * self._hit_seconds / self.hits if self.hits else 0.0,
+            "avg_miss_ms": 1000.0 * self._miss_seconds / self.misses if self.misses else 0.0,
+        }
+
+
+# Bulk writes touching more keys than this invalidate the whole label instead.
+INVALIDATE_LABEL_ABOVE = 1000
+
+
+def invalidate_rows(cache, label, keys):
+    """Invalidates `label` entries for `keys`, falling back to the whole label for large writes."""
+    if cache is None:
+        return
+    keys = set(keys)
+    if len(keys) > INVALIDATE_LABEL_ABOVE:
+        cache.invalidate(label)
+    elif keys:
+        cache.invalidate(label, keys)
+
+
+# Shared by the sync and async knowledge-graph services. Set KG_CACHE_MAX_ENTRIES=0 to disable.
+_max_entries = int(os.getenv("KG_CACHE_MAX_ENTRIES", "10000"))
+graph_query_cache = None if _max_entries <= 0 else GraphQueryCache(
+    max_entries=_max_entries, ttl_seconds=float(os.getenv("KG_CACHE_TTL_SECONDS", "300"))
+)
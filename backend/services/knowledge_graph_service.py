@@ -1,14 +1,77 @@
 # backend/services/knowledge_graph_service.py
 
 import os
+import time
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
+from backend.services.graph_query_cache import graph_query_cache, invalidate_rows
+
 # Load environment variables
 load_dotenv()
 
+# Bulk writes: rows per UNWIND transaction, and how long the driver keeps retrying a
+# transaction that failed with a transient error (deadlock, leader switch, lost connection).
+DEFAULT_CHUNK_SIZE = int(os.getenv("KG_BULK_CHUNK_SIZE", "1000"))
+DEFAULT_MAX_RETRY_SECONDS = float(os.getenv("KG_MAX_RETRY_SECONDS", "30"))
+
+ADD_PAPERS_QUERY = (
+    "UNWIND $rows AS row "
+    "MERGE (p:Paper {pmid: row.pmid}) SET p.title = row.title, p.abstract = row.abstract, p.year = row.year"
+)
+ADD_STRAINS_QUERY = (
+    "UNWIND $rows AS row "
+    "MERGE (s:Strain {id: row.strain_id}) SET s.species = row.species"
+)
+ADD_DISEASES_QUERY = (
+    "UNWIND $rows AS row "
+    "MERGE (d:Disease {name: row.name})"
+)
+LINK_PAPERS_TO_DISEASES_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (p:Paper {pmid: row.pmid}), (d:Disease {name: row.disease_name}) "
+    "MERGE (p)-[:INVESTIGATES]->(d)"
+)
+LINK_PAPERS_TO_STRAINS_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (p:Paper {pmid: row.pmid}), (s:Strain {id: row.strain_id}) "
+    "MERGE (p)-[:STUDIES]->(s)"
+)
+LINK_STRAINS_TO_DISEASES_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (s:Strain {id: row.strain_id}), (d:Disease {name: row.disease_name}) "
+    "MERGE (s)-[:TREATS]->(d)"
+)
+FIND_PAPERS_ABOUT_DISEASE_QUERY = (
+    "MATCH (p:Paper)-[:INVESTIGATES]->(d:Disease {name: $disease_name}) "
+    "RETURN p.pmid as pmid, p.title as title"
+)
+FIND_STRAINS_TREATING_DISEASE_QUERY = (
+    "MATCH (s:Strain)-[:TREATS]->(d:Disease {name: $disease_name}) "
+    "RETURN s.id as id, s.species as species"
+)
+CONSTRAINT_QUERIES = (
+    "CREATE CONSTRAINT ON (p:Paper) ASSERT p.pmid IS UNIQUE",
+    "CREATE CONSTRAINT ON (s:Strain) ASSERT s.id IS UNIQUE",
+    "CREATE CONSTRAINT ON (d:Disease) ASSERT d.name IS UNIQUE",
+    "CREATE CONSTRAINT ON (g:Gene) ASSERT g.name IS UNIQUE",
+    "CREATE CONSTRAINT ON (t:Clinical_Trial) ASSERT t.nct_id IS UNIQUE",
+    "CREATE CONSTRAINT ON (c:Company) ASSERT c.name IS UNIQUE",
+)
+
+
+def papers_about_disease_tags(disease_name, papers):
+    """Cache tags for a find_papers_about_disease result: the disease and every returned paper."""
+    return [("Disease", disease_name)] + [("Paper", paper["pmid"]) for paper in papers]
+
+
+def strains_treating_disease_tags(disease_name, strains):
+    """Cache tags for a find_strains_treating_disease result: the disease and every returned strain."""
+    return [("Disease", disease_name)] + [("Strain", strain["id"]) for strain in strains]
+
+
 class KnowledgeGraphService:
-    def __init__(self):
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, max_retry_seconds=DEFAULT_MAX_RETRY_SECONDS, cache=graph_query_cache):
         uri = os.getenv("NEO4J_URI")
         user = os.getenv("NEO4J_USER")
         password = os.getenv("NEO4J_PASSWORD")
@@ -16,7 +79,10 @@ class KnowledgeGraphService:
         if not all([uri, user, password]):
             raise ValueError("NEO4J_URI, NEO4J_USER, and NEO4J_PASSWORD must be set in the environment.")
 
-        self._driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.chunk_size = chunk_size
+        # Read-through cache for lookups, invalidated by the add_*/link_* methods below
+        self.cache = cache
+        self._driver = GraphDatabase.driver(uri, auth=(user, password), max_transaction_retry_time=max_retry_seconds)
         self._create_constraints()
 
     def close(self):
@@ -28,12 +94,8 @@ class KnowledgeGraphService:
         This is idempotent and only needs to be run once.
         """
         with self._driver.session() as session:
-            session.run("CREATE CONSTRAINT ON (p:Paper) ASSERT p.pmid IS UNIQUE")
-            session.run("CREATE CONSTRAINT ON (s:Strain) ASSERT s.id IS UNIQUE")
-            session.run("CREATE CONSTRAINT ON (d:Disease) ASSERT d.name IS UNIQUE")
-            session.run("CREATE CONSTRAINT ON (g:Gene) ASSERT g.name IS UNIQUE")
-            session.run("CREATE CONSTRAINT ON (t:Clinical_Trial) ASSERT t.nct_id IS UNIQUE")
-            session.run("CREATE CONSTRAINT ON (c:Company) ASSERT c.name IS UNIQUE")
+            for query in CONSTRAINT_QUERIES:
+                session.run(query)
         print("Neo4j constraints created (or already exist).")
 
 
@@ -43,6 +105,7 @@ class KnowledgeGraphService:
                 "MERGE (p:Paper {pmid: $pmid}) SET p.title = $title, p.abstract = $abstract, p.year = $year",
                 pmid=pmid, title=title, abstract=abstract, year=year
             )
+        invalidate_rows(self.cache, "Paper", [pmid])
 
     def add_strain(self, strain_id: str, species: str):
         with self._driver.session() as session:
@@ -50,10 +113,12 @@ class KnowledgeGraphService:
                 "MERGE (s:Strain {id: $strain_id}) SET s.species = $species",
                 strain_id=strain_id, species=species
             )
+        invalidate_rows(self.cache, "Strain", [strain_id])
 
     def add_disease(self, name: str):
         with self._driver.session() as session:
             session.run("MERGE (d:Disease {name: $name})", name=name)
+        invalidate_rows(self.cache, "Disease", [name])
 
     def link_paper_to_disease(self, pmid: str, disease_name: str):
         with self._driver.session() as session:
@@ -62,6 +127,8 @@ class KnowledgeGraphService:
                 "MERGE (p)-[:INVESTIGATES]->(d)",
                 pmid=pmid, disease_name=disease_name
             )
+        invalidate_rows(self.cache, "Paper", [pmid])
+        invalidate_rows(self.cache, "Disease", [disease_name])
 
     def link_paper_to_strain(self, pmid: str, strain_id: str):
         with self._driver.session() as session:
@@ -70,6 +137,8 @@ class KnowledgeGraphService:
                 "MERGE (p)-[:STUDIES]->(s)",
                 pmid=pmid, strain_id=strain_id
             )
+        invalidate_rows(self.cache, "Paper", [pmid])
+        invalidate_rows(self.cache, "Strain", [strain_id])
 
     def link_strain_to_disease(self, strain_id: str, disease_name: str, treatment_effect: str = "treats"):
         with self._driver.session() as session:
@@ -80,15 +149,125 @@ class KnowledgeGraphService:
                 "MERGE (s)-[:TREATS]->(d)",
                 strain_id=strain_id, disease_name=disease_name
             )
+        invalidate_rows(self.cache, "Strain", [strain_id])
+        invalidate_rows(self.cache, "Disease", [disease_name])
     
+    # --- Bulk writes ---
+    def _write_rows(self, query, rows, chunk_size=None, touches=()):
+        """
+        Runs `query` (an UNWIND $rows statement) over `rows` in chunks, one
+        managed write transaction per chunk. The driver retries a chunk that
+        fails with a transient error, with backoff, for up to
+        max_retry_seconds; MERGE makes the retry idempotent. Afterwards,
+        even on failure, cached lookups are invalidated for every
+        (label, row field) in `touches`.
+        Returns {"rows", "chunks", "nodes_created", "relationships_created",
+        "properties_set", "seconds"}.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        stats = {"rows": len(rows), "chunks": 0, "nodes_created": 0,
+                 "relationships_created": 0, "properties_set": 0}
+
+        def run_chunk(tx, chunk):
+            return tx.run(query, rows=chunk).consume().counters
+
+        start = time.perf_counter()
+        try:
+            with self._driver.session() as session:
+                for i in range(0, len(rows), chunk_size):
+                    counters = session.execute_write(run_chunk, rows[i:i + chunk_size])
+                    stats["chunks"] += 1
+                    stats["nodes_created"] += counters.nodes_created
+                    stats["relationships_created"] += counters.relationships_created
+                    stats["properties_set"] += counters.properties_set
+        finally:
+            for label, field in touches:
+                invalidate_rows(self.cache, label, (row[field] for row in rows))
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+    def add_papers(self, papers, chunk_size=None):
+        """Bulk add_paper: `papers` are dicts with pmid, title, abstract and year."""
+        rows = [{"pmid": p["pmid"], "title": p.get("title"), "abstract": p.get("abstract"), "year": p.get("year")}
+                for p in papers]
+        return self._write_rows(ADD_PAPERS_QUERY, rows, chunk_size, touches=[("Paper", "pmid")])
+
+    def add_strains(self, strains, chunk_size=None):
+        """Bulk add_strain: `strains` are dicts with strain_id and species."""
+        rows = [{"strain_id": s["strain_id"], "species": s.get("species")} for s in strains]
+        return self._write_rows(ADD_STRAINS_QUERY, rows, chunk_size, touches=[("Strain", "strain_id")])
+
+    def add_diseases(self, names, chunk_size=None):
+        """Bulk add_disease."""
+        rows = [{"name": name} for name in names]
+        return self._write_rows(ADD_DISEASES_QUERY, rows, chunk_size, touches=[("Disease", "name")])
+
+    def link_papers_to_diseases(self, links, chunk_size=None):
+        """Bulk link_paper_to_disease: `links` are (pmid, disease_name) pairs."""
+        rows = [{"pmid": pmid, "disease_name": disease_name} for pmid, disease_name in links]
+        return self._write_rows(LINK_PAPERS_TO_DISEASES_QUERY, rows, chunk_size,
+                                touches=[("Paper", "pmid"), ("Disease", "disease_name")])
+
+    def link_papers_to_strains(self, links, chunk_size=None):
+        """Bulk link_paper_to_strain: `links` are (pmid, strain_id) pairs."""
+        rows = [{"pmid": pmid, "strain_id": strain_id} for pmid, strain_id in links]
+        return self._write_rows(LINK_PAPERS_TO_STRAINS_QUERY, rows, chunk_size,
+                                touches=[("Paper", "pmid"), ("Strain", "strain_id")])
+
+    def link_strains_to_diseases(self, links, chunk_size=None):
+        """Bulk link_strain_to_disease: `links` are (strain_id, disease_name) pairs."""
+        rows = [{"strain_id": strain_id, "disease_name": disease_name} for strain_id, disease_name in links]
+        return self._write_rows(LINK_STRAINS_TO_DISEASES_QUERY, rows, chunk_size,
+                                touches=[("Strain", "strain_id"), ("Disease", "disease_name")])
+
     def find_papers_about_disease(self, disease_name: str):
-        with self._driver.session() as session:
-            result = session.run(
-                "MATCH (p:Paper)-[:INVESTIGATES]->(d:Disease {name: $disease_name}) "
-                "RETURN p.pmid as pmid, p.title as title",
-                disease_name=disease_name
-            )
-            return [{"pmid": record["pmid"], "title": record["title"]} for record in result]
+        def load():
+            with self._driver.session() as session:
+                result = session.run(FIND_PAPERS_ABOUT_DISEASE_QUERY, disease_name=disease_name)
+                return [{"pmid": record["pmid"], "title": record["title"]} for record in result]
+
+        if self.cache is None:
+            return load()
+        papers = self.cache.get_or_load(
+            FIND_PAPERS_ABOUT_DISEASE_QUERY, {"disease_name": disease_name}, load,
+            lambda papers: papers_about_disease_tags(disease_name, papers)
+        )
+        # Callers get their own list, never the cached one.
+        return [dict(paper) for paper in papers]
+
+    def find_strains_treating_disease(self, disease_name: str):
+        def load():
+            with self._driver.session() as session:
+                result = session.run(FIND_STRAINS_TREATING_DISEASE_QUERY, disease_name=disease_name)
+                return [{"id": record["id"], "species": record["species"]} for record in result]
+
+        if self.cache is None:
+            return load()
+        strains = self.cache.get_or_load(
+            FIND_STRAINS_TREATING_DISEASE_QUERY, {"disease_name": disease_name}, load,
+            lambda strains: strains_treating_disease_tags(disease_name, strains)
+        )
+        return [dict(strain) for strain in strains]
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else None
+
+
+def create_knowledge_graph_service(backend=None):
+    """
+    Returns the knowledge graph backend selected by `backend` or KG_BACKEND:
+    "neo4j", "embedded" (in-process, snapshotted to KG_EMBEDDED_SNAPSHOT_DIR)
+    or "auto" (the default: Neo4j when NEO4J_URI is set, embedded otherwise).
+    """
+    backend = (backend or os.getenv("KG_BACKEND", "auto")).lower()
+    if backend == "auto":
+        backend = "neo4j" if os.getenv("NEO4J_URI") else "embedded"
+    if backend == "neo4j":
+        return KnowledgeGraphService()
+    if backend == "embedded":
+        from backend.services.embedded_graph_service import EmbeddedKnowledgeGraphService
+        return EmbeddedKnowledgeGraphService(os.getenv("KG_EMBEDDED_SNAPSHOT_DIR", "./data/knowledge_graph"))
+    raise ValueError(f"Unknown knowledge graph backend '{backend}', expected 'neo4j', 'embedded' or 'auto'.")
 
 # Example Usage:
 # if __name__ == '__main__':
@@ -0,0 +1,785 @@
+# backend/services/local_vector_index.py
+
+import os
+import json
+from pathlib import Path
+
+import numpy as np
+
+from backend.services.metadata_index import MetadataIndex
+from backend.services.vector_quantization import ScalarQuantizer, ProductQuantizer
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class SnapshotRecords:
+    """
+    Read-only view over the id/metadata sidecar of a snapshot.
+
+    `records.jsonl` holds one JSON [id, metadata] pair per row and
+    `records.offsets` the uint64 byte offset of each line, so a single row
+    can be decoded without reading the rest of the file.
+    """
+
+    def __init__(self, directory, rows):
+        self._rows = rows
+        self._offsets = np.memmap(Path(directory) / "records.offsets", dtype=np.uint64, mode="r")
+        self._data = np.memmap(Path(directory) / "records.jsonl", dtype=np.uint8, mode="r") if rows else None
+
+    def __len__(self):
+        return self._rows
+
+    def __getitem__(self, row):
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return json.loads(self._data[start:end].tobytes())
+
+    def load_all(self):
+        ids, metadata = [], []
+        for row in range(self._rows):
+            vec_id, meta = self[row]
+            ids.append(vec_id)
+            metadata.append(meta)
+        return ids, metadata
+
+
+class LocalVectorIndex:
+    """
+    In-process vector index for a single namespace.
+
+    Vectors are kept L2-normalized in one contiguous float32 matrix, so a
+    cosine query is a single matrix-vector product followed by a partial
+    sort for the top-k rows.
+
+    Upserts are idempotent: an id->row map lets an existing id be
+    overwritten in place. Deletes only tombstone their row; once dead rows
+    exceed `compaction_threshold` of the namespace the storage is rebuilt
+    without them.
+    """
+
+    def __init__(self, dimension=None, initial_capacity=1024, compaction_threshold=0.25,
+                 min_compaction_rows=1024):
+        self.dimension = dimension
+        self.compaction_threshold = compaction_threshold
+        self.min_compaction_rows = min_compaction_rows
+        self._capacity = initial_capacity
+        self._allocated = 0
+        self._matrix = None
+        self._live = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._dead = 0
+        self._ids = []
+        self._metadata = []
+        self._id_to_row = {}
+        self._metadata_index = MetadataIndex()
+        # Set while the index is backed by a snapshot whose sidecar has not been read yet.
+        self._records = None
+
+    def __len__(self):
+        return self._size - self._dead
+
+    def _ensure_capacity(self, extra_rows):
+        needed = self._size + extra_rows
+        if needed <= self._allocated:
+            return
+        capacity = max(self._allocated, self._capacity)
+        while capacity < needed:
+            capacity *= 2
+
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._size] = self._live[:self._size]
+        self._live = live
+        self._resize_storage(capacity)
+        self._allocated = capacity
+
+    # Vector storage. Subclasses that store vectors differently override these.
+
+    def _resize_storage(self, capacity):
+        grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+        if self._matrix is not None:
+            grown[:self._size] = self._matrix[:self._size]
+        self._matrix = grown
+
+    def _write_vectors(self, rows, vectors):
+        self._matrix[rows] = vectors
+
+    def _compact_storage(self, kept_rows, capacity):
+        matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+        matrix[:len(kept_rows)] = self._matrix[kept_rows]
+        self._matrix = matrix
+
+    def _storage_bytes(self):
+        return 0 if self._matrix is None else self._matrix.nbytes
+
+    @staticmethod
+    def _normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def upsert(self, vectors):
+        """
+        Inserts vectors in Pinecone format (list of dicts with id, values,
+        metadata). Vectors whose id already exists overwrite that row in place.
+        """
+        if not vectors:
+            return
+        self._materialize()
+
+        # Within one batch the last occurrence of an id wins, as in Pinecone.
+        latest = {}
+        for vec in vectors:
+            latest[vec['id']] = vec
+        vectors = list(latest.values())
+
+        values = np.asarray([vec['values'] for vec in vectors], dtype=np.float32)
+        if self.dimension is None:
+            self.dimension = values.shape[1]
+        elif values.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {values.shape[1]} does not match index dimension {self.dimension}."
+            )
+
+        new_count = sum(1 for vec in vectors if vec['id'] not in self._id_to_row)
+        self._ensure_capacity(new_count)
+
+        rows = np.empty(len(vectors), dtype=np.int64)
+        for i, vec in enumerate(vectors):
+            metadata = vec.get('metadata', {})
+            row = self._id_to_row.get(vec['id'])
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._ids.append(vec['id'])
+                self._metadata.append(metadata)
+                self._id_to_row[vec['id']] = row
+                self._live[row] = True
+                self._metadata_index.add(row, metadata)
+            elif self._metadata[row] != metadata:
+                self._metadata_index.remove(row, self._metadata[row])
+                self._metadata[row] = metadata
+                self._metadata_index.add(row, metadata)
+            rows[i] = row
+
+        self._write_vectors(rows, self._normalize(values))
+        self._on_rows_written(rows)
+
+    def delete(self, ids):
+        """Tombstones the rows for `ids`. Unknown ids are ignored."""
+        self._materialize()
+        deleted = 0
+        for vec_id in ids:
+            row = self._id_to_row.pop(vec_id, None)
+            if row is None:
+                continue
+            self._live[row] = False
+            self._metadata_index.remove(row, self._metadata[row])
+            self._metadata[row] = None
+            deleted += 1
+        self._dead += deleted
+
+        if self._dead >= self.min_compaction_rows and self._dead > self._size * self.compaction_threshold:
+            self.compact()
+        return deleted
+
+    def compact(self):
+        """Rebuilds contiguous storage without tombstoned rows."""
+        if self._dead == 0:
+            return
+        self._materialize()
+        kept = np.flatnonzero(self._live[:self._size])
+        capacity = max(self._capacity, len(kept))
+
+        self._compact_storage(kept, capacity)
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(kept)] = True
+        self._live = live
+        self._allocated = capacity
+        self._ids = [self._ids[row] for row in kept]
+        self._metadata = [self._metadata[row] for row in kept]
+        self._id_to_row = {vec_id: row for row, vec_id in enumerate(self._ids)}
+        self._metadata_index = MetadataIndex()
+        for row, metadata in enumerate(self._metadata):
+            self._metadata_index.add(row, metadata)
+        self._size = len(kept)
+        self._dead = 0
+        self._on_compacted(kept)
+
+    def stats(self):
+        """Row counts and memory footprint of the namespace."""
+        return {
+            "live_rows": self._size - self._dead,
+            "dead_rows": self._dead,
+            "capacity_rows": self._allocated,
+            "dimension": self.dimension,
+            "bytes": self._storage_bytes() + self._live.nbytes,
+        }
+
+    def _on_rows_written(self, rows):
+        """Hook for subclasses that maintain auxiliary structures over rows."""
+        pass
+
+    def _on_compacted(self, kept_rows):
+        """Hook called after compaction; kept_rows[new_row] is the old row."""
+        pass
+
+    def _top_k(self, scores, top_k):
+        """Returns row indices of the top_k scores in descending order."""
+        if top_k >= len(scores):
+            return np.argsort(-scores)
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        return candidates[np.argsort(-scores[candidates])]
+
+    def _row_mask(self, filter_criteria):
+        """
+        Returns (mask, empty): the row mask for a query (None when every row
+        qualifies) and whether no row can match at all.
+        """
+        mask = None
+        if filter_criteria:
+            self._materialize()
+            mask = self._metadata_index.evaluate(filter_criteria, self._size)
+            if self._dead:
+                mask &= self._live[:self._size]
+            return mask, not mask.any()
+        if self._dead:
+            mask = self._live[:self._size]
+        return mask, False
+
+    def query(self, query_vector, top_k=10, filter_criteria=None):
+        """
+        Returns the top_k most similar vectors by cosine similarity, in the
+        same {"matches": [...]} shape as a Pinecone query response.
+        `filter_criteria` takes Pinecone metadata filter syntax.
+        """
+        if len(self) == 0 or top_k <= 0:
+            return {"matches": []}
+        mask, empty = self._row_mask(filter_criteria)
+        if empty:
+            return {"matches": []}
+
+        query_np = self._normalize(np.asarray(query_vector, dtype=np.float32))
+        rows, scores = self._search(query_np, top_k, mask)
+        return {"matches": self._to_matches(rows, scores)}
+
+    def query_many(self, query_vectors, top_k=10, filter_criteria=None):
+        """
+        Batched query(): returns one {"matches": [...]} response per query
+        vector, in order. The filter is evaluated once for the whole batch.
+        """
+        if not len(query_vectors):
+            return []
+        if len(self) == 0 or top_k <= 0:
+            return [{"matches": []} for _ in query_vectors]
+        mask, empty = self._row_mask(filter_criteria)
+        if empty:
+            return [{"matches": []} for _ in query_vectors]
+
+        queries_np = self._normalize(np.asarray(query_vectors, dtype=np.float32))
+        return [
+            {"matches": self._to_matches(rows, scores)}
+            for rows, scores in self._search_many(queries_np, top_k, mask)
+        ]
+
+    def _search_many(self, queries_np, top_k, mask=None, max_block_bytes=256 * 2**20):
+        """
+        Exact scan for a batch of queries: one matrix-matrix product per
+        block of queries (sized to keep the score matrix under
+        `max_block_bytes`) and a per-row partial sort.
+        """
+        candidates = None if mask is None else np.flatnonzero(mask)
+        if candidates is not None and len(candidates) > self._size // 2:
+            candidates = None
+        else:
+            mask = None
+        n_rows = self._size if candidates is None else len(candidates)
+        vectors = self._matrix[:self._size] if candidates is None else self._matrix[candidates]
+        top_k = min(top_k, n_rows if mask is None else int(np.count_nonzero(mask)))
+        block = max(1, max_block_bytes // (4 * max(n_rows, 1)))
+
+        results = []
+        for start in range(0, len(queries_np), block):
+            scores = queries_np[start:start + block] @ vectors.T
+            if mask is not None:
+                scores[:, ~mask] = -np.inf
+            if top_k < n_rows:
+                top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+            else:
+                top = np.broadcast_to(np.arange(n_rows), (len(scores), n_rows))
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            for rows, row_scores in zip(top, top_scores):
+                results.append((rows if candidates is None else candidates[rows], row_scores))
+        return results
+
+    def _search_each(self, queries_np, top_k, mask=None):
+        """Per-query fallback for indexes whose search is not a single matrix product."""
+        return [self._search(query_np, top_k, mask) for query_np in queries_np]
+
+    def _search(self, query_np, top_k, mask=None):
+        """
+        Exact scan. Returns (rows, scores) for the top_k rows, best first.
+        When a row mask is given, only the selected rows are scored.
+        """
+        if mask is None:
+            scores = self._score_rows(query_np)
+            rows = self._top_k(scores, top_k)
+            return rows, scores[rows]
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > self._size // 2:
+            # Mostly-live masks (e.g. a few tombstones) are cheaper to apply after a full scan.
+            scores = self._score_rows(query_np)
+            scores[~mask] = -np.inf
+            rows = self._top_k(scores, min(top_k, len(candidates)))
+            return rows, scores[rows]
+
+        scores = self._score_rows(query_np, candidates)
+        order = self._top_k(scores, top_k)
+        return candidates[order], scores[order]
+
+    def _score_rows(self, query_np, rows=None):
+        """Cosine scores of `rows` (all rows when None) against a normalized query."""
+        if rows is None:
+            return self._matrix[:self._size] @ query_np
+        return self._matrix[rows] @ query_np
+
+    def iter_records(self):
+        """Yields (id, metadata) for every live row."""
+        for row in np.flatnonzero(self._live[:self._size]):
+            yield self._record(row)
+
+    def _record(self, row):
+        if self._records is not None:
+            return self._records[row]
+        return self._ids[row], self._metadata[row]
+
+    def _to_matches(self, rows, scores):
+        matches = []
+        for row, score in zip(rows, scores):
+            vec_id, metadata = self._record(row)
+            matches.append({"id": vec_id, "score": float(score), "metadata": metadata})
+        return matches
+
+    def _materialize(self):
+        """Reads a snapshot's id/metadata sidecar into memory before the first write or filter."""
+        if self._records is None:
+            return
+        self._ids, self._metadata = self._records.load_all()
+        self._records = None
+        self._id_to_row = {vec_id: row for row, vec_id in enumerate(self._ids)}
+        self._metadata_index = MetadataIndex()
+        for row, metadata in enumerate(self._metadata):
+            self._metadata_index.add(row, metadata)
+
+    def _snapshot_params(self):
+        return {"index_type": "exact"}
+
+    def _save_storage(self, directory, kept_rows, suffix, chunk_rows=65536):
+        """
+        Writes the vector storage of `kept_rows` under temporary `suffix`ed
+        names and returns the final file names.
+        """
+        with open(directory / f"vectors.f32{suffix}", "wb") as f:
+            for i in range(0, len(kept_rows), chunk_rows):
+                np.ascontiguousarray(self._matrix[kept_rows[i:i + chunk_rows]], dtype=np.float32).tofile(f)
+        return ["vectors.f32"]
+
+    def _load_storage(self, directory, manifest):
+        rows = manifest["rows"]
+        if rows:
+            self._matrix = np.memmap(
+                directory / "vectors.f32", dtype=np.float32, mode="c", shape=(rows, self.dimension)
+            )
+
+    def save(self, directory):
+        """
+        Writes the live rows of this namespace to `directory`:
+
+        - vectors.f32: raw row-major float32 matrix, np.memmap-able
+        - records.jsonl / records.offsets: id and metadata sidecar
+        - manifest.json: format version, shape and index parameters
+
+        Each file is written under a temporary name and swapped in with
+        os.replace, manifest last, so processes that still map the previous
+        snapshot keep a consistent view.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        kept = np.flatnonzero(self._live[:self._size])
+        suffix = f".tmp-{os.getpid()}"
+
+        written = self._save_storage(directory, kept, suffix)
+
+        offsets = np.zeros(len(kept) + 1, dtype=np.uint64)
+        with open(directory / f"records.jsonl{suffix}", "wb") as f:
+            position = 0
+            for i, row in enumerate(kept):
+                line = (json.dumps(list(self._record(row)), separators=(",", ":")) + "\n").encode("utf-8")
+                f.write(line)
+                position += len(line)
+                offsets[i + 1] = position
+        offsets.tofile(directory / f"records.offsets{suffix}")
+
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "dimension": self.dimension,
+            "rows": int(len(kept)),
+            "dtype": "float32",
+            **self._snapshot_params(),
+        }
+        with open(directory / f"manifest.json{suffix}", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        for name in written + ["records.jsonl", "records.offsets", "manifest.json"]:
+            os.replace(directory / f"{name}{suffix}", directory / name)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Opens a snapshot written by save(). The vector file is memory-mapped
+        copy-on-write, so nothing is read into RAM up front and workers that
+        open the same snapshot share its pages in the OS page cache.
+        """
+        directory = Path(directory)
+        with open(directory / "manifest.json") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported vector snapshot format version {manifest.get('format_version')} "
+                f"in '{directory}' (expected {SNAPSHOT_FORMAT_VERSION})."
+            )
+
+        index_classes = {"exact": LocalVectorIndex, "ivf": IVFVectorIndex, "quantized": QuantizedVectorIndex}
+        index_type = manifest.get("index_type", "exact")
+        if index_type not in index_classes:
+            raise ValueError(f"Unknown vector snapshot index type '{index_type}' in '{directory}'.")
+        index = index_classes[index_type]._from_manifest(manifest)
+
+        rows = manifest["rows"]
+        index._live = np.ones(rows, dtype=bool)
+        index._size = rows
+        index._allocated = rows
+        index._records = SnapshotRecords(directory, rows)
+        index._load_storage(directory, manifest)
+        return index
+
+    @classmethod
+    def _from_manifest(cls, manifest):
+        return cls(dimension=manifest["dimension"])
+
+
+class IVFVectorIndex(LocalVectorIndex):
+    """
+    Approximate index using an inverted-file (IVF) coarse quantizer.
+
+    Rows are assigned to the nearest of `nlist` k-means centroids. A query
+    only scans the rows in the `nprobe` closest lists, trading recall for
+    latency. Until enough vectors have been inserted to train the centroids,
+    queries fall back to the exact scan.
+    """
+
+    def __init__(self, dimension=None, nlist=256, nprobe=16, train_iterations=10,
+                 initial_capacity=1024, seed=0, **kwargs):
+        super().__init__(dimension=dimension, initial_capacity=initial_capacity, **kwargs)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iterations = train_iterations
+        self.train_size = nlist * 39
+        self._rng = np.random.default_rng(seed)
+        self._centroids = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists = [[] for _ in range(nlist)]
+        self._list_cache = {}
+        self._stale_entries = 0
+
+    @property
+    def is_trained(self):
+        return self._centroids is not None
+
+    def train(self):
+        """Runs spherical k-means over (a sample of) the stored vectors."""
+        live_rows = np.flatnonzero(self._live[:self._size])
+        sample_size = min(len(live_rows), self.nlist * 256)
+        sample = self._matrix[self._rng.choice(live_rows, sample_size, replace=False)]
+        centroids = sample[self._rng.choice(sample_size, self.nlist, replace=False)].copy()
+
+        for _ in range(self.train_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=self.nlist)
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[self._rng.choice(sample_size, int(empty.sum()))]
+            centroids = self._normalize(sums)
+
+        self._centroids = centroids.astype(np.float32)
+        self._assignments = np.full(self._allocated, -1, dtype=np.int32)
+        self._rebuild_lists()
+        self._assign(live_rows)
+
+    def _rebuild_lists(self):
+        assignments = self._assignments[:self._size]
+        order = np.argsort(assignments, kind="stable")
+        order = order[assignments[order] >= 0]
+        bounds = np.cumsum(np.bincount(assignments[order], minlength=self.nlist))[:-1]
+        chunks = np.split(order, bounds)
+        self._lists = [chunk.tolist() for chunk in chunks]
+        self._list_cache = dict(enumerate(chunks))
+        self._stale_entries = 0
+
+    def _assign(self, rows):
+        if len(self._assignments) < self._allocated:
+            grown = np.full(self._allocated, -1, dtype=np.int32)
+            grown[:len(self._assignments)] = self._assignments
+            self._assignments = grown
+        labels = np.argmax(self._matrix[rows] @ self._centroids.T, axis=1)
+        previous = self._assignments[rows]
+        self._assignments[rows] = labels
+        for row, label, old in zip(rows.tolist(), labels.tolist(), previous.tolist()):
+            if label == old:
+                continue
+            if old >= 0:
+                # The entry in the old list stays behind and is skipped at query time.
+                self._stale_entries += 1
+            self._lists[label].append(row)
+            self._list_cache.pop(label, None)
+
+    def _on_rows_written(self, rows):
+        if self.is_trained:
+            self._assign(rows)
+        elif len(self) >= self.train_size:
+            self.train()
+
+    def _on_compacted(self, kept_rows):
+        if self.is_trained:
+            assignments = np.full(self._allocated, -1, dtype=np.int32)
+            assignments[:len(kept_rows)] = self._assignments[kept_rows]
+            self._assignments = assignments
+            self._rebuild_lists()
+
+    def _snapshot_params(self):
+        return {
+            "index_type": "ivf",
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "train_iterations": self.train_iterations,
+            "trained": self.is_trained,
+        }
+
+    @classmethod
+    def _from_manifest(cls, manifest):
+        return cls(
+            dimension=manifest["dimension"],
+            nlist=manifest["nlist"],
+            nprobe=manifest["nprobe"],
+            train_iterations=manifest["train_iterations"],
+        )
+
+    def _save_storage(self, directory, kept_rows, suffix):
+        written = super()._save_storage(directory, kept_rows, suffix)
+        if self.is_trained:
+            self._centroids.tofile(directory / f"centroids.f32{suffix}")
+            self._assignments[kept_rows].astype(np.int32).tofile(directory / f"assignments.i32{suffix}")
+            written += ["centroids.f32", "assignments.i32"]
+        return written
+
+    def _load_storage(self, directory, manifest):
+        super()._load_storage(directory, manifest)
+        if manifest.get("trained"):
+            self._centroids = np.fromfile(directory / "centroids.f32", dtype=np.float32).reshape(
+                self.nlist, self.dimension
+            )
+            self._assignments = np.fromfile(directory / "assignments.i32", dtype=np.int32)
+            self._rebuild_lists()
+
+    def stats(self):
+        stats = super().stats()
+        if self.is_trained:
+            stats["bytes"] += self._centroids.nbytes + self._assignments.nbytes
+        return stats
+
+    def _list_rows(self, label):
+        rows = self._list_cache.get(label)
+        if rows is None:
+            rows = np.asarray(self._lists[label], dtype=np.int64)
+            self._list_cache[label] = rows
+        return rows
+
+    def _search_many(self, queries_np, top_k, mask=None):
+        if not self.is_trained:
+            return super()._search_many(queries_np, top_k, mask)
+        return self._search_each(queries_np, top_k, mask)
+
+    def _search(self, query_np, top_k, mask=None):
+        if not self.is_trained:
+            return super()._search(query_np, top_k, mask)
+
+        nprobe = min(self.nprobe, self.nlist)
+        if mask is not None and np.count_nonzero(mask) <= self._size * nprobe // self.nlist:
+            # A selective filter leaves fewer rows than the probed lists would; scan them exactly.
+            return super()._search(query_np, top_k, mask)
+
+        probe = self._top_k(self._centroids @ query_np, nprobe)
+        candidates = np.concatenate([self._list_rows(label) for label in probe])
+        if self._stale_entries:
+            # Drop entries left behind in a list after their row was reassigned.
+            candidates = np.unique(candidates[np.isin(self._assignments[candidates], probe)])
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        if len(candidates) == 0:
+            return candidates, np.zeros(0, dtype=np.float32)
+
+        scores = self._score_rows(query_np, candidates)
+        order = self._top_k(scores, top_k)
+        return candidates[order], scores[order]
+
+
+class QuantizedVectorIndex(LocalVectorIndex):
+    """
+    Exact-scan index over quantized vectors: "sq8" (per-dimension int8
+    scalar quantization) or "pq" (product quantization).
+
+    Vectors are buffered as float32 until `train_size` rows exist; then the
+    quantizer is trained and rows are stored only as codes. Queries are
+    scored with asymmetric distance computation against the codes. With
+    `rerank_factor` > 0 the float32 vectors are kept as well and the
+    top_k * rerank_factor candidates are re-scored exactly.
+    """
+
+    def __init__(self, dimension=None, method="sq8", pq_subvectors=96, rerank_factor=0,
+                 train_size=None, **kwargs):
+        if method not in ("sq8", "pq"):
+            raise ValueError(f"Unknown quantization method '{method}'. Expected 'sq8' or 'pq'.")
+        super().__init__(dimension=dimension, **kwargs)
+        self.method = method
+        self.pq_subvectors = pq_subvectors
+        self.rerank_factor = rerank_factor
+        self.train_size = train_size or (1024 if method == "sq8" else ProductQuantizer.ksub * 39)
+        self._rng = np.random.default_rng(0)
+        self._quantizer = None
+        self._codes = None
+
+    @property
+    def is_trained(self):
+        return self._quantizer is not None
+
+    @property
+    def keeps_vectors(self):
+        return not self.is_trained or self.rerank_factor > 0
+
+    def _new_quantizer(self):
+        if self.method == "pq":
+            return ProductQuantizer(self.dimension, subvectors=self.pq_subvectors)
+        return ScalarQuantizer(self.dimension)
+
+    def train(self, sample_rows=65536, block_rows=65536):
+        """Trains the quantizer on (a sample of) the stored vectors and encodes every row."""
+        live_rows = np.flatnonzero(self._live[:self._size])
+        sample = self._rng.choice(live_rows, min(len(live_rows), sample_rows), replace=False)
+        quantizer = self._new_quantizer()
+        quantizer.train(self._matrix[np.sort(sample)])
+
+        self._codes = np.zeros((self._allocated, quantizer.code_size), dtype=np.uint8)
+        for start in range(0, self._size, block_rows):
+            end = min(start + block_rows, self._size)
+            self._codes[start:end] = quantizer.encode(self._matrix[start:end])
+        self._quantizer = quantizer
+        if not self.keeps_vectors:
+            self._matrix = None
+
+    def _resize_storage(self, capacity):
+        if self.keeps_vectors:
+            super()._resize_storage(capacity)
+        if self.is_trained:
+            codes = np.zeros((capacity, self._quantizer.code_size), dtype=np.uint8)
+            codes[:self._size] = self._codes[:self._size]
+            self._codes = codes
+
+    def _write_vectors(self, rows, vectors):
+        if self.keeps_vectors:
+            super()._write_vectors(rows, vectors)
+        if self.is_trained:
+            self._codes[rows] = self._quantizer.encode(vectors)
+
+    def _compact_storage(self, kept_rows, capacity):
+        if self.keeps_vectors:
+            super()._compact_storage(kept_rows, capacity)
+        if self.is_trained:
+            codes = np.zeros((capacity, self._quantizer.code_size), dtype=np.uint8)
+            codes[:len(kept_rows)] = self._codes[kept_rows]
+            self._codes = codes
+
+    def _storage_bytes(self):
+        codes_bytes = 0 if self._codes is None else self._codes.nbytes
+        return super()._storage_bytes() + codes_bytes
+
+    def _on_rows_written(self, rows):
+        if not self.is_trained and len(self) >= self.train_size:
+            self.train()
+
+    def _score_rows(self, query_np, rows=None):
+        if not self.is_trained:
+            return super()._score_rows(query_np, rows)
+        codes = self._codes[:self._size] if rows is None else self._codes[rows]
+        return self._quantizer.inner_products(codes, query_np)
+
+    def _search_many(self, queries_np, top_k, mask=None):
+        if not self.is_trained:
+            return super()._search_many(queries_np, top_k, mask)
+        return self._search_each(queries_np, top_k, mask)
+
+    def _search(self, query_np, top_k, mask=None):
+        if not self.is_trained or self.rerank_factor <= 0:
+            return super()._search(query_np, top_k, mask)
+
+        candidates, _ = super()._search(query_np, top_k * self.rerank_factor, mask)
+        exact = self._matrix[candidates] @ query_np
+        order = self._top_k(exact, top_k)
+        return candidates[order], exact[order]
+
+    def _snapshot_params(self):
+        return {
+            "index_type": "quantized",
+            "method": self.method,
+            "pq_subvectors": self.pq_subvectors,
+            "rerank_factor": self.rerank_factor,
+            "train_size": self.train_size,
+            "trained": self.is_trained,
+            "code_size": self._quantizer.code_size if self.is_trained else None,
+        }
+
+    @classmethod
+    def _from_manifest(cls, manifest):
+        return cls(
+            dimension=manifest["dimension"],
+            method=manifest["method"],
+            pq_subvectors=manifest["pq_subvectors"],
+            rerank_factor=manifest["rerank_factor"],
+            train_size=manifest["train_size"],
+        )
+
+    def _save_storage(self, directory, kept_rows, suffix):
+        written = super()._save_storage(directory, kept_rows, suffix) if self.keeps_vectors else []
+        if self.is_trained:
+            self._codes[kept_rows].tofile(directory / f"codes.u8{suffix}")
+            with open(directory / f"quantizer.npz{suffix}", "wb") as f:
+                np.savez(f, **self._quantizer.state())
+            written += ["codes.u8", "quantizer.npz"]
+        return written
+
+    def _load_storage(self, directory, manifest):
+        if manifest["trained"]:
+            quantizer = self._new_quantizer()
+            with np.load(directory / "quantizer.npz") as state:
+                quantizer.load_state(state)
+            self._quantizer = quantizer
+            if manifest["rows"]:
+                self._codes = np.memmap(
+                    directory / "codes.u8", dtype=np.uint8, mode="c",
+                    shape=(manifest["rows"], manifest["code_size"])
+                )
+        if self.keeps_vectors:
+            super()._load_storage(directory, manifest)
@@ -0,0 +1,173 @@
+# backend/services/metadata_index.py
+
+import numpy as np
+
+
+class MetadataIndex:
+    """
+    Per-field inverted indexes over vector metadata.
+
+    Evaluates Pinecone-style filters ($eq, $ne, $in, $nin, $gt, $gte, $lt,
+    $lte, $and, $or) into a boolean row mask. Equality lookups go through
+    value -> rows postings, range lookups through a sorted (value, row)
+    array per numeric field, so the cost of a filter scales with the rows it
+    selects rather than with the size of the namespace.
+    """
+
+    RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+    def __init__(self):
+        self._postings = {}
+        self._numeric = {}
+        self._posting_cache = {}
+        self._sorted_cache = {}
+
+    @staticmethod
+    def _indexable_values(value):
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        return [item for item in values if not isinstance(item, (dict, list))]
+
+    @staticmethod
+    def _is_numeric(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    def add(self, row, metadata):
+        """Indexes the metadata of one row."""
+        for field, value in (metadata or {}).items():
+            field_postings = self._postings.setdefault(field, {})
+            numbers = []
+            for item in self._indexable_values(value):
+                field_postings.setdefault(item, set()).add(row)
+                self._posting_cache.pop((field, item), None)
+                if self._is_numeric(item):
+                    numbers.append(item)
+            if numbers:
+                self._numeric.setdefault(field, {})[row] = numbers
+                self._sorted_cache.pop(field, None)
+
+    def remove(self, row, metadata):
+        """Removes one row, previously added with `metadata`, from the index."""
+        for field, value in (metadata or {}).items():
+            field_postings = self._postings.get(field, {})
+            for item in self._indexable_values(value):
+                rows = field_postings.get(item)
+                if rows is not None:
+                    rows.discard(row)
+                    if not rows:
+                        del field_postings[item]
+                    self._posting_cache.pop((field, item), None)
+            if self._numeric.get(field, {}).pop(row, None) is not None:
+                self._sorted_cache.pop(field, None)
+
+    def _rows_equal(self, field, value):
+        key = (field, value)
+        rows = self._posting_cache.get(key)
+        if rows is None:
+            postings = self._postings.get(field, {}).get(value, ())
+            rows = np.fromiter(postings, dtype=np.int64, count=len(postings))
+            self._posting_cache[key] = rows
+        return rows
+
+    def _sorted_field(self, field):
+        cached = self._sorted_cache.get(field)
+        if cached is None:
+            field_values = []
+            field_rows = []
+            for row, numbers in self._numeric.get(field, {}).items():
+                field_values.extend(numbers)
+                field_rows.extend([row] * len(numbers))
+            values = np.asarray(field_values, dtype=np.float64)
+            order = np.argsort(values, kind="stable")
+            cached = (values[order], np.asarray(field_rows, dtype=np.int64)[order])
+            self._sorted_cache[field] = cached
+        return cached
+
+    def _rows_in_range(self, field, operator, bound):
+        values, rows = self._sorted_field(field)
+        if operator == "$gt":
+            return rows[np.searchsorted(values, bound, side="right"):]
+        if operator == "$gte":
+            return rows[np.searchsorted(values, bound, side="left"):]
+        if operator == "$lt":
+            return rows[:np.searchsorted(values, bound, side="left")]
+        return rows[:np.searchsorted(values, bound, side="right")]
+
+    def evaluate(self, filter_criteria, size):
+        """
+        Returns a boolean mask of length `size` selecting the rows that match
+        `filter_criteria`.
+        """
+        mask = np.ones(size, dtype=bool)
+        for key, condition in filter_criteria.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self.evaluate(clause, size)
+            elif key == "$or":
+                any_mask = np.zeros(size, dtype=bool)
+                for clause in condition:
+                    any_mask |= self.evaluate(clause, size)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                for operator, operand in condition.items():
+                    mask &= self._evaluate_operator(key, operator, operand, size)
+            else:
+                mask &= self._evaluate_operator(key, "$eq", condition, size)
+        return mask
+
+    def _evaluate_operator(self, field, operator, operand, size):
+        mask = np.zeros(size, dtype=bool)
+        if operator in ("$eq", "$ne"):
+            mask[self._rows_equal(field, operand)] = True
+        elif operator in ("$in", "$nin"):
+            for value in operand:
+                mask[self._rows_equal(field, value)] = True
+        elif operator in self.RANGE_OPERATORS:
+            mask[self._rows_in_range(field, operator, operand)] = True
+        else:
+            raise ValueError(f"Unsupported filter operator '{operator}' on field '{field}'.")
+
+        if operator in ("$ne", "$nin"):
+            mask = ~mask
+        return mask
+
+
+def matches_filter(metadata, filter_criteria):
+    """
+    Evaluates a Pinecone-style filter against a single metadata dict.
+    Used where there is no MetadataIndex to consult, e.g. for BM25 hits.
+    """
+    for key, condition in filter_criteria.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(_matches_operator(metadata.get(key), op, operand) for op, operand in condition.items()):
+                return False
+        elif not _matches_operator(metadata.get(key), "$eq", condition):
+            return False
+    return True
+
+
+def _matches_operator(value, operator, operand):
+    values = value if isinstance(value, (list, tuple, set)) else [value]
+    if operator == "$eq":
+        return operand in values
+    if operator == "$ne":
+        return operand not in values
+    if operator == "$in":
+        return any(item in values for item in operand)
+    if operator == "$nin":
+        return not any(item in values for item in operand)
+    if operator in MetadataIndex.RANGE_OPERATORS:
+        numbers = [item for item in values if MetadataIndex._is_numeric(item)]
+        compare = {
+            "$gt": lambda x: x > operand,
+            "$gte": lambda x: x >= operand,
+            "$lt": lambda x: x < operand,
+            "$lte": lambda x: x <= operand,
+        }[operator]
+        return any(compare(item) for item in numbers)
+    raise ValueError(f"Unsupported filter operator '{operator}'.")
@@ -0,0 +1,88 @@
+# backend/services/pubmed_baseline.py
+
+import re
+import gzip
+import time
+from pathlib import Path
+
+from backend.services.pubmed_xml import iter_pubmed_articles
+
+
+class BaselineFilter:
+    """
+    Selection rules for baseline/update file ingestion. An article is kept
+    if it has an abstract (unless `require_abstract` is off) and matches any
+    of the MeSH descriptors or any keyword, as a whole word in its title,
+    abstract or author keywords. With no MeSH terms and no keywords every
+    article with an abstract is kept.
+    """
+
+    def __init__(self, mesh_terms=(), keywords=(), require_abstract=True):
+        self.mesh_terms = [term.lower() for term in mesh_terms]
+        self.keywords = list(keywords)
+        self.require_abstract = require_abstract
+        self._pattern = None
+
+    def __getstate__(self):
+        # Sent to worker processes; the compiled pattern is rebuilt there.
+        return {**self.__dict__, "_pattern": None}
+
+    def matches(self, article):
+        if self.require_abstract and not article['abstract']:
+            return False
+        if not self.mesh_terms and not self.keywords:
+            return True
+        if self.mesh_terms:
+            mesh = {term.lower() for term in article.get('mesh_terms', [])}
+            if any(term in mesh for term in self.mesh_terms):
+                return True
+        if self.keywords:
+            if self._pattern is None:
+                self._pattern = re.compile(
+                    r"\b(?:" + "|".join(re.escape(keyword) for keyword in self.keywords) + r")\b", re.IGNORECASE
+                )
+            text = " ".join([article['title'], article['abstract'], *article.get('keywords', [])])
+            return self._pattern.search(text) is not None
+        return False
+
+
+def stream_baseline_file(path, rules=None, out=None, chunk_size=1000):
+    """
+    Parses one PubMed baseline or update file (.xml or .xml.gz) and sends
+    the records passing `rules` to the queue `out` while it parses:
+    ("articles", [...]) messages of at most `chunk_size` records, then
+    ("done", {"file", "parsed", "kept", "deleted", "seconds"}), where
+    `deleted` are the PMIDs the file's DeleteCitation lists, or
+    ("error", message) if the file could not be parsed. A bounded `out`
+    limits how far the parser runs ahead of its consumer. Top-level so it
+    can run in a process pool.
+    """
+    start = time.perf_counter()
+    rules = rules or BaselineFilter()
+    deleted = []
+    opener = gzip.open if str(path).endswith(".gz") else open
+    parsed = kept = 0
+    chunk = []
+    try:
+        with opener(path, "rb") as f:
+            for article in iter_pubmed_articles(f, include_mesh=True, on_delete=deleted.extend):
+                parsed += 1
+                if rules.matches(article):
+                    chunk.append(article)
+                    if len(chunk) >= chunk_size:
+                        out.put(("articles", chunk))
+                        kept += len(chunk)
+                        chunk = []
+    except Exception as e:
+        out.put(("error", f"{type(e).__name__}: {e}"))
+        return
+    if chunk:
+        out.put(("articles", chunk))
+        kept += len(chunk)
+    out.put(("done", {
+        "file": str(Path(path)),
+        "parsed": parsed,
+        "kept": kept,
+        "deleted": deleted,
+        "seconds": time.perf_counter() - start,
+    }))
@@ -0,0 +1,117 @@
+# backend/services/pubmed_cache.py
+
+import os
+import gzip
+import json
+import time
+import hashlib
+from pathlib import Path
+
+CACHE_MODES = ("off", "read-write", "replay", "record")
+
+
+class PubMedCacheMiss(LookupError):
+    """Raised in replay mode when a response is not in the cache."""
+
+
+def normalize_query(query):
+    """
+    Whitespace-insensitive form of a PubMed query, used in cache keys. Case
+    is kept: PubMed reads "a AND b" as a boolean query but "a and b" as terms.
+    """
+    return " ".join(str(query).split())
+
+
+class PubMedResponseCache:
+    """
+    Disk cache of E-utilities responses (esearch results as JSON, efetch
+    bodies as gzipped XML), keyed by endpoint and normalized parameters.
+
+    Modes:
+      read-write  serve fresh entries (younger than `ttl_seconds`), fetch and store misses
+      replay      serve only from the cache, never touch the network (misses raise PubMedCacheMiss)
+      record      always fetch live and overwrite the cache, e.g. to build a fixture corpus
+    """
+
+    def __init__(self, directory, mode="read-write", ttl_seconds=7 * 24 * 3600):
+        if mode not in CACHE_MODES or mode == "off":
+            raise ValueError(f"Unknown PubMed cache mode '{mode}', expected one of {CACHE_MODES[1:]}.")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """The cache configured by PUBMED_CACHE_DIR / PUBMED_CACHE_MODE / PUBMED_CACHE_TTL_HOURS, or None."""
+        mode = os.getenv("PUBMED_CACHE_MODE", "read-write" if os.getenv("PUBMED_CACHE_DIR") else "off")
+        if mode == "off":
+            return None
+        return cls(
+            os.getenv("PUBMED_CACHE_DIR", "./data/pubmed_cache"),
+            mode=mode,
+            ttl_seconds=float(os.getenv("PUBMED_CACHE_TTL_HOURS", "168")) * 3600,
+        )
+
+    @staticmethod
+    def key(endpoint, params):
+        normalized = {
+            name: normalize_query(value) if name in ("term", "query") else value
+            for name, value in params.items() if value is not None
+        }
+        payload = json.dumps([endpoint, normalized], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, endpoint, key, suffix):
+        return self.directory / endpoint / key[:2] / f"{key}{suffix}"
+
+    def _lookup(self, path):
+        if self.mode == "record" or not path.exists():
+            return False
+        if self.mode == "replay":
+            return True
+        return time.time() - path.stat().st_mtime < self.ttl_seconds
+
+    def _store(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _miss(self, endpoint, params):
+        self.misses += 1
+        if self.mode == "replay":
+            raise PubMedCacheMiss(f"No cached {endpoint} response for {params} (replay mode).")
+
+    def get_json(self, endpoint, params, fetch):
+        """Returns the cached JSON-able response for (endpoint, params), calling fetch() on a miss."""
+        path = self._path(endpoint, self.key(endpoint, params), ".json")
+        if self._lookup(path):
+            self.hits += 1
+            return json.loads(path.read_text())
+        self._miss(endpoint, params)
+        value = fetch()
+        self._store(path, json.dumps(value).encode("utf-8"))
+        return value
+
+    def get_bytes(self, endpoint, params, fetch):
+        """Returns the cached raw response body for (endpoint, params), calling fetch() on a miss."""
+        path = self._path(endpoint, self.key(endpoint, params), ".xml.gz")
+        if self._lookup(path):
+            self.hits += 1
+            return gzip.decompress(path.read_bytes())
+        self._miss(endpoint, params)
+        body = fetch()
+        self._store(path, gzip.compress(body, compresslevel=5))
+        return body
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "directory": str(self.directory),
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
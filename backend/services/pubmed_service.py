@@ -1,19 +1,185 @@
 # backend/services/pubmed_service.py
 
 from Bio import Entrez
+import io
 import os
+import time
+import threading
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.services.pubmed_xml import iter_pubmed_articles
+from backend.services.pubmed_cache import PubMedResponseCache, PubMedCacheMiss
+
+# esearch will not page past the first 10,000 PubMed records of a result set.
+ESEARCH_MAX_RECORDS = 10000
+EARLIEST_DATE = date(1781, 1, 1)
+# A fixed upper bound (rather than today) keeps date-sliced searches, and their cache keys, stable.
+LATEST_DATE = date(3000, 12, 31)
+ESEARCH_FIELDS = ("Count", "WebEnv", "QueryKey", "IdList")
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# NCBI allows 3 requests/s per client, or 10/s with an API key. Shared by every PubMedService.
+_rate_limiter = RateLimiter(10 if os.getenv("NCBI_API_KEY") else 3)
+
 
 class PubMedService:
-    def __init__(self, email=None):
+    def __init__(self, email=None, max_concurrency=3, cache=None):
         """
         Initializes the PubMed service. An email is required by NCBI for API access.
+        `max_concurrency` bounds the efetch pages in flight; the process-wide
+        rate limiter keeps them under NCBI's requests-per-second limit.
+        `cache` is a PubMedResponseCache; by default it is configured from
+        PUBMED_CACHE_DIR / PUBMED_CACHE_MODE (see services/pubmed_cache.py).
         """
         self.email = email or os.getenv("PUBMED_EMAIL")
         if not self.email:
             raise ValueError("An email address must be provided for PubMed API access, either directly or via the PUBMED_EMAIL environment variable.")
         Entrez.email = self.email
-        # In case of API key, you can set it like this:
-        # Entrez.api_key = os.getenv("NCBI_API_KEY")
+        if os.getenv("NCBI_API_KEY"):
+            Entrez.api_key = os.getenv("NCBI_API_KEY")
+        self.max_concurrency = max_concurrency
+        self.cache = cache if cache is not None else PubMedResponseCache.from_env()
+
+    def _esearch(self, use_cache=True, cache_params=None, **params):
+        def fetch():
+            _rate_limiter.wait()
+            handle = Entrez.esearch(db="pubmed", **params)
+            try:
+                record = Entrez.read(handle)
+            finally:
+                handle.close()
+            # Plain JSON-able values, so responses can be cached
+            return {
+                field: [str(v) for v in record[field]] if field == "IdList" else str(record[field])
+                for field in ESEARCH_FIELDS if field in record
+            }
+
+        if self.cache is None or not use_cache:
+            return fetch()
+        return self.cache.get_json("esearch", cache_params or params, fetch)
+
+    def _efetch(self, cache_params=None, **params):
+        """
+        One efetch, returned as compact article records. Without a cache the
+        response is parsed as it streams in; with one, the raw XML body is
+        cached under `cache_params` (default: the request parameters).
+        """
+        def open_handle():
+            _rate_limiter.wait()
+            return Entrez.efetch(db="pubmed", rettype="abstract", retmode="xml", **params)
+
+        if self.cache is None:
+            handle = open_handle()
+            try:
+                return list(iter_pubmed_articles(handle))
+            finally:
+                handle.close()
+
+        def fetch():
+            handle = open_handle()
+            try:
+                body = handle.read()
+            finally:
+                handle.close()
+            return body.encode("utf-8") if isinstance(body, str) else body
+
+        body = self.cache.get_bytes("efetch", cache_params or params, fetch)
+        return list(iter_pubmed_articles(io.BytesIO(body)))
+
+    def search_history(self, query: str, mindate=None, maxdate=None, use_cache=True):
+        """
+        Runs esearch with usehistory=y and returns {"count", "webenv", "query_key",
+        "query", "mindate", "maxdate"}, a handle on the full result set on NCBI's
+        history server. Optional mindate/maxdate (YYYY/MM/DD) restrict it by
+        publication date.
+        """
+        params = {"term": query, "usehistory": "y", "retmax": 0}
+        if mindate or maxdate:
+            mindate = mindate or EARLIEST_DATE.strftime("%Y/%m/%d")
+            maxdate = maxdate or LATEST_DATE.strftime("%Y/%m/%d")
+            params.update(datetype="pdat", mindate=mindate, maxdate=maxdate)
+        record = self._esearch(use_cache=use_cache, **params)
+        return {"count": int(record["Count"]), "webenv": record["WebEnv"], "query_key": record["QueryKey"],
+                "query": query, "mindate": mindate, "maxdate": maxdate}
+
+    def history_slices(self, query: str, start=EARLIEST_DATE, end=LATEST_DATE):
+        """
+        Splits a query into publication-date slices of at most 10,000 records
+        each, so result sets beyond esearch's paging limit can be read in full.
+        Yields search_history() results newest slice first, matching esearch's
+        most-recent-first order. Slicing is lazy: older date ranges are only
+        searched once the caller asks for them.
+        """
+        history = self.search_history(query, start.strftime("%Y/%m/%d"), end.strftime("%Y/%m/%d"))
+        if history["count"] <= ESEARCH_MAX_RECORDS or start >= end:
+            if history["count"] > ESEARCH_MAX_RECORDS:
+                print(f"Warning: {history['count']} records published on {start}; only the first "
+                      f"{ESEARCH_MAX_RECORDS} are reachable.")
+            if history["count"]:
+                yield history
+            return
+        middle = start + (end - start) // 2
+        yield from self.history_slices(query, middle + timedelta(days=1), end)
+        yield from self.history_slices(query, start, middle)
+
+    def history_pages(self, query: str, max_results=None, page_size=500, history=None):
+        """
+        Page descriptors {"webenv", "query_key", "retstart", "retmax", "query",
+        "mindate", "maxdate"} covering up to `max_results` records of `query`
+        (all of them when None), most recent first. The query is only split
+        into date slices when more than 10,000 records are wanted. Pass the
+        search_history() of `query` as `history` if the caller already ran it.
+        """
+        history = history or self.search_history(query)
+        remaining = history["count"] if max_results is None else min(max_results, history["count"])
+        if remaining <= 0:
+            return []
+        slices = [history] if remaining <= ESEARCH_MAX_RECORDS else self.history_slices(query)
+        pages = []
+        for piece in slices:
+            for retstart in range(0, min(piece["count"], ESEARCH_MAX_RECORDS), page_size):
+                retmax = min(page_size, piece["count"] - retstart, remaining)
+                pages.append({"webenv": piece["webenv"], "query_key": piece["query_key"],
+                              "retstart": retstart, "retmax": retmax, "query": piece["query"],
+                              "mindate": piece["mindate"], "maxdate": piece["maxdate"]})
+                remaining -= retmax
+                if remaining <= 0:
+                    # Stop before the next (older) slice is searched.
+                    return pages
+        return pages
+
+    @staticmethod
+    def updates_query(query: str, since, until=None):
+        """
+        `query` restricted to records added (entry date, EDAT) or revised
+        (modification date, MDAT) between `since` and `until` (YYYY/MM/DD, inclusive).
+        """
+        until = until or LATEST_DATE.strftime("%Y/%m/%d")
+        return (f'({query}) AND (("{since}"[EDAT] : "{until}"[EDAT]) '
+                f'OR ("{since}"[MDAT] : "{until}"[MDAT]))')
+
+    def update_pages(self, query: str, since, until=None, max_results=None, page_size=500):
+        """history_pages() for the records of `query` added or revised since `since`."""
+        return self.history_pages(self.updates_query(query, since, until), max_results=max_results,
+                                  page_size=page_size)
 
     def search_articles(self, query: str, max_results=100):
         """
@@ -21,26 +187,81 @@ class PubMedService:
         
         Args:
             query: The search query (e.g., "microbiome AND IBD").
-            max_results: The maximum number of article IDs to return.
+            max_results: The maximum number of article IDs to return. Up to
+                10,000 takes one request; larger result sets are paged
+                through the history server.
         
         Returns:
-            A list of PubMed article IDs.
+            A list of PubMed article IDs, or [] if the search failed
+            (use search_ids() to have failures raise instead).
         """
         try:
-            handle = Entrez.esearch(db="pubmed", term=query, retmax=max_results)
-            record = Entrez.read(handle)
-            handle.close()
-            return record["IdList"]
+            return self.search_ids(query, max_results)
         except Exception as e:
             print(f"Error searching PubMed for query '{query}': {e}")
             return []
 
-    def fetch_article_details(self, pubmed_ids: list):
+    def search_ids(self, query: str, max_results=100):
+        """search_articles() that raises on failure, so an empty list always means no hits."""
+        if max_results <= ESEARCH_MAX_RECORDS:
+            return list(self._esearch(term=query, retmax=max_results)["IdList"])
+
+        ids = []
+        for page in self.history_pages(query, max_results=max_results, page_size=ESEARCH_MAX_RECORDS):
+            ids.extend(self.fetch_history_ids(page))
+        return ids
+
+    def _on_history_page(self, page, request):
+        """
+        Calls request(webenv, query_key) for a history_pages() page. With a
+        cache, the WebEnv may come from a cached esearch whose NCBI session has
+        since expired, so a failed request is retried once on a fresh search.
+        """
+        try:
+            return request(page["webenv"], page["query_key"])
+        except PubMedCacheMiss:
+            raise
+        except Exception:
+            if self.cache is None:
+                raise
+            fresh = self.search_history(page["query"], page["mindate"], page["maxdate"], use_cache=False)
+            return request(fresh["webenv"], fresh["query_key"])
+
+    @staticmethod
+    def _page_cache_params(page):
+        # Cached by query and position rather than by WebEnv, which changes every session
+        return {name: page[name] for name in ("query", "mindate", "maxdate", "retstart", "retmax")}
+
+    def fetch_history_ids(self, page):
+        """The PMIDs of one history_pages() page, with a single esearch on the stored result set."""
+        cache_params = {"history_ids": True, **self._page_cache_params(page)}
+        return self._on_history_page(page, lambda webenv, query_key: list(self._esearch(
+            cache_params=cache_params,
+            # "#<query_key>" refers to the result set stored on the history server
+            term=f"#{query_key}", WebEnv=webenv, retstart=page["retstart"], retmax=page["retmax"]
+        )["IdList"]))
+
+    def fetch_history_page(self, page):
+        """Fetches the articles of one history_pages() page with a single efetch."""
+        cache_params = self._page_cache_params(page)
+        return self._on_history_page(page, lambda webenv, query_key: self._efetch(
+            cache_params, WebEnv=webenv, query_key=query_key, retstart=page["retstart"], retmax=page["retmax"]
+        ))
+
+    def fetch_records(self, pubmed_ids: list):
+        """
+        Fetches the articles for one page of PubMed IDs with a single XML
+        efetch. Unlike fetch_article_details, errors are raised to the caller.
+        """
+        return self._efetch(id=",".join(pubmed_ids))
+
+    def fetch_article_details(self, pubmed_ids: list, page_size=200):
         """
         Fetches details for a list of PubMed article IDs.
         
         Args:
             pubmed_ids: A list of PubMed IDs.
+            page_size: IDs per efetch request.
             
         Returns:
             A list of dictionaries, where each dictionary contains the details of an article.
@@ -49,33 +270,29 @@ class PubMedService:
             return []
             
         try:
-            handle = Entrez.efetch(db="pubmed", id=pubmed_ids, rettype="medline", retmode="text")
-            # The response is in MEDLINE format, which is not easily parsable with Entrez.read
-            # A more robust solution would parse this text, but for now we will use 'abstract' rettype which gives XML
-            handle.close()
-
-            # Let's re-fetch with a more structured format
-            handle = Entrez.efetch(db="pubmed", id=pubmed_ids, rettype="abstract", retmode="xml")
-            records = Entrez.read(handle)
-            handle.close()
-
-            articles = []
-            for record in records['PubmedArticle']:
-                article_info = {
-                    "pmid": str(record['MedlineCitation']['PMID']),
-                    "title": record['MedlineCitation']['Article']['ArticleTitle'],
-                    "abstract": self._get_abstract(record),
-                    "journal": record['MedlineCitation']['Article']['Journal']['Title'],
-                    "year": record['MedlineCitation']['Article']['Journal']['JournalIssue']['PubDate'].get('Year'),
-                    "authors": self._get_authors(record),
-                }
-                articles.append(article_info)
-            return articles
+            pages = [pubmed_ids[i:i + page_size] for i in range(0, len(pubmed_ids), page_size)]
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                return [article for articles in executor.map(self.fetch_records, pages) for article in articles]
 
         except Exception as e:
             print(f"Error fetching details for PubMed IDs: {e}")
             return []
 
+    def parse_record(self, record):
+        """
+        Extracts the fields we keep from one Entrez.read() PubmedArticle record.
+        Fetches use the streaming parser in pubmed_xml instead; this is kept for
+        callers that already hold Entrez records.
+        """
+        return {
+            "pmid": str(record['MedlineCitation']['PMID']),
+            "title": record['MedlineCitation']['Article']['ArticleTitle'],
+            "abstract": self._get_abstract(record),
+            "journal": record['MedlineCitation']['Article']['Journal']['Title'],
+            "year": record['MedlineCitation']['Article']['Journal']['JournalIssue']['PubDate'].get('Year'),
+            "authors": self._get_authors(record),
+        }
+
     def _get_abstract(self, record):
         """Helper to extract abstract text, handling different structures."""
         abstract_parts = []
@@ -0,0 +1,102 @@
+# backend/services/pubmed_sync_state.py
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+from backend.services.pubmed_cache import normalize_query
+
+
+def article_hash(article):
+    """Content hash of the fields we embed and store, used to detect revised records."""
+    fields = [article.get(name) for name in ("title", "abstract", "journal", "year", "authors")]
+    return hashlib.sha256(json.dumps(fields, default=str).encode("utf-8")).hexdigest()
+
+
+class PubMedSyncState:
+    """
+    Per-query incremental sync state in SQLite: the entry-date high-water
+    mark of the last complete sync and the content hash of every PMID
+    ingested for the query.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.getenv("PUBMED_SYNC_DB", "./data/pubmed_sync.sqlite"))
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS sync_queries ("
+                " query_key TEXT PRIMARY KEY, query TEXT NOT NULL, high_water TEXT, last_sync REAL);"
+                "CREATE TABLE IF NOT EXISTS sync_articles ("
+                " query_key TEXT NOT NULL, pmid TEXT NOT NULL, content_hash TEXT NOT NULL,"
+                " PRIMARY KEY (query_key, pmid));"
+            )
+            self._conn = conn
+        return self._conn
+
+    def high_water(self, query):
+        """The entry date (YYYY/MM/DD) the last complete sync of `query` ran on, or None."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT high_water FROM sync_queries WHERE query_key = ?", (normalize_query(query),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_high_water(self, query, high_water):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO sync_queries (query_key, query, high_water, last_sync) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(query_key) DO UPDATE SET high_water = excluded.high_water,"
+                " last_sync = excluded.last_sync",
+                (normalize_query(query), query, high_water, time.time())
+            )
+            conn.commit()
+
+    def known_hashes(self, query, pmids):
+        """{pmid: content_hash} for the given PMIDs already ingested for `query`."""
+        key = normalize_query(query)
+        pmids = list(pmids)
+        known = {}
+        with self._lock:
+            conn = self._connect()
+            for i in range(0, len(pmids), 500):
+                chunk = pmids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                known.update(conn.execute(
+                    f"SELECT pmid, content_hash FROM sync_articles WHERE query_key = ? AND pmid IN ({placeholders})",
+                    [key, *chunk]
+                ).fetchall())
+        return known
+
+    def mark_ingested(self, query, hashes):
+        """Records {pmid: content_hash} as ingested for `query`."""
+        key = normalize_query(query)
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO sync_articles (query_key, pmid, content_hash) VALUES (?, ?, ?)",
+                [(key, pmid, content_hash) for pmid, content_hash in hashes.items()]
+            )
+            conn.commit()
+
+    def stats(self, query):
+        key = normalize_query(query)
+        with self._lock:
+            conn = self._connect()
+            known = conn.execute("SELECT COUNT(*) FROM sync_articles WHERE query_key = ?", (key,)).fetchone()[0]
+            row = conn.execute(
+                "SELECT high_water, last_sync FROM sync_queries WHERE query_key = ?", (key,)
+            ).fetchone()
+        return {"query": query, "known_pmids": known,
+                "high_water": row[0] if row else None, "last_sync": row[1] if row else None}
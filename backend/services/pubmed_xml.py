@@ -0,0 +1,59 @@
+# backend/services/pubmed_xml.py
+
+import xml.etree.ElementTree as ET
+
+
+def _text(element):
+    """All text inside `element`, including inline markup such as <i> or <sup>."""
+    return "".join(element.itertext()) if element is not None else ""
+
+
+def _article_record(article, include_mesh=False):
+    citation = article.find("MedlineCitation")
+    article_el = citation.find("Article")
+
+    abstract_parts = [_text(part) for part in article_el.findall("Abstract/AbstractText")]
+    authors = []
+    for author in article_el.findall("AuthorList/Author"):
+        last_name, fore_name = author.find("LastName"), author.find("ForeName")
+        if last_name is not None and fore_name is not None:
+            authors.append(f"{_text(fore_name)} {_text(last_name)}")
+    year = article_el.find("Journal/JournalIssue/PubDate/Year")
+
+    record = {
+        "pmid": _text(citation.find("PMID")),
+        "title": _text(article_el.find("ArticleTitle")),
+        "abstract": "\n".join(abstract_parts),
+        "journal": _text(article_el.find("Journal/Title")),
+        "year": _text(year) if year is not None else None,
+        "authors": authors,
+    }
+    if include_mesh:
+        record["mesh_terms"] = [_text(name) for name in citation.findall("MeshHeadingList/MeshHeading/DescriptorName")]
+        record["keywords"] = [_text(keyword) for keyword in citation.findall("KeywordList/Keyword")]
+    return record
+
+
+def iter_pubmed_articles(source, include_mesh=False, on_delete=None):
+    """
+    Streams a PubmedArticleSet XML document (efetch response or baseline
+    file) and yields one compact record per article:
+    {"pmid", "title", "abstract", "journal", "year", "authors"}, plus
+    "mesh_terms" and "keywords" with `include_mesh`.
+
+    `source` is a path or a binary file object, e.g. an open HTTP response.
+    Each <PubmedArticle> is dropped from the tree once its record is built,
+    so memory stays flat however many articles the document holds. PMIDs
+    listed in a <DeleteCitation> (update files) are passed to `on_delete`.
+    """
+    context = ET.iterparse(source, events=("start", "end"))
+    _, root = next(context)
+    for event, element in context:
+        if event != "end" or element.tag not in ("PubmedArticle", "PubmedBookArticle", "DeleteCitation"):
+            continue
+        if element.tag == "PubmedArticle":
+            yield _article_record(element, include_mesh)
+        elif element.tag == "DeleteCitation" and on_delete is not None:
+            on_delete([_text(pmid) for pmid in element.findall("PMID")])
+        # Release the finished element (and anything before it) from the root.
+        root.clear()
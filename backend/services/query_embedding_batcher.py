@@ -0,0 +1,138 @@
+# backend/services/query_embedding_batcher.py
+
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.services.embedding_cache import cached_encode
+
+DEFAULT_MAX_WAIT_MS = float(os.getenv("QUERY_BATCH_MAX_WAIT_MS", "5"))
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("QUERY_BATCH_MAX_SIZE", "32"))
+
+
+class QueryEmbeddingBatcher:
+    """
+    Cross-request micro-batcher for single-query embeddings.
+
+    Concurrent callers of `embed()` are queued; a worker task collects
+    queries for up to `max_wait_ms` (or until `max_batch_size` are waiting),
+    embeds them with one forward pass in a worker thread and resolves each
+    caller's future. The worker binds to the running event loop on first use.
+    """
+
+    def __init__(self, model_id, max_wait_ms=DEFAULT_MAX_WAIT_MS, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        self.model_id = model_id
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        # One thread: batches run back to back while the next one is collected.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"embed-{model_id}")
+
+        self.requests = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.max_queue_depth = 0
+        self.batch_size_counts = {}
+        self._queue_wait_seconds = 0.0
+        self._encode_seconds = 0.0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def embed(self, text):
+        """Embeds one query and returns it as a list of floats."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((text, future, time.perf_counter()))
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (e.g. client disconnects) are not embedded.
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            self._queue_wait_seconds += sum(started - enqueued for _, _, enqueued in batch)
+            try:
+                vectors = await self._loop.run_in_executor(
+                    self._executor, cached_encode, self.model_id, [text for text, _, _ in batch]
+                )
+            except Exception as e:
+                self.failed_batches += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future, _), vector in zip(batch, vectors):
+                    if not future.done():
+                        future.set_result(vector.tolist())
+            self._encode_seconds += time.perf_counter() - started
+            self.batches += 1
+            self.batch_size_counts[len(batch)] = self.batch_size_counts.get(len(batch), 0) + 1
+
+    def stats(self):
+        embedded = sum(size * count for size, count in self.batch_size_counts.items())
+        return {
+            "model_id": self.model_id,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "avg_batch_size": embedded / self.batches if self.batches else 0.0,
+            "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+            "avg_queue_wait_ms": 1000.0 * self._queue_wait_seconds / embedded if embedded else 0.0,
+            "avg_batch_ms": 1000.0 * self._encode_seconds / self.batches if self.batches else 0.0,
+        }
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_query_batcher(model_id):
+    """Returns the process-wide batcher for `model_id`, creating it on first use."""
+    with _batchers_lock:
+        if model_id not in _batchers:
+            _batchers[model_id] = QueryEmbeddingBatcher(model_id)
+        return _batchers[model_id]
+
+
+async def embed_query(model_id, text):
+    return await get_query_batcher(model_id).embed(text)
+
+
+def query_batcher_stats():
+    with _batchers_lock:
+        return {model_id: batcher.stats() for model_id, batcher in _batchers.items()}
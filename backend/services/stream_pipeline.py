@@ -0,0 +1,172 @@
+# backend/services/stream_pipeline.py
+
+import time
+import queue
+import threading
+
+_END = object()
+
+
+class Stage:
+    """
+    One step of a StreamPipeline.
+
+    `fn` is called with one input item (or, with `batch_size`, a list of up
+    to that many items) and returns an iterable of output items for the next
+    stage, or None. `workers` threads run it in parallel.
+    """
+
+    def __init__(self, name, fn, workers=1, batch_size=None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.items_in = 0
+        self.items_out = 0
+        self.calls = 0
+        self.errors = []
+        self.busy_seconds = 0.0
+        self.input_stall_seconds = 0.0
+        self.output_stall_seconds = 0.0
+
+    def record(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def stats(self, elapsed):
+        return {
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "calls": self.calls,
+            "errors": len(self.errors),
+            "busy_seconds": self.busy_seconds,
+            # Time workers waited on an empty input queue (upstream too slow)...
+            "input_stall_seconds": self.input_stall_seconds,
+            # ...and on a full output queue (downstream too slow).
+            "output_stall_seconds": self.output_stall_seconds,
+            "items_per_second": self.items_in / elapsed if elapsed > 0 else 0.0,
+            "utilization": self.busy_seconds / (elapsed * self.workers) if elapsed > 0 else 0.0,
+        }
+
+
+class StreamPipeline:
+    """
+    Runs items through a chain of stages connected by bounded queues.
+
+    Every stage has its own worker threads, so I/O-bound and CPU-bound stages
+    overlap, and the bounded queues keep at most `queue_size` items in flight
+    between two stages, so memory stays flat however large the input is.
+    A failing call is recorded on its stage and its items are dropped; the
+    rest of the stream keeps flowing.
+    """
+
+    def __init__(self, stages, queue_size=4):
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def run(self, source):
+        """Feeds every item of `source` through the stages and returns per-stage stats."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        for stage in self.stages:
+            stage.reset()
+
+        def emit(stage, index, items):
+            if index + 1 == len(self.stages):
+                return
+            for item in items:
+                start = time.perf_counter()
+                queues[index + 1].put(item)
+                stage.record(output_stall_seconds=time.perf_counter() - start)
+
+        def call(stage, index, payload, count):
+            start = time.perf_counter()
+            try:
+                outputs = list(stage.fn(payload) or ())
+            except Exception as e:
+                stage.record(calls=1, items_in=count, busy_seconds=time.perf_counter() - start)
+                with stage._lock:
+                    stage.errors.append(f"{type(e).__name__}: {e}")
+                print(f"Pipeline stage '{stage.name}' failed on {count} item(s): {e}")
+                return
+            stage.record(calls=1, items_in=count, items_out=len(outputs),
+                         busy_seconds=time.perf_counter() - start)
+            emit(stage, index, outputs)
+
+        def work(stage, index):
+            batch = []
+            while True:
+                start = time.perf_counter()
+                item = queues[index].get()
+                stage.record(input_stall_seconds=time.perf_counter() - start)
+                if item is _END:
+                    break
+                if stage.batch_size:
+                    batch.append(item)
+                    if len(batch) >= stage.batch_size:
+                        call(stage, index, batch, len(batch))
+                        batch = []
+                else:
+                    call(stage, index, item, 1)
+            if batch:
+                call(stage, index, batch, len(batch))
+            with remaining_lock:
+                remaining[index] -= 1
+                last_worker = remaining[index] == 0
+            # The last worker out closes the next stage's input.
+            if last_worker and index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1].workers):
+                    queues[index + 1].put(_END)
+
+        threads = [
+            threading.Thread(target=work, args=(stage, index), name=f"{stage.name}-{n}", daemon=True)
+            for index, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        source_stall = 0.0
+        source_items = 0
+        try:
+            for item in source:
+                start = time.perf_counter()
+                queues[0].put(item)
+                source_stall += time.perf_counter() - start
+                source_items += 1
+        finally:
+            # Even if the source raises, the stages drain what they have and their threads exit.
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_END)
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            "seconds": elapsed,
+            "source_items": source_items,
+            "source_stall_seconds": source_stall,
+            "stages": {stage.name: stage.stats(elapsed) for stage in self.stages},
+        }
+
+
+def format_report(report):
+    """Renders a StreamPipeline report as a small text table."""
+    lines = [f"{'stage':<10}{'workers':>8}{'in':>8}{'out':>8}{'items/s':>10}{'busy s':>9}"
+             f"{'starved s':>11}{'blocked s':>11}{'errors':>8}"]
+    for name, stats in report["stages"].items():
+        lines.append(
+            f"{name:<10}{stats['workers']:>8}{stats['items_in']:>8}{stats['items_out']:>8}"
+            f"{stats['items_per_second']:>10.1f}{stats['busy_seconds']:>9.2f}"
+            f"{stats['input_stall_seconds']:>11.2f}{stats['output_stall_seconds']:>11.2f}{stats['errors']:>8}"
+        )
+    lines.append(f"total {report['seconds']:.2f}s for {report['source_items']} source items")
+    return "\n".join(lines)
@@ -1,19 +1,69 @@
 import os
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from pinecone import Pinecone, ServerlessSpec
 from dotenv import load_dotenv
-import numpy as np
+
+from backend.services.bm25_index import BM25Index, reciprocal_rank_fusion
+from backend.services.bulk_upserter import BulkUpserter, PineconeRestIndex
+from backend.services.local_vector_index import LocalVectorIndex, IVFVectorIndex, QuantizedVectorIndex
 
 # Load environment variables
 load_dotenv()
 
+
+def query_pinecone_many(index, query_vectors, top_k=10, namespace="default", filter_criteria=None,
+                        max_concurrency=8):
+    """
+    Runs one Pinecone query per vector with at most `max_concurrency`
+    requests in flight. Results are returned in the order of `query_vectors`.
+    """
+    def run_query(query_vector):
+        return index.query(
+            vector=query_vector,
+            top_k=top_k,
+            namespace=namespace,
+            filter=filter_criteria,
+            include_metadata=True
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(query_vectors)))) as executor:
+        return list(executor.map(run_query, query_vectors))
+
+# Metadata fields whose text is indexed for BM25 in hybrid retrieval.
+TEXT_FIELDS = ("title", "abstract")
+# File name of the text index inside a mock-mode snapshot directory.
+TEXT_INDEX_SNAPSHOT = "text_index.sqlite"
+
+
 class VectorDBService:
-    def __init__(self, index_name="genskey-research"):
+    def __init__(self, index_name="genskey-research", index_text=None):
         self.mock_mode = os.getenv("MOCK_VECTOR_DB", "False").lower() == 'true'
+        self.index_name = index_name
+        # BM25 index read by hybrid queries, scoped to this store: in memory next to the mock-mode
+        # store, or one file per Pinecone index. Upserts and deletes keep it in step unless
+        # index_text=False (or TEXT_INDEX_ON_UPSERT=false).
+        self.text_index = BM25Index() if self.mock_mode else BM25Index.for_index(index_name)
+        if index_text is None:
+            index_text = os.getenv("TEXT_INDEX_ON_UPSERT", "True").lower() == 'true'
+        self.index_text = index_text
+        self._warned_no_text_index = False
         
         if self.mock_mode:
             print("Running VectorDBService in MOCK mode.")
+            # "exact" scans every row; "ivf" is approximate, tuned via IVF_NLIST / IVF_NPROBE;
+            # "sq8" / "pq" store quantized codes, optionally re-ranked via QUANT_RERANK_FACTOR.
+            self.local_index_type = os.getenv("LOCAL_VECTOR_INDEX", "exact").lower()
+            self.ivf_nlist = int(os.getenv("IVF_NLIST", "256"))
+            self.ivf_nprobe = int(os.getenv("IVF_NPROBE", "16"))
+            self.pq_subvectors = int(os.getenv("PQ_SUBVECTORS", "96"))
+            self.quant_rerank_factor = int(os.getenv("QUANT_RERANK_FACTOR", "0"))
             self.in_memory_db = {}
             self.index = self._get_or_create_index()
+            snapshot_dir = os.getenv("VECTOR_DB_SNAPSHOT_DIR")
+            if snapshot_dir and Path(snapshot_dir).is_dir():
+                self.load_snapshot(snapshot_dir)
         else:
             self.pinecone_api_key = os.getenv("PINECONE_API_KEY")
             if not self.pinecone_api_key or self.pinecone_api_key == "your-pinecone-api-key":
@@ -21,6 +71,10 @@ class VectorDBService:
                     "PINECONE_API_KEY is not set or is a placeholder. "
                     "Please set a valid Pinecone API key in your .env file."
                 )
+            self.query_concurrency = int(os.getenv("PINECONE_QUERY_CONCURRENCY", "8"))
+            self.upsert_concurrency = int(os.getenv("PINECONE_UPSERT_CONCURRENCY", "4"))
+            # Optional data-plane host; bulk upserts then go straight to its REST API.
+            self.index_host = os.getenv("PINECONE_INDEX_HOST")
             self.pinecone = Pinecone(api_key=self.pinecone_api_key)
             self.index = self._get_or_create_index()
 
@@ -31,8 +85,12 @@ class VectorDBService:
         """
         if self.mock_mode:
             return self # Return self to act as the index
-        
-        if index_name not in self.pinecone.list_indexes().names():
+
+        if self.index_host:
+            # The data-plane host is known: skip the control plane, so a local stand-in works too.
+            return self.pinecone.Index(self.index_name, host=self.index_host)
+
+        if self.index_name not in self.pinecone.list_indexes().names():
             print(f"Creating Pinecone index '{self.index_name}'...")
             self.pinecone.create_index(
                 name=self.index_name,
@@ -47,19 +105,81 @@ class VectorDBService:
         
         return self.pinecone.Index(self.index_name)
 
+    def _create_local_index(self):
+        if self.local_index_type == "ivf":
+            return IVFVectorIndex(nlist=self.ivf_nlist, nprobe=self.ivf_nprobe)
+        if self.local_index_type in ("sq8", "pq"):
+            return QuantizedVectorIndex(
+                method=self.local_index_type,
+                pq_subvectors=self.pq_subvectors,
+                rerank_factor=self.quant_rerank_factor,
+            )
+        return LocalVectorIndex()
+
+    def save_snapshot(self, directory, namespaces=None):
+        """
+        Saves mock-mode namespaces to `directory`, one sub-directory per
+        namespace, together with their text index.
+        """
+        if not self.mock_mode:
+            raise RuntimeError("Snapshots are only supported for the local (mock mode) vector store.")
+
+        namespaces = namespaces or list(self.in_memory_db)
+        for namespace in namespaces:
+            self.in_memory_db[namespace].save(Path(directory) / namespace)
+            print(f"Saved namespace '{namespace}' snapshot to '{directory}'.")
+        self.text_index.save(Path(directory) / TEXT_INDEX_SNAPSHOT, namespaces)
+
+    def load_snapshot(self, directory):
+        """
+        Opens every namespace snapshot under `directory`, and its text index.
+        Vectors are memory-mapped rather than read, so this is fast even for
+        large indexes.
+        """
+        if not self.mock_mode:
+            raise RuntimeError("Snapshots are only supported for the local (mock mode) vector store.")
+
+        for namespace_dir in sorted(Path(directory).iterdir()):
+            if (namespace_dir / "manifest.json").is_file():
+                self.in_memory_db[namespace_dir.name] = LocalVectorIndex.load(namespace_dir)
+                print(f"Loaded namespace '{namespace_dir.name}' snapshot from '{directory}'.")
+        # The text index is replaced too, so hybrid queries never see documents the store lacks.
+        text_snapshot = Path(directory) / TEXT_INDEX_SNAPSHOT
+        self.text_index = BM25Index.load(text_snapshot) if text_snapshot.is_file() else BM25Index()
+
+    def persist(self):
+        """
+        Saves the mock-mode store to VECTOR_DB_SNAPSHOT_DIR, if set, so the
+        next process opens it on start. Does nothing against Pinecone.
+        """
+        snapshot_dir = os.getenv("VECTOR_DB_SNAPSHOT_DIR")
+        if self.mock_mode and snapshot_dir and self.in_memory_db:
+            self.save_snapshot(snapshot_dir)
+
+    def _index_text(self, vectors, namespace):
+        if not self.index_text:
+            return
+        documents = []
+        for vec in vectors:
+            metadata = vec.get('metadata', {})
+            text = " ".join(str(metadata[field]) for field in TEXT_FIELDS if metadata.get(field))
+            documents.append((vec['id'], text, metadata))
+        self.text_index.add_many(namespace, documents)
+
     def upsert_vectors(self, vectors, namespace="default"):
         """
         Upserts vectors into the Pinecone index.
-        In mock mode, it stores them in an in-memory dictionary.
+        In mock mode, it stores them in a per-namespace LocalVectorIndex.
         """
         if not vectors:
             return
         
         if self.mock_mode:
             if namespace not in self.in_memory_db:
-                self.in_memory_db[namespace] = []
+                self.in_memory_db[namespace] = self._create_local_index()
             # Assuming vectors are in the format pinecone expects: list of dicts with id, values, metadata
-            self.in_memory_db[namespace].extend(vectors)
+            self.in_memory_db[namespace].upsert(vectors)
+            self._index_text(vectors, namespace)
             print(f"Mock upserted {len(vectors)} vectors into namespace '{namespace}'.")
             return
 
@@ -68,35 +188,95 @@ class VectorDBService:
         except Exception as e:
             print(f"Error upserting vectors to Pinecone: {e}")
             raise
+        self._index_text(vectors, namespace)
+
+    def bulk_upsert(self, vectors, namespace="default", max_concurrency=None, max_retries=5):
+        """
+        Upserts a large set of vectors using payload-sized batches, bounded
+        concurrency and jittered retries. Returns a BulkUpserter report with
+        throughput and per-batch failures instead of raising on the first error.
+        In mock mode, vectors are upserted into the local index in batches.
+        """
+        def index_text(result, batch):
+            if result["error"] is None:
+                self._index_text(batch, namespace)
+
+        if self.mock_mode:
+            upserter = BulkUpserter(_LocalIndexTarget(self), max_concurrency=1, max_retries=0)
+            return upserter.upsert(vectors, namespace=namespace, progress=index_text)
+
+        target = self.index
+        if self.index_host:
+            target = PineconeRestIndex(self.index_host, api_key=self.pinecone_api_key)
+        upserter = BulkUpserter(
+            target,
+            max_concurrency=max_concurrency or self.upsert_concurrency,
+            max_retries=max_retries,
+        )
+        try:
+            return upserter.upsert(vectors, namespace=namespace, progress=index_text)
+        finally:
+            if isinstance(target, PineconeRestIndex):
+                target.close()
+
+    def delete_vectors(self, ids, namespace="default"):
+        """
+        Deletes vectors by id from the Pinecone index.
+        In mock mode, the rows are tombstoned and later compacted away.
+        """
+        if not ids:
+            return
+
+        if self.index_text:
+            self.text_index.remove_many(namespace, ids)
+
+        if self.mock_mode:
+            if namespace in self.in_memory_db:
+                deleted = self.in_memory_db[namespace].delete(ids)
+                print(f"Mock deleted {deleted} vectors from namespace '{namespace}'.")
+            return
+
+        try:
+            self.index.delete(ids=ids, namespace=namespace)
+        except Exception as e:
+            print(f"Error deleting vectors from Pinecone: {e}")
+            raise
+
+    def describe_index_stats(self):
+        """
+        Returns per-namespace statistics.
+        In mock mode, each namespace reports live rows, dead rows and bytes held.
+        """
+        if self.mock_mode:
+            return {
+                "namespaces": {
+                    namespace: index.stats() for namespace, index in self.in_memory_db.items()
+                }
+            }
+        return self.index.describe_index_stats()
 
-    def query_index(self, query_vector, top_k=10, namespace="default", filter_criteria=None):
+    def query_index(self, query_vector, top_k=10, namespace="default", filter_criteria=None,
+                    query_text=None, mode="dense"):
         """
         Queries the Pinecone index.
-        In mock mode, it performs a cosine similarity search on the in-memory data.
+        In mock mode, it performs a cosine similarity search on the local index.
+
+        mode="hybrid" also runs `query_text` through the persistent BM25 index
+        built at ingest and fuses both rankings with reciprocal-rank fusion;
+        the response then carries per-leg "timings" in milliseconds and
+        whether a text index was available.
         """
+        if mode == "hybrid":
+            return self._hybrid_query(query_vector, query_text, top_k, namespace, filter_criteria)
+        if mode != "dense":
+            raise ValueError(f"Unknown query mode '{mode}'. Expected 'dense' or 'hybrid'.")
+
         if self.mock_mode:
-            if namespace not in self.in_memory_db or not self.in_memory_db[namespace]:
+            if namespace not in self.in_memory_db:
                 return {"matches": []}
-
-            # Simple cosine similarity implementation
-            query_vector_np = np.array(query_vector)
-            
-            all_vectors = self.in_memory_db[namespace]
-            
-            # Note: This is a very inefficient search, for mock purposes only.
-            results = []
-            for vec_data in all_vectors:
-                db_vector_np = np.array(vec_data['values'])
-                similarity = np.dot(query_vector_np, db_vector_np) / (np.linalg.norm(query_vector_np) * np.linalg.norm(db_vector_np))
-                results.append({
-                    "id": vec_data['id'],
-                    "score": similarity,
-                    "metadata": vec_data['metadata']
-                })
-            
-            results.sort(key=lambda x: x['score'], reverse=True)
-            
-            return {"matches": results[:top_k]}
+            return self.in_memory_db[namespace].query(
+                query_vector, top_k=top_k, filter_criteria=filter_criteria
+            )
 
         try:
             return self.index.query(
@@ -110,6 +290,73 @@ class VectorDBService:
             print(f"Error querying Pinecone index: {e}")
             raise
 
+    def _hybrid_query(self, query_vector, query_text, top_k, namespace, filter_criteria, candidates=50):
+        if not query_text:
+            raise ValueError("query_text is required for hybrid queries.")
+        depth = max(top_k, candidates)
+
+        start = time.perf_counter()
+        dense = self.query_index(query_vector, top_k=depth, namespace=namespace, filter_criteria=filter_criteria)
+        dense_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        has_text_index = self.text_index.exists() and self.text_index.has_documents(namespace)
+        if has_text_index:
+            sparse = self.text_index.search(query_text, namespace, top_k=depth, filter_criteria=filter_criteria)
+        else:
+            if not self._warned_no_text_index:
+                print(f"Warning: no text indexed for namespace '{namespace}'; hybrid queries are dense-only "
+                      "until its vectors are upserted with text indexing on.")
+                self._warned_no_text_index = True
+            sparse = {"matches": []}
+        bm25_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        matches = reciprocal_rank_fusion([dense['matches'], sparse['matches']], top_k=top_k)
+        fusion_ms = (time.perf_counter() - start) * 1000
+
+        return {
+            "matches": matches,
+            "timings": {"dense_ms": dense_ms, "bm25_ms": bm25_ms, "fusion_ms": fusion_ms},
+            "text_index": has_text_index,
+        }
+
+    def query_many(self, query_vectors, top_k=10, namespace="default", filter_criteria=None):
+        """
+        Queries the index with a batch of vectors, returning one result per vector.
+        In mock mode, the whole batch is scored with a single matrix-matrix product;
+        against Pinecone, queries are fanned out with bounded concurrency.
+        """
+        if not len(query_vectors):
+            return []
+
+        if self.mock_mode:
+            if namespace not in self.in_memory_db:
+                return [{"matches": []} for _ in query_vectors]
+            return self.in_memory_db[namespace].query_many(
+                query_vectors, top_k=top_k, filter_criteria=filter_criteria
+            )
+
+        try:
+            return query_pinecone_many(
+                self.index, query_vectors, top_k=top_k, namespace=namespace,
+                filter_criteria=filter_criteria, max_concurrency=self.query_concurrency
+            )
+        except Exception as e:
+            print(f"Error querying Pinecone index: {e}")
+            raise
+
+class _LocalIndexTarget:
+    """Adapts the mock-mode local store to the index.upsert(vectors=, namespace=) interface."""
+
+    def __init__(self, service):
+        self.service = service
+
+    def upsert(self, vectors, namespace):
+        if namespace not in self.service.in_memory_db:
+            self.service.in_memory_db[namespace] = self.service._create_local_index()
+        self.service.in_memory_db[namespace].upsert(vectors)
+
 # Example Usage:
 # if __name__ == '__main__':
 #     # To run in mock mode, set MOCK_VECTOR_DB=True in your environment
@@ -0,0 +1,137 @@
+# backend/services/vector_quantization.py
+
+import numpy as np
+
+
+class ScalarQuantizer:
+    """
+    Per-dimension 8-bit scalar quantizer.
+
+    Each dimension is mapped linearly from its trained [min, max] range onto
+    0..255, cutting storage to one byte per dimension (4x smaller than
+    float32).
+    """
+
+    method = "sq8"
+
+    def __init__(self, dimension):
+        self.dimension = dimension
+        self.code_size = dimension
+        self.vmin = None
+        self.scale = None
+
+    def train(self, vectors):
+        self.vmin = vectors.min(axis=0).astype(np.float32)
+        vmax = vectors.max(axis=0).astype(np.float32)
+        self.scale = np.maximum(vmax - self.vmin, 1e-12) / 255.0
+
+    def encode(self, vectors):
+        codes = np.rint((vectors - self.vmin) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes):
+        return codes.astype(np.float32) * self.scale + self.vmin
+
+    def inner_products(self, codes, query, block_rows=16384):
+        """
+        Asymmetric distance computation: the float32 query is scored directly
+        against the codes, q.x ~= q.vmin + (q * scale).code, one block at a time
+        so no full float32 copy of the codes is ever materialized.
+        """
+        weights = (query * self.scale).astype(np.float32)
+        offset = float(query @ self.vmin)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), block_rows):
+            block = codes[start:start + block_rows]
+            scores[start:start + len(block)] = block.astype(np.float32) @ weights
+        return scores + offset
+
+    def state(self):
+        return {"vmin": self.vmin, "scale": self.scale}
+
+    def load_state(self, state):
+        self.vmin = state["vmin"].astype(np.float32)
+        self.scale = state["scale"].astype(np.float32)
+
+
+class ProductQuantizer:
+    """
+    Product quantizer with `subvectors` sub-spaces of 256 centroids each.
+
+    A vector is stored as one byte per sub-space (the index of its nearest
+    sub-centroid), e.g. 96 bytes instead of 3 KB for a 768-dim float32
+    vector with 96 sub-spaces. Inner products are computed with per-query
+    lookup tables (asymmetric distance computation).
+    """
+
+    method = "pq"
+    ksub = 256
+
+    def __init__(self, dimension, subvectors=96, train_iterations=15, seed=0):
+        if dimension % subvectors:
+            raise ValueError(f"Dimension {dimension} is not divisible by {subvectors} PQ sub-vectors.")
+        self.dimension = dimension
+        self.subvectors = subvectors
+        self.dsub = dimension // subvectors
+        self.code_size = subvectors
+        self.train_iterations = train_iterations
+        self._rng = np.random.default_rng(seed)
+        self.codebooks = None
+
+    def _split(self, vectors):
+        return vectors.reshape(len(vectors), self.subvectors, self.dsub)
+
+    def train(self, vectors):
+        sub = self._split(np.asarray(vectors, dtype=np.float32))
+        ksub = min(self.ksub, len(vectors))
+        codebooks = np.zeros((self.subvectors, self.ksub, self.dsub), dtype=np.float32)
+        for m in range(self.subvectors):
+            data = sub[:, m, :]
+            centroids = data[self._rng.choice(len(data), ksub, replace=False)].copy()
+            for _ in range(self.train_iterations):
+                labels = self._nearest(data, centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, data)
+                counts = np.bincount(labels, minlength=ksub)
+                empty = counts == 0
+                counts[empty] = 1
+                centroids = sums / counts[:, None]
+                if empty.any():
+                    centroids[empty] = data[self._rng.choice(len(data), int(empty.sum()))]
+            codebooks[m, :ksub] = centroids
+            if ksub < self.ksub:
+                codebooks[m, ksub:] = centroids[0]
+        self.codebooks = codebooks
+
+    @staticmethod
+    def _nearest(data, centroids):
+        # argmin ||x - c||^2 == argmax (x.c - ||c||^2 / 2)
+        return np.argmax(data @ centroids.T - 0.5 * np.sum(centroids ** 2, axis=1), axis=1)
+
+    def encode(self, vectors):
+        sub = self._split(np.asarray(vectors, dtype=np.float32))
+        codes = np.empty((len(vectors), self.subvectors), dtype=np.uint8)
+        for m in range(self.subvectors):
+            codes[:, m] = self._nearest(sub[:, m, :], self.codebooks[m])
+        return codes
+
+    def decode(self, codes):
+        parts = [self.codebooks[m][codes[:, m]] for m in range(self.subvectors)]
+        return np.concatenate(parts, axis=1)
+
+    def inner_products(self, codes, query, block_rows=16384):
+        """Sums per-sub-space lookup-table entries: q.x ~= sum_m LUT[m, code_m]."""
+        lut = np.einsum("mkd,md->mk", self.codebooks, query.reshape(self.subvectors, self.dsub))
+        flat_lut = lut.ravel()
+        base = (np.arange(self.subvectors) * self.ksub).astype(np.intp)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), block_rows):
+            block = codes[start:start + block_rows]
+            scores[start:start + len(block)] = flat_lut[block.astype(np.intp) + base].sum(axis=1)
+        return scores
+
+    def state(self):
+        return {"codebooks": self.codebooks}
+
+    def load_state(self, state):
+        self.codebooks = state["codebooks"].astype(np.float32)
@@ -0,0 +1,89 @@
+# backend/tests/test_baseline_ingestion.py
+"""
+BaselineIngestionPipeline on small generated baseline/update files, in
+mock mode with a stand-in encoder.
+"""
+
+import gzip
+
+import numpy as np
+import pytest
+
+pytest.importorskip("Bio")
+
+from backend.ai import baseline_ingestion
+from backend.ai.baseline_ingestion import BaselineIngestionPipeline, BaselineProgress
+
+
+def article_xml(pmid, title):
+    return (f"<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>"
+            f"<Journal><Title>Gut</Title></Journal><ArticleTitle>{title}</ArticleTitle>"
+            f"<Abstract><AbstractText>Microbiome abstract for {title}.</AbstractText></Abstract>"
+            f"</Article></MedlineCitation></PubmedArticle>")
+
+
+def write_file(path, articles, deleted=()):
+    body = "".join(article_xml(pmid, title) for pmid, title in articles)
+    if deleted:
+        body += "<DeleteCitation>" + "".join(f"<PMID>{pmid}</PMID>" for pmid in deleted) + "</DeleteCitation>"
+    with gzip.open(path, "wt") as f:
+        f.write(f"<PubmedArticleSet>{body}</PubmedArticleSet>")
+    return str(path)
+
+
+@pytest.fixture
+def make_pipeline(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOCK_VECTOR_DB", "True")
+    monkeypatch.delenv("VECTOR_DB_SNAPSHOT_DIR", raising=False)
+    monkeypatch.setattr(baseline_ingestion, "cached_encode",
+                        lambda model_id, texts: np.ones((len(texts), 8), dtype="float32"))
+    progress = BaselineProgress(tmp_path / "progress.sqlite")
+
+    def make(files, **kwargs):
+        return BaselineIngestionPipeline(files, workers=2, progress=progress, parse_chunk_size=2,
+                                         embed_batch_size=3, upsert_batch_size=4, **kwargs)
+    return make
+
+
+def stored_ids(pipeline):
+    return set(pipeline.vector_db_service.in_memory_db["pubmed-articles"]._id_to_row)
+
+
+def test_later_files_win_and_deletions_apply_in_file_order(make_pipeline, tmp_path):
+    files = [
+        write_file(tmp_path / "f1.xml.gz", [(pmid, f"v1-{pmid}") for pmid in range(1, 8)]),
+        write_file(tmp_path / "f2.xml.gz", [(1, "v2-1")], deleted=[2, 3]),
+        write_file(tmp_path / "f3.xml.gz", [(3, "v3-3")]),
+    ]
+    pipeline = make_pipeline(files)
+
+    report = pipeline.run()
+
+    assert report["files"]["done"]["files"] == 3
+    assert stored_ids(pipeline) == {f"pmid-{pmid}" for pmid in (1, 3, 4, 5, 6, 7)}
+    results = pipeline.vector_db_service.query_index([1.0] * 8, top_k=10, namespace="pubmed-articles")
+    titles = {match["id"]: match["metadata"]["title"] for match in results["matches"]}
+    assert titles["pmid-1"] == "v2-1"
+    assert titles["pmid-3"] == "v3-3"
+
+
+def test_a_corrupt_file_is_recorded_as_failed_and_the_run_continues(make_pipeline, tmp_path):
+    corrupt = tmp_path / "f0.xml.gz"
+    corrupt.write_bytes(b"not a gzip file")
+    good = write_file(tmp_path / "f1.xml.gz", [(pmid, f"v1-{pmid}") for pmid in range(1, 4)])
+    pipeline = make_pipeline([str(corrupt), good])
+
+    report = pipeline.run()
+
+    assert report["files"]["failed"]["files"] == 1
+    assert report["files"]["done"]["files"] == 1
+    assert stored_ids(pipeline) == {"pmid-1", "pmid-2", "pmid-3"}
+    assert not pipeline.progress.is_done(str(corrupt))
+    assert pipeline.progress.is_done(good)
+
+    # A re-run only retries the failed file.
+    write_file(corrupt, [(9, "v1-9")])
+    rerun = make_pipeline([str(corrupt), good])
+    rerun.run()
+    assert stored_ids(rerun) == {"pmid-9"}
+    assert rerun.progress.is_done(str(corrupt))
@@ -0,0 +1,38 @@
+# backend/tests/test_bm25_index.py
+"""BM25Index query parsing and metadata filters."""
+
+from backend.services.bm25_index import BM25Index, query_terms
+
+
+def make_index(documents, namespace="ns"):
+    index = BM25Index()
+    index.add_many(namespace, documents)
+    return index
+
+
+def test_query_terms_drop_stopwords_and_single_characters():
+    assert query_terms("What is the role of Akkermansia in IL-6 signalling?") == [
+        "akkermansia", "il", "role", "signalling"]
+    assert query_terms("what is the") == []
+
+
+def test_a_question_only_matches_documents_sharing_a_content_word():
+    index = make_index([
+        ("pmid-1", "Akkermansia muciniphila in the gut", {}),
+        ("pmid-2", "What is the state of the art", {}),
+    ])
+
+    matches = index.search("what is the role of akkermansia", "ns")["matches"]
+
+    assert [match["id"] for match in matches] == ["pmid-1"]
+
+
+def test_filtered_search_fills_top_k_past_filtered_out_hits():
+    # The best-ranked hits all fail the filter; top_k must still be filled from further down.
+    documents = [(f"pmid-{i}", "butyrate " * 5, {"year": 2020}) for i in range(30)]
+    documents += [(f"pmid-{i}", "butyrate", {"year": 2024}) for i in range(30, 35)]
+    index = make_index(documents)
+
+    matches = index.search("butyrate", "ns", top_k=5, filter_criteria={"year": {"$eq": 2024}})["matches"]
+
+    assert sorted(match["id"] for match in matches) == [f"pmid-{i}" for i in range(30, 35)]
@@ -0,0 +1,154 @@
+# backend/tests/test_bulk_upserter.py
+"""
+BulkUpserter / PineconeRestIndex against a local HTTP stand-in for the
+Pinecone data-plane upsert endpoint.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.services.bulk_upserter import BulkUpserter, PineconeRestIndex
+
+
+class StandIn:
+    """Serves POST /vectors/upsert, answering with the queued status codes (then 200)."""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stand_in.requests.append((self.path, body))
+                status = stand_in.statuses.pop(0) if stand_in.statuses else 200
+                payload = json.dumps({"upsertedCount": len(body["vectors"])} if status == 200 else {"error": status})
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(payload.encode("utf-8"))
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def start(statuses=()):
+        servers.append(StandIn(statuses))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def make_vectors(n, dimension=8):
+    return [{"id": f"v{i}", "values": [0.1] * dimension, "metadata": {"title": f"t{i}"}} for i in range(n)]
+
+
+def make_upserter(index, **kwargs):
+    return BulkUpserter(index, max_concurrency=1, base_delay=0.001, max_delay=0.01, **kwargs)
+
+
+def test_429_is_retried_until_the_batch_succeeds(stand_in):
+    server = stand_in(statuses=[429, 429])
+    index = PineconeRestIndex(server.host)
+    try:
+        report = make_upserter(index, max_retries=5).upsert(make_vectors(10), namespace="ns")
+    finally:
+        index.close()
+
+    assert report["upserted"] == 10
+    assert report["retries"] == 2
+    assert report["failed_batches"] == []
+    assert len(server.requests) == 3
+    assert all(path == "/vectors/upsert" and body["namespace"] == "ns" for path, body in server.requests)
+
+
+def test_5xx_gives_up_after_max_retries(stand_in):
+    server = stand_in(statuses=[503] * 10)
+    index = PineconeRestIndex(server.host)
+    try:
+        report = make_upserter(index, max_retries=2).upsert(make_vectors(3))
+    finally:
+        index.close()
+
+    assert report["upserted"] == 0
+    assert [failure["attempts"] for failure in report["failed_batches"]] == [3]
+
+
+def test_4xx_is_not_retried(stand_in):
+    server = stand_in(statuses=[400])
+    index = PineconeRestIndex(server.host)
+    try:
+        report = make_upserter(index, max_retries=5).upsert(make_vectors(3))
+    finally:
+        index.close()
+
+    assert len(server.requests) == 1
+    assert [failure["attempts"] for failure in report["failed_batches"]] == [1]
+
+
+def test_errors_without_a_status_are_only_retried_for_transport_failures():
+    class BrokenIndex:
+        def __init__(self, error):
+            self.error = error
+            self.calls = 0
+
+        def upsert(self, vectors, namespace=""):
+            self.calls += 1
+            raise self.error
+
+    bad_payload = BrokenIndex(ValueError("vector dimension mismatch"))
+    report = make_upserter(bad_payload, max_retries=5).upsert(make_vectors(2))
+    assert bad_payload.calls == 1
+    assert report["failed_batches"][0]["attempts"] == 1
+
+    connection_reset = BrokenIndex(ConnectionResetError("reset by peer"))
+    make_upserter(connection_reset, max_retries=2).upsert(make_vectors(2))
+    assert connection_reset.calls == 3
+
+
+def test_connection_refused_is_retried():
+    server = StandIn()
+    host = server.host
+    server.close()
+    index = PineconeRestIndex(host, timeout=1.0)
+    try:
+        report = make_upserter(index, max_retries=1).upsert(make_vectors(2))
+    finally:
+        index.close()
+
+    assert report["failed_batches"][0]["attempts"] == 2
+
+
+def test_vector_db_service_bulk_upserts_through_a_configured_host(stand_in, monkeypatch):
+    pytest.importorskip("pinecone")
+    server = stand_in(statuses=[429])
+    monkeypatch.setenv("MOCK_VECTOR_DB", "False")
+    monkeypatch.setenv("PINECONE_API_KEY", "test-key")
+    monkeypatch.setenv("PINECONE_INDEX_HOST", server.host)
+    from backend.services.vector_db_service import VectorDBService
+
+    service = VectorDBService(index_name="test-index")
+    assert service.index_name == "test-index"
+    report = service.bulk_upsert(make_vectors(5), namespace="ns", max_retries=3)
+
+    assert report["upserted"] == 5
+    assert report["retries"] == 1
+    assert len(server.requests) == 2
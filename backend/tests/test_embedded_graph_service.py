@@ -0,0 +1,49 @@
+# backend/tests/test_embedded_graph_service.py
+"""EmbeddedKnowledgeGraphService: buffered bulk links, lookups and snapshots."""
+
+from backend.services.embedded_graph_service import EmbeddedKnowledgeGraphService, _save_open_graphs
+
+
+def load_graph(kg):
+    kg.add_diseases(["IBD", "IBS"])
+    kg.add_strains([{"strain_id": "GNS001", "species": "F. prausnitzii"},
+                    {"strain_id": "GNS002", "species": "A. muciniphila"}])
+    kg.add_papers([{"pmid": str(pmid), "title": f"Paper {pmid}", "abstract": "", "year": 2020} for pmid in range(6)])
+    # A chunked load, with a repeated link and a link to a missing node.
+    for chunk in ([("0", "IBD"), ("1", "IBD")], [("2", "IBS"), ("1", "IBD")], [("3", "IBD"), ("9", "IBD")]):
+        kg.link_papers_to_diseases(chunk)
+    kg.link_strains_to_diseases([("GNS001", "IBD"), ("GNS002", "IBS")])
+    kg.link_strain_to_disease("GNS002", "IBD")
+
+
+def test_bulk_links_are_buffered_until_the_first_read():
+    kg = EmbeddedKnowledgeGraphService()
+    load_graph(kg)
+
+    investigates = kg.relationships["INVESTIGATES"][0]
+    assert len(investigates) == 0
+
+    assert sorted(paper["pmid"] for paper in kg.find_papers_about_disease("IBD")) == ["0", "1", "3"]
+    assert sorted(strain["id"] for strain in kg.find_strains_treating_disease("IBD")) == ["GNS001", "GNS002"]
+    assert kg.find_papers_about_disease("Unknown") == []
+    assert kg.stats()["relationships"] == {"INVESTIGATES": 4, "STUDIES": 0, "TREATS": 3}
+
+
+def test_close_saves_unsaved_writes_for_the_next_start(tmp_path):
+    kg = EmbeddedKnowledgeGraphService(tmp_path / "graph")
+    load_graph(kg)
+    kg.close()
+
+    reopened = EmbeddedKnowledgeGraphService(tmp_path / "graph")
+    assert sorted(paper["pmid"] for paper in reopened.find_papers_about_disease("IBD")) == ["0", "1", "3"]
+    assert reopened.find_papers_about_disease("IBS")[0]["title"] == "Paper 2"
+
+
+def test_unsaved_graphs_are_saved_at_exit(tmp_path):
+    kg = EmbeddedKnowledgeGraphService(tmp_path / "graph")
+    load_graph(kg)
+
+    _save_open_graphs()
+
+    assert (tmp_path / "graph" / "manifest.json").exists()
+    assert EmbeddedKnowledgeGraphService(tmp_path / "graph").stats() == kg.stats()
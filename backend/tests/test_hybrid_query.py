@@ -0,0 +1,81 @@
+# backend/tests/test_hybrid_query.py
+"""
+Hybrid (dense + BM25) retrieval: the text index belongs to its vector
+store and hybrid queries fall back to dense-only without indexed text.
+"""
+
+import pytest
+
+pytest.importorskip("pinecone")
+
+from backend.services.bm25_index import BM25Index
+from backend.services.vector_db_service import VectorDBService
+
+ARTICLES = {
+    "pmid-1": ("Akkermansia muciniphila in ulcerative colitis", [1.0, 0.0, 0.0, 0.0]),
+    "pmid-2": ("Faecalibacterium prausnitzii and butyrate", [0.0, 1.0, 0.0, 0.0]),
+    "pmid-3": ("Strain GNS0042 carries tetW", [0.0, 0.0, 1.0, 0.0]),
+}
+
+
+def make_vectors():
+    return [{"id": doc_id, "values": values, "metadata": {"title": title, "abstract": title}}
+            for doc_id, (title, values) in ARTICLES.items()]
+
+
+@pytest.fixture
+def mock_store(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOCK_VECTOR_DB", "True")
+    monkeypatch.delenv("VECTOR_DB_SNAPSHOT_DIR", raising=False)
+    monkeypatch.delenv("TEXT_INDEX_ON_UPSERT", raising=False)
+    monkeypatch.setenv("TEXT_INDEX_DIR", str(tmp_path / "text_index"))
+    return VectorDBService
+
+
+def test_upserts_are_text_indexed_by_default(mock_store):
+    service = mock_store()
+    service.upsert_vectors(make_vectors(), namespace="ns")
+
+    result = service.query_index([0.0, 0.0, 0.0, 1.0], top_k=3, namespace="ns", query_text="tetW", mode="hybrid")
+
+    assert result["text_index"] is True
+    assert result["matches"][0]["id"] == "pmid-3"
+
+
+def test_a_fresh_store_does_not_see_another_stores_text(mock_store):
+    mock_store().upsert_vectors(make_vectors(), namespace="ns")
+
+    result = mock_store().query_index([1.0, 0.0, 0.0, 0.0], top_k=3, namespace="ns", query_text="tetW", mode="hybrid")
+
+    assert result["matches"] == []
+    assert result["text_index"] is False
+
+
+def test_hybrid_falls_back_to_dense_without_indexed_text(mock_store):
+    service = mock_store(index_text=False)
+    service.upsert_vectors(make_vectors(), namespace="ns")
+
+    result = service.query_index([1.0, 0.0, 0.0, 0.0], top_k=1, namespace="ns", query_text="tetW", mode="hybrid")
+
+    assert result["text_index"] is False
+    assert [match["id"] for match in result["matches"]] == ["pmid-1"]
+
+
+def test_deletes_remove_text(mock_store):
+    service = mock_store()
+    service.upsert_vectors(make_vectors(), namespace="ns")
+    service.delete_vectors(["pmid-3"], namespace="ns")
+
+    result = service.query_index([1.0, 0.0, 0.0, 0.0], top_k=3, namespace="ns", query_text="tetW", mode="hybrid")
+
+    assert "pmid-3" not in [match["id"] for match in result["matches"]]
+
+
+def test_pinecone_text_indexes_are_one_file_per_index(monkeypatch, tmp_path):
+    monkeypatch.setenv("TEXT_INDEX_DIR", str(tmp_path))
+    research, other = BM25Index.for_index("research"), BM25Index.for_index("other")
+    research.add_many("ns", [("pmid-3", "Strain GNS0042 carries tetW", {})])
+
+    assert research.path != other.path
+    assert [match["id"] for match in research.search("tetW", "ns")["matches"]] == ["pmid-3"]
+    assert other.search("tetW", "ns")["matches"] == []
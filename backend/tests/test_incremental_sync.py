@@ -0,0 +1,100 @@
+# backend/tests/test_incremental_sync.py
+"""
+EmbeddingPipeline incremental syncs: when the high-water mark moves, against
+an in-memory stand-in for PubMedService and a mock-mode vector store.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("Bio")
+
+from backend.ai import embedding_pipeline
+from backend.ai.embedding_pipeline import EmbeddingPipeline
+from backend.services.pubmed_sync_state import PubMedSyncState
+
+QUERY = "microbiome AND colitis"
+
+
+def make_articles(pmids, version=1):
+    return [{"pmid": str(pmid), "title": f"Article {pmid} v{version}", "abstract": f"Abstract {pmid}",
+             "journal": "Gut", "year": "2024", "authors": []} for pmid in pmids]
+
+
+class StandInPubMed:
+    """search_history / history_pages / update_pages / fetch_history_page over a fixed article list."""
+
+    def __init__(self, articles, delta=()):
+        self.articles = articles
+        self.delta = list(delta)
+        self.update_calls = []
+
+    def search_history(self, query):
+        return {"count": len(self.articles), "webenv": "W", "query_key": "1", "query": query,
+                "mindate": None, "maxdate": None}
+
+    def _pages(self, key, count, max_results, page_size):
+        count = count if max_results is None else min(count, max_results)
+        return [{"webenv": key, "query_key": "1", "retstart": start, "retmax": min(page_size, count - start),
+                 "query": QUERY, "mindate": None, "maxdate": None} for start in range(0, count, page_size)]
+
+    def history_pages(self, query, max_results=None, page_size=500, history=None):
+        return self._pages("full", len(self.articles), max_results, page_size)
+
+    def update_pages(self, query, since, until=None, max_results=None, page_size=500):
+        self.update_calls.append({"since": since, "max_results": max_results})
+        return self._pages("delta", len(self.delta), max_results, page_size)
+
+    def fetch_history_page(self, page):
+        records = self.articles if page["webenv"] == "full" else self.delta
+        return records[page["retstart"]:page["retstart"] + page["retmax"]]
+
+
+@pytest.fixture
+def make_pipeline(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOCK_VECTOR_DB", "True")
+    monkeypatch.delenv("VECTOR_DB_SNAPSHOT_DIR", raising=False)
+    monkeypatch.setattr(embedding_pipeline, "cached_encode",
+                        lambda model_id, texts: np.ones((len(texts), 8), dtype="float32"))
+    monkeypatch.setattr(embedding_pipeline, "embedding_cache", None)
+    sync_state = PubMedSyncState(tmp_path / "sync.sqlite")
+
+    def make(pubmed, max_articles):
+        monkeypatch.setattr(embedding_pipeline, "PubMedService", lambda: pubmed)
+        return EmbeddingPipeline(QUERY, max_articles=max_articles, page_size=2, incremental=True,
+                                 sync_state=sync_state)
+    return make
+
+
+def test_first_sync_of_exactly_max_articles_sets_the_high_water_mark(make_pipeline):
+    pipeline = make_pipeline(StandInPubMed(make_articles(range(5))), max_articles=5)
+
+    report = pipeline.run()
+
+    assert report["upsert"]["upserted"] == 5
+    assert pipeline.sync_state.high_water(QUERY) is not None
+
+
+def test_first_sync_cut_short_by_max_articles_leaves_the_mark_unset(make_pipeline):
+    pipeline = make_pipeline(StandInPubMed(make_articles(range(6))), max_articles=5)
+
+    report = pipeline.run()
+
+    assert report["upsert"]["upserted"] == 5
+    assert pipeline.sync_state.high_water(QUERY) is None
+
+
+def test_delta_runs_page_through_the_whole_delta(make_pipeline):
+    first = make_pipeline(StandInPubMed(make_articles(range(3))), max_articles=3)
+    first.run()
+    since = first.sync_state.high_water(QUERY)
+
+    # More changed records than max_articles: all of them are ingested before the mark moves.
+    pubmed = StandInPubMed(make_articles(range(3)), delta=make_articles(range(7), version=2))
+    report = make_pipeline(pubmed, max_articles=3).run()
+
+    assert pubmed.update_calls == [{"since": since, "max_results": None}]
+    assert report["sync"]["revised"] == 3
+    assert report["sync"]["new"] == 4
+    assert report["upsert"]["upserted"] == 7
+    assert first.sync_state.high_water(QUERY) is not None
@@ -0,0 +1,86 @@
+# backend/tests/test_pubmed_cache.py
+"""PubMedResponseCache keys and replay of PubMedService searches."""
+
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip("Bio")
+
+from backend.services import pubmed_service
+from backend.services.pubmed_cache import PubMedResponseCache, normalize_query
+from backend.services.pubmed_service import PubMedService
+
+
+def test_query_normalization_collapses_whitespace_but_keeps_case():
+    assert normalize_query("  microbiome   AND\tIBD ") == "microbiome AND IBD"
+    assert normalize_query("microbiome AND IBD") != normalize_query("microbiome and IBD")
+
+
+def test_boolean_and_plain_queries_get_different_cache_keys():
+    key = PubMedResponseCache.key
+    assert key("esearch", {"term": "a AND b", "retmax": 10}) != key("esearch", {"term": "a and b", "retmax": 10})
+    assert key("esearch", {"term": "a  AND b", "retmax": 10}) == key("esearch", {"term": "a AND b", "retmax": 10})
+
+
+class Handle(dict):
+    """An esearch response that is also its own (already read) handle."""
+
+    def close(self):
+        pass
+
+
+class StandInEntrez:
+    """
+    esearch over `total` records published evenly from 1990 to 2024. Every
+    search starts a new history session, as NCBI's does.
+    """
+
+    START, END = date(1990, 1, 1), date(2024, 12, 31)
+
+    def __init__(self, total):
+        self.total = total
+        self.sessions = 0
+        self.calls = 0
+
+    def _count(self, mindate, maxdate):
+        low = max(datetime.strptime(mindate, "%Y/%m/%d").date(), self.START) if mindate else self.START
+        high = min(datetime.strptime(maxdate, "%Y/%m/%d").date(), self.END) if maxdate else self.END
+        if low > high:
+            return 0
+        return self.total * ((high - low).days + 1) // ((self.END - self.START).days + 1)
+
+    def esearch(self, db, term, retmax=20, retstart=0, usehistory=None, WebEnv=None, mindate=None, maxdate=None,
+                datetype=None):
+        self.calls += 1
+        if WebEnv is not None:
+            _, mindate, maxdate = WebEnv.split("|")
+            ids = [f"{mindate}-{position}" for position in range(retstart, retstart + retmax)]
+            return Handle(Count=str(len(ids)), IdList=ids)
+        self.sessions += 1
+        return Handle(Count=str(self._count(mindate, maxdate)), QueryKey="1", IdList=[],
+                      WebEnv=f"session{self.sessions}|{mindate or ''}|{maxdate or ''}")
+
+
+@pytest.fixture
+def entrez(monkeypatch):
+    stand_in = StandInEntrez(total=30000)
+    monkeypatch.setattr(pubmed_service.Entrez, "esearch", stand_in.esearch)
+    monkeypatch.setattr(pubmed_service.Entrez, "read", lambda handle: handle)
+    monkeypatch.setattr(pubmed_service._rate_limiter, "wait", lambda: None)
+    return stand_in
+
+
+def test_searches_past_10000_ids_replay_from_the_cache(entrez, tmp_path):
+    recorded = PubMedService(email="test@example.com", cache=PubMedResponseCache(tmp_path, mode="record"))
+    ids = recorded.search_ids("microbiome AND colitis", max_results=15000)
+    assert len(ids) == 15000
+    assert len(set(ids)) == 15000
+
+    # Re-recording the searches (e.g. while recording fixtures) stores new history sessions.
+    recorded.history_pages("microbiome AND colitis", max_results=15000)
+
+    calls = entrez.calls
+    replayed = PubMedService(email="test@example.com", cache=PubMedResponseCache(tmp_path, mode="replay"))
+    assert replayed.search_ids("microbiome AND colitis", max_results=15000) == ids
+    assert entrez.calls == calls
@@ -0,0 +1,72 @@
+# backend/tests/test_vector_db_snapshot.py
+"""Mock-mode VectorDBService snapshots: save, reopen on start, and persist()."""
+
+import pytest
+
+pytest.importorskip("pinecone")
+
+from backend.services.vector_db_service import VectorDBService
+
+VECTORS = [
+    {"id": "pmid-1", "values": [1.0, 0.0, 0.0, 0.0], "metadata": {"title": "Akkermansia in colitis", "year": 2021}},
+    {"id": "pmid-2", "values": [0.0, 1.0, 0.0, 0.0], "metadata": {"title": "Strain GNS0042 carries tetW", "year": 2023}},
+]
+
+
+@pytest.fixture
+def mock_mode(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOCK_VECTOR_DB", "True")
+    monkeypatch.delenv("VECTOR_DB_SNAPSHOT_DIR", raising=False)
+    monkeypatch.delenv("TEXT_INDEX_ON_UPSERT", raising=False)
+    return monkeypatch
+
+
+def test_snapshot_round_trip_restores_vectors_and_text(mock_mode, tmp_path):
+    service = VectorDBService()
+    service.upsert_vectors(VECTORS, namespace="ns")
+    service.upsert_vectors(VECTORS[:1], namespace="other")
+    service.save_snapshot(tmp_path / "snapshot")
+
+    mock_mode.setenv("VECTOR_DB_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    reopened = VectorDBService()
+
+    dense = reopened.query_index([0.0, 1.0, 0.0, 0.0], top_k=1, namespace="ns")
+    assert [match["id"] for match in dense["matches"]] == ["pmid-2"]
+    assert dense["matches"][0]["metadata"]["year"] == 2023
+    hybrid = reopened.query_index([1.0, 0.0, 0.0, 0.0], top_k=2, namespace="ns", query_text="tetW", mode="hybrid")
+    assert hybrid["text_index"] is True
+    assert {match["id"] for match in hybrid["matches"]} == {"pmid-1", "pmid-2"}
+    assert set(reopened.in_memory_db) == {"ns", "other"}
+
+
+def test_saving_some_namespaces_leaves_the_others_text_out(mock_mode, tmp_path):
+    service = VectorDBService()
+    service.upsert_vectors(VECTORS, namespace="ns")
+    service.upsert_vectors(VECTORS, namespace="other")
+    service.save_snapshot(tmp_path / "snapshot", namespaces=["ns"])
+
+    mock_mode.setenv("VECTOR_DB_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    reopened = VectorDBService()
+
+    assert reopened.text_index.has_documents("ns")
+    assert not reopened.text_index.has_documents("other")
+
+
+def test_persist_writes_the_snapshot_the_next_service_opens(mock_mode, tmp_path):
+    mock_mode.setenv("VECTOR_DB_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    service = VectorDBService()
+    service.upsert_vectors(VECTORS, namespace="ns")
+    service.persist()
+
+    reopened = VectorDBService()
+
+    matches = reopened.query_index([1.0, 0.0, 0.0, 0.0], top_k=2, namespace="ns")["matches"]
+    assert [match["id"] for match in matches] == ["pmid-1", "pmid-2"]
+
+
+def test_persist_does_nothing_without_a_snapshot_dir(mock_mode, tmp_path):
+    service = VectorDBService()
+    service.upsert_vectors(VECTORS, namespace="ns")
+    service.persist()
+
+    assert list(tmp_path.iterdir()) == []